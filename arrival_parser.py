@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""도착 메시지(arrmsg1/arrmsg2) 파서
+
+"곧 도착", "3분12초후[2번째 전]", "출발대기", "운행종료" 같은 문자열을
+(도착까지 초, 남은 정류장 수, 상태) 레코드로 바꾼다. 같은 문자열이 계속 반복되므로
+결과를 메모이즈하고, 레코드는 공유되므로 수정하지 않는다.
+"""
+import re
+from functools import lru_cache
+
+# 상태
+ARRIVING = "곧 도착"
+RUNNING = "운행중"
+WAITING = "출발대기"
+ENDED = "운행종료"
+UNKNOWN = "정보없음"
+
+_ETA_RE = re.compile(r"(?:(\d+)분)?(?:(\d+)초)?후")
+_STOPS_RE = re.compile(r"\[(\d+)번째 전\]")
+
+
+class Arrival:
+    """도착 예정 정보 (seconds/stops_away는 모르면 None)"""
+    __slots__ = ("seconds", "stops_away", "status")
+
+    def __init__(self, seconds, stops_away, status):
+        self.seconds = seconds
+        self.stops_away = stops_away
+        self.status = status
+
+    @property
+    def minutes(self):
+        """도착까지 남은 분 (곧 도착 = 0)"""
+        return None if self.seconds is None else self.seconds // 60
+
+    def to_dict(self):
+        return {"seconds": self.seconds, "stops_away": self.stops_away, "status": self.status}
+
+    def __repr__(self):
+        return f"Arrival(seconds={self.seconds}, stops_away={self.stops_away}, status={self.status!r})"
+
+
+_UNKNOWN = Arrival(None, None, UNKNOWN)
+
+
+@lru_cache(maxsize=4096)
+def parse_arrival(message):
+    """도착 메시지 → Arrival (메모이즈됨)"""
+    if not message:
+        return _UNKNOWN
+    stops = _STOPS_RE.search(message)
+    stops_away = int(stops.group(1)) if stops else None
+
+    if message.startswith(ARRIVING):
+        return Arrival(0, 0 if stops_away is None else stops_away, ARRIVING)
+    if WAITING in message:
+        return Arrival(None, stops_away, WAITING)
+    if ENDED in message:
+        return Arrival(None, None, ENDED)
+
+    eta = _ETA_RE.search(message)
+    if not eta or not (eta.group(1) or eta.group(2)):
+        return Arrival(None, stops_away, UNKNOWN)
+    seconds = int(eta.group(1) or 0) * 60 + int(eta.group(2) or 0)
+    return Arrival(seconds, stops_away, RUNNING)
+
+
+if __name__ == "__main__":
+    for message in ["곧 도착", "3분12초후[2번째 전]", "8분후[4번째 전]", "45초후[1번째 전]",
+                    "출발대기", "운행종료", ""]:
+        print(f"{message!r:24} → {parse_arrival(message)}")
+    print(parse_arrival.cache_info())
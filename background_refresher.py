@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""백그라운드 갱신기 - 업스트림 데이터를 주기별로 미리 받아두기"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+import quota
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """작업별 주기에 맞춰 데이터를 갱신하고 불변 스냅샷으로 제공
+
+    핸들러는 snapshot()/get()으로 현재 값을 읽기만 하므로 락을 잡지 않는다.
+    갱신 결과는 매번 새 MappingProxyType으로 통째로 교체된다.
+
+    store(SharedCache)를 주면 여러 프로세스 중 리더 하나만 업스트림을 조회하고
+    나머지 프로세스는 공유 캐시에 올라온 값을 받아 자기 스냅샷을 교체한다.
+    """
+
+    PURGE_INTERVAL = 300  # 리더가 공유 캐시의 만료 항목을 지우는 주기(초)
+
+    def __init__(self, max_workers=4, store=None):
+        self._jobs = {}  # {name: {"func", "interval", "next_run", "running"}}
+        self._snapshot = MappingProxyType({})
+        self._updated_at = MappingProxyType({})
+        self._write_lock = threading.Lock()
+        self._updated = threading.Condition(self._write_lock)
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh")
+        self.version = 0
+        self._store = store
+        self._store_seen = {}  # {name: 공유 캐시에서 마지막으로 받은 값의 저장 시각}
+        self._next_purge = 0
+
+    def register(self, name, func, interval):
+        """갱신 작업 등록 (interval초마다 func() 실행)"""
+        self._jobs[name] = {"func": func, "interval": interval, "next_run": 0, "running": False}
+
+    def start(self):
+        """스케줄러 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="refresher", daemon=True)
+        self._thread.start()
+        logger.info(f"백그라운드 갱신 시작: {', '.join(self._jobs)}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    @property
+    def running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def snapshot(self):
+        """현재 전체 스냅샷 (읽기 전용)"""
+        return self._snapshot
+
+    def get(self, name, default=None):
+        return self._snapshot.get(name, default)
+
+    def get_or_fetch(self, name):
+        """스냅샷 값 반환
+
+        아직 값이 없으면(기동 직후) 동기로 한 번 조회한다.
+        갱신 스레드가 꺼져 있으면 주기가 지난 값도 직접 다시 조회한다.
+        """
+        value = self._snapshot.get(name)
+        if value is None:
+            if self._sync_from_store(name):
+                return self._snapshot[name]
+            return self._refresh(name)
+        if not self.running and self.age(name) >= self._jobs[name]["interval"]:
+            return self._refresh(name)
+        return value
+
+    def wait_for_update(self, version, timeout=None):
+        """version 이후 갱신이 있을 때까지 대기 (timeout초), 현재 version 반환"""
+        with self._updated:
+            self._updated.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def current(self):
+        """모든 작업 값이 채워진 스냅샷 (빠진 값은 동기로 조회)"""
+        for name in self._jobs:
+            self.get_or_fetch(name)
+        return self._snapshot
+
+    def age(self, name):
+        """마지막 갱신 후 경과 시간(초), 갱신된 적 없으면 None"""
+        updated_at = self._updated_at.get(name)
+        return None if updated_at is None else time.monotonic() - updated_at
+
+    @property
+    def is_leader(self):
+        """업스트림을 직접 조회하는 프로세스인지 (공유 캐시가 없으면 항상 True)"""
+        return self._store is None or self._store.try_become_leader()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.is_leader:
+                now = time.monotonic()
+                for name, job in self._jobs.items():
+                    if not job["running"] and now >= job["next_run"]:
+                        job["running"] = True
+                        self._executor.submit(self._run_job, name)
+                if self._store is not None and now >= self._next_purge:
+                    self._purge_store()
+                    self._next_purge = now + self.PURGE_INTERVAL
+            else:
+                for name in self._jobs:
+                    self._sync_from_store(name)
+            self._stop.wait(0.5)
+
+    def _purge_store(self):
+        """공유 캐시의 만료된 값/작업 권한 삭제 (쿼리별 응답 캐시가 파일에 쌓이지 않도록)"""
+        try:
+            self._store.purge_expired()
+        except Exception as e:
+            logger.error(f"공유 캐시 정리 실패: {e}")
+
+    def _sync_from_store(self, name):
+        """공유 캐시에 더 새로운 값이 있으면 받아서 스냅샷 교체"""
+        if self._store is None:
+            return False
+        try:
+            newer = self._store.get_if_newer(f"refresh:{name}", self._store_seen.get(name, 0))
+        except Exception as e:
+            logger.error(f"공유 캐시 읽기 실패 {name}: {e}")
+            return False
+        if newer is None:
+            return False
+        value, stored_at = newer
+        self._store_seen[name] = stored_at
+        self._publish(name, value)
+        return True
+
+    def _run_job(self, name):
+        """스케줄러가 돌리는 선제 갱신 - 업스트림 호출 한도는 가장 낮은 우선순위로 씀"""
+        job = self._jobs[name]
+        try:
+            with quota.priority(quota.BACKGROUND):
+                self._refresh(name)
+        finally:
+            job["next_run"] = time.monotonic() + job["interval"]
+            job["running"] = False
+
+    def _refresh(self, name):
+        """작업 실행 후 스냅샷 교체
+
+        오류 응답이 오면 이전 정상 값이 있을 경우 그 값을 유지한다.
+        """
+        try:
+            value = self._jobs[name]["func"]()
+        except Exception as e:
+            logger.error(f"백그라운드 갱신 실패 {name}: {e}")
+            value = {"error": str(e)}
+
+        published = self._publish(name, value)
+        if published is value and self._store is not None:
+            try:
+                ttl = max(self._jobs[name]["interval"] * 3, 60)
+                self._store_seen[name] = self._store.set(f"refresh:{name}", value, ttl)
+            except Exception as e:
+                logger.error(f"공유 캐시 쓰기 실패 {name}: {e}")
+        return published
+
+    def _publish(self, name, value):
+        """스냅샷에 값 반영 (오류 값이면 이전 정상 값 유지), 실제 반영된 값 반환"""
+        with self._write_lock:
+            previous = self._snapshot.get(name)
+            if isinstance(value, dict) and "error" in value and previous is not None:
+                logger.warning(f"{name} 갱신 오류, 이전 값 유지: {value['error']}")
+                return previous
+            snapshot = dict(self._snapshot)
+            snapshot[name] = value
+            updated_at = dict(self._updated_at)
+            updated_at[name] = time.monotonic()
+            self._snapshot = MappingProxyType(snapshot)
+            self._updated_at = MappingProxyType(updated_at)
+            self.version += 1
+            self._updated.notify_all()
+        return value
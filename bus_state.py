@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""정류장 도착정보 모델 - 노선별 도착 예정 차량 2대의 도착/혼잡도/승객 수
+
+API 응답을 한 번 객체로 만들고 나면 분석 단계들은 dict를 새로 만들지 않고
+같은 객체에 결과를 채워 넣는다. 기존 JSON 모양의 dict는 HTTP 응답/수집 기록을
+만들 때만 to_dict()/occupancy_dict()로 만든다.
+"""
+from arrival_parser import parse_arrival
+
+LEGACY_STATION = "03278"  # station 키가 없는 예전 수집 기록/입력의 정류장 (보광동주민센터)
+
+
+def congestion_code(value):
+    """혼잡도 코드 → 정수 (0: 정보없음)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Vehicle:
+    """노선의 n번째 도착 예정 차량"""
+    __slots__ = ("message", "arrival", "congestion", "occupancy")
+
+    def __init__(self, message, congestion):
+        self.message = message or ""            # 원본 도착 메시지 (arrmsg)
+        self.arrival = parse_arrival(message)   # Arrival (공유 레코드, 수정 금지)
+        self.congestion = congestion_code(congestion)
+        self.occupancy = None                   # estimate_passenger_count() 결과 (승객 수 분석 후)
+
+    @property
+    def passengers(self):
+        """예상 승객 수 (분석 전이거나 정보 없으면 None)"""
+        passengers = self.occupancy["passengers"] if self.occupancy else None
+        return passengers if isinstance(passengers, int) else None
+
+
+class RouteState:
+    """정류장의 한 노선 (차량 2대)"""
+    __slots__ = ("station", "route", "direction", "vehicles", "recommendation", "usual_passengers")
+
+    def __init__(self, station, route, direction, vehicles):
+        self.station = station            # 정류장 ARS ID
+        self.route = route
+        self.direction = direction
+        self.vehicles = vehicles          # (첫 번째, 두 번째) Vehicle
+        self.recommendation = None        # 승객 수 기반 추천 (승객 수 분석 후)
+        self.usual_passengers = None      # 같은 시간대 관측 승객 수 통계 (승객 수 분석 후)
+
+    def to_dict(self):
+        """도착정보 API 모양 (station, route, direction, arrival1/2, congestion1/2)"""
+        first, second = self.vehicles
+        return {
+            "station": self.station,
+            "route": self.route,
+            "direction": self.direction,
+            "arrival1": first.message,
+            "arrival2": second.message,
+            "congestion1": str(first.congestion),
+            "congestion2": str(second.congestion),
+        }
+
+    def occupancy_dict(self):
+        """승객 수 분석 결과 모양 (bus1_passengers, bus1_comfort, ...)"""
+        result = {
+            "station": self.station,
+            "route": self.route,
+            "direction": self.direction,
+            "arrival1": self.vehicles[0].message,
+            "arrival2": self.vehicles[1].message,
+            "eta1": self.vehicles[0].arrival.to_dict(),
+            "eta2": self.vehicles[1].arrival.to_dict(),
+        }
+        for n, vehicle in enumerate(self.vehicles, start=1):
+            occupancy = vehicle.occupancy or {}
+            result[f"bus{n}_passengers"] = occupancy.get("passengers", "정보없음")
+            result[f"bus{n}_occupancy_rate"] = occupancy.get("rate", 0)
+            result[f"bus{n}_comfort"] = occupancy.get("comfort", "알 수 없음")
+        result["recommendation"] = self.recommendation
+        result["usual_passengers"] = self.usual_passengers
+        return result
+
+
+class StationSnapshot:
+    """정류장 도착정보 한 번 조회분 (여러 모듈이 공유하므로 분석 결과 외에는 수정하지 말 것)"""
+    __slots__ = ("station", "routes", "analyzed", "errors")
+
+    def __init__(self, station, routes, errors=None):
+        self.station = station  # 정류장 ARS ID (합친 스냅샷은 "03278,03518")
+        self.routes = routes
+        self.analyzed = False   # 승객 수 분석 결과를 채웠는지
+        self.errors = errors or {}  # 합친 스냅샷에서 조회에 실패한 정류장 → 오류 메시지
+
+    @classmethod
+    def from_items(cls, station, items):
+        """도착정보 API itemList → 스냅샷"""
+        return cls(station, [
+            RouteState(station, item["rtNm"], item["adirection"], (
+                Vehicle(item["arrmsg1"], item["congestion1"]),
+                Vehicle(item["arrmsg2"], item["congestion2"]),
+            ))
+            for item in items
+        ])
+
+    @classmethod
+    def from_dict(cls, data, station=LEGACY_STATION):
+        """{"buses": [...]} (수집 기록/테스트 입력) → 스냅샷"""
+        return cls(station, [_route_from_dict(bus, station) for bus in data["buses"]])
+
+    def to_dict(self):
+        return {"buses": [route.to_dict() for route in self.routes]}
+
+    def occupancy_dict(self):
+        return {"buses": [route.occupancy_dict() for route in self.routes]}
+
+    def __repr__(self):
+        return f"StationSnapshot({self.station}, {len(self.routes)}개 노선)"
+
+
+def _route_from_dict(bus, station=LEGACY_STATION):
+    """도착정보 dict 또는 승객 수 분석 결과 dict → RouteState"""
+    vehicles = []
+    for n in (1, 2):
+        vehicle = Vehicle(bus.get(f"arrival{n}"), bus.get(f"congestion{n}"))
+        if f"bus{n}_passengers" in bus:
+            vehicle.occupancy = {
+                "passengers": bus[f"bus{n}_passengers"],
+                "rate": bus.get(f"bus{n}_occupancy_rate", 0),
+                "comfort": bus.get(f"bus{n}_comfort", "알 수 없음"),
+            }
+        vehicles.append(vehicle)
+    route = RouteState(bus.get("station", station), bus["route"], bus.get("direction", ""), tuple(vehicles))
+    route.recommendation = bus.get("recommendation")
+    return route
+
+
+def as_snapshot(data, station=LEGACY_STATION):
+    """스냅샷 또는 {"buses": [...]} dict → 스냅샷 (오류 응답이면 None)"""
+    if isinstance(data, StationSnapshot):
+        return data
+    if isinstance(data, dict) and "buses" in data:
+        return StationSnapshot.from_dict(data, station)
+    return None
+
+
+def as_route(bus):
+    """RouteState 또는 dict → RouteState"""
+    return bus if isinstance(bus, RouteState) else _route_from_dict(bus)
+
+
+def _first_eta(route):
+    seconds = route.vehicles[0].arrival.seconds
+    return float("inf") if seconds is None else seconds
+
+
+def merge_snapshots(snapshots, station_routes=None):
+    """정류장별 스냅샷 {정류장: 스냅샷 또는 오류} → 노선·방향별로 합친 스냅샷
+
+    같은 노선·방향이 여러 정류장에 있으면 첫 차가 먼저 오는 쪽을 쓴다.
+    station_routes: 정류장 → 남길 노선 집합 (없으면 전체)
+    모든 정류장이 실패하면 정류장별 오류를 합친 {"error", "station", "station_errors"}를 반환한다.
+    """
+    routes = {}
+    errors = {}
+    for station, snapshot in snapshots.items():
+        if not isinstance(snapshot, StationSnapshot):
+            errors[station] = snapshot.get("error", "도착 정보 없음")
+            continue
+        wanted = station_routes.get(station) if station_routes else None
+        for route in snapshot.routes:
+            if wanted is not None and route.route not in wanted:
+                continue
+            key = (route.route, route.direction)
+            if key not in routes or _first_eta(route) < _first_eta(routes[key]):
+                routes[key] = route
+    station = ",".join(snapshots)
+    if not routes and errors:
+        return {
+            "error": "; ".join(f"{station_id}: {error}" for station_id, error in errors.items()),
+            "station": station,
+            "station_errors": errors,
+        }
+    return StationSnapshot(station, list(routes.values()), errors)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""직렬화된 응답 캐싱 - 미리 만든 바이트(+gzip)와 ETag로 304 처리"""
+import gzip
+import hashlib
+import json
+from flask import Response
+
+GZIP_MIN_SIZE = 512          # 이보다 작은 응답은 압축하지 않음
+VOLATILE_KEYS = ("timestamp",)  # ETag 계산에서 빼는 필드 (매번 바뀌는 생성 시각)
+
+
+class CachedBody:
+    """캐시에 저장하는 응답 (직렬화된 본문 + 압축본 + ETag)"""
+    __slots__ = ("body", "gzipped", "etag", "status", "mimetype")
+
+    def __init__(self, body, gzipped, etag, status, mimetype):
+        self.body = body
+        self.gzipped = gzipped
+        self.etag = etag
+        self.status = status
+        self.mimetype = mimetype
+
+
+def content_etag(payload):
+    """생성 시각을 제외한 내용 기준 ETag
+
+    timestamp만 바뀐 응답은 같은 ETag를 갖게 해서 304로 처리한다.
+    """
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items() if k not in VOLATILE_KEYS}
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def serialize_payload(payload, status=200):
+    """dict 등 JSON 값을 CachedBody로 직렬화"""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+    return CachedBody(body, gzipped, content_etag(payload), status, "application/json")
+
+
+def serialize_response(response):
+    """Flask 응답을 CachedBody로 변환 (JSON이 아니면 본문 해시로 ETag)"""
+    payload = response.get_json(silent=True)
+    if payload is not None:
+        return serialize_payload(payload, response.status_code)
+
+    body = response.get_data()
+    etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+    gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+    return CachedBody(body, gzipped, etag, response.status_code, response.mimetype)
+
+
+def build_response(cached, request):
+    """요청 헤더에 맞춰 304 / gzip / 일반 응답 생성"""
+    if cached.status == 200 and request.if_none_match.contains(cached.etag):
+        response = Response(status=304)
+    elif cached.gzipped is not None and "gzip" in request.accept_encodings:
+        response = Response(cached.gzipped, status=cached.status, mimetype=cached.mimetype)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(cached.body, status=cached.status, mimetype=cached.mimetype)
+
+    if cached.status == 200:
+        response.set_etag(cached.etag)
+        # 브라우저가 매번 If-None-Match로 재검증하도록
+        response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
@@ -1,33 +1,142 @@
 #!/usr/bin/env python3
 """실시간 버스 데이터 수집기 - 10분 간격 패턴 분석용"""
-import json
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from datetime import datetime
-from seoul_api import get_bus_arrival_info
+from station_snapshot import STATIONS, get_merged_snapshot
+from bus_state import StationSnapshot
+from registry import get_registry
 from weather_api import get_weather_data
 from traffic_data import calculate_headway_pattern
 from ml_model import predict_congestion
 from event_calendar import calculate_event_impact
 from road_traffic import get_traffic_info
 from occupancy_analysis import analyze_bus_occupancy
-from pathlib import Path
+import history_log
+import history_meta
+import history_rollup
+import slot_stats
+import history_store
+import quota
 
-def collect_realtime_data():
-    """실시간 버스 데이터 수집"""
+COLLECT_DEADLINE = 20  # 틱 하나의 전체 수집 제한 시간(초)
+TIMEOUT_ERROR = {"error": "수집 시간 초과"}
+BUSY_ERROR = {"error": "이전 틱의 조회가 아직 진행 중"}
+ROUTE_NAMES = get_registry().route_names
+
+# 틱마다 스레드를 새로 만들지 않도록 재사용
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="collect")
+# 소스별 마지막 조회 - 제한 시간이 지나도 작업은 계속 돌기 때문에, 아직 끝나지 않았으면
+# 다음 틱에 다시 넣지 않아서 느린 업스트림이 풀을 채우지 않게 함 (소스당 최대 1개)
+_running = {}
+
+
+def _submit(name, func, *args, **kwargs):
+    """소스 조회 시작 (이전 조회가 아직 실행 중이면 None)"""
+    previous = _running.get(name)
+    if previous is not None and not previous.done():
+        return None
+    _running[name] = future = _executor.submit(func, *args, **kwargs)
+    return future
+
+
+def _fetch_sources_sequential():
+    """소스를 하나씩 순서대로 조회 (디버깅용)"""
+    # 도착정보는 틱당 1회만 조회해서 배차간격/승객 수 분석에 공유 (정류장들은 동시에)
+    data = get_merged_snapshot(refresh=True)
+    results = {
+        "arrivals": data,
+        "weather": get_weather_data(),
+        "traffic": calculate_headway_pattern(data),
+        "events": calculate_event_impact(),
+        "road_traffic": get_traffic_info(),
+        "occupancy": analyze_bus_occupancy(data),
+    }
+    results["prediction"] = _predict(results)
+    return results
+
+
+def _predict(results):
+    """이번 틱에 수집한 날씨/배차/이벤트/도로 정보로 혼잡도 예측 (로컬 계산)"""
+    try:
+        return predict_congestion(
+            weather=results["weather"],
+            traffic=results["traffic"],
+            events=results["events"],
+            road_traffic=results["road_traffic"],
+        )
+    except Exception as e:
+        print(f"  [prediction] 예측 실패: {e}")
+        return {"error": str(e)}
+
+
+def _fetch_sources_concurrent(deadline=COLLECT_DEADLINE):
+    """독립적인 소스를 병렬로 조회
+
+    전체 제한 시간 안에 끝나지 않은 소스는 해당 필드만 오류로 표시하고
+    나머지 결과로 기록을 만든다. 배차간격과 승객 수는 도착정보에서
+    계산하므로 도착정보가 끝난 뒤 바로 이어서 처리하고, 혼잡도 예측은
+    모든 소스가 모인 뒤 그 값으로 계산한다.
+    이전 틱에서 시간 초과된 조회가 아직 돌고 있으면 그 소스는 이번 틱에 건너뛴다.
+    """
+    end_time = time.monotonic() + deadline
+    futures = {
+        "arrivals": _submit("arrivals", get_merged_snapshot, refresh=True),
+        "weather": _submit("weather", get_weather_data),
+        "events": _submit("events", calculate_event_impact),
+        "road_traffic": _submit("road_traffic", get_traffic_info),
+    }
+
+    def result_of(name):
+        if futures[name] is None:
+            print(f"  [{name}] 이전 조회가 아직 진행 중이라 건너뜀")
+            return dict(BUSY_ERROR)
+        try:
+            return futures[name].result(timeout=max(end_time - time.monotonic(), 0))
+        except FuturesTimeout:
+            print(f"  [{name}] 수집 시간 초과")
+            return dict(TIMEOUT_ERROR)
+        except Exception as e:
+            print(f"  [{name}] 수집 실패: {e}")
+            return {"error": str(e)}
+
+    results = {}
+    results["arrivals"] = data = result_of("arrivals")
+    results["traffic"] = calculate_headway_pattern(data)
+    results["occupancy"] = analyze_bus_occupancy(data)
+    for name in ("weather", "events", "road_traffic"):
+        results[name] = result_of(name)
+    results["prediction"] = _predict(results)
+    return results
+
+
+def collect_realtime_data(concurrent=True, deadline=COLLECT_DEADLINE):
+    """실시간 버스 데이터 수집
+
+    concurrent: True면 소스를 병렬로 조회 (deadline초 안에 끝나지 않은 소스는 누락 처리)
+    """
     now = datetime.now()
     timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
     weekday = now.weekday()  # 0=월요일, 6=일요일
     weekday_name = ['월', '화', '수', '목', '금', '토', '일'][weekday]
     
-    data = get_bus_arrival_info("03278")
-    weather = get_weather_data()
-    traffic = calculate_headway_pattern()
-    prediction = predict_congestion()
-    events = calculate_event_impact()
-    road_traffic = get_traffic_info()
-    occupancy = analyze_bus_occupancy()
+    if concurrent:
+        sources = _fetch_sources_concurrent(deadline)
+    else:
+        sources = _fetch_sources_sequential()
+    
+    data = sources["arrivals"]
+    weather = sources["weather"]
+    traffic = sources["traffic"]
+    prediction = sources["prediction"]
+    events = sources["events"]
+    road_traffic = sources["road_traffic"]
+    occupancy = sources["occupancy"]
     
-    if "buses" in data:
+    if isinstance(data, StationSnapshot):
+        # 기록은 기존 JSON 모양으로 (분석 단계는 같은 스냅샷 객체를 공유)
+        if isinstance(occupancy, StationSnapshot):
+            occupancy = occupancy.occupancy_dict()
         result = {
             "timestamp": timestamp,
             "hour": now.hour,
@@ -41,18 +150,38 @@ def collect_realtime_data():
             "events": events,
             "road_traffic": road_traffic,
             "occupancy": occupancy,
-            "buses": data["buses"]
+            "stations": list(STATIONS),
+            "buses": data.to_dict()["buses"]
         }
+        if data.errors:
+            result["station_errors"] = data.errors
+        
+        history_log.append_record(result)
         
-        data_file = Path("realtime_data.jsonl")
-        with open(data_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        # 이력 메타데이터(건수/기간)·집계와 분석용 컬럼 저장소 갱신
+        # (단계마다 따로 처리해서 하나가 실패해도 나머지와 수집은 계속)
+        for name, update in (
+            ("메타데이터", history_meta.update_meta),
+            ("요약 집계", history_rollup.update_rollup),
+            ("슬롯 통계", slot_stats.update_slot_stats),
+            ("컬럼 저장소", lambda: history_store.append_record(result)),
+        ):
+            try:
+                update()
+            except Exception as e:
+                print(f"  이력 {name} 갱신 실패: {e}")
+        # 날짜가 바뀌었으면 지난 파티션 압축 (집계에 반영한 뒤에)
+        try:
+            for date in history_log.compress_closed():
+                print(f"  {date} 이력 압축 완료")
+        except Exception as e:
+            print(f"  이력 압축 실패: {e}")
         
         print(f"[{timestamp} {weekday_name}] 수집 완료")
         if "weather" in result and not result["weather"].get("error"):
             weather_info = result["weather"]
             print(f"  날씨: {weather_info['weather']} {weather_info['temperature']}°C (영향도: {weather_info['impact_factor']}배)")
-        if "prediction" in result:
+        if "error" not in result["prediction"]:
             pred_info = result["prediction"]
             print(f"  AI 예측: {pred_info['predicted_congestion']}배 (신뢰도: {pred_info['confidence']*100:.0f}%)")
         if "occupancy" in result and "buses" in result["occupancy"]:
@@ -60,51 +189,59 @@ def collect_realtime_data():
             for bus_info in occ_info:
                 passengers = bus_info["bus1_passengers"]
                 print(f"  {bus_info['route']}번: {passengers}명 탑승 - {bus_info['bus1_comfort']}")
-        if "events" in result and result["events"]["events"]:
+        if result["events"].get("events"):
             event_info = result["events"]
             print(f"  이벤트: {event_info['recommendation']}")
-        if "road_traffic" in result:
+        if "error" not in result["road_traffic"]:
             road_info = result["road_traffic"]
             print(f"  도로: {road_info['total_impact']}배 ({len(road_info['congested_roads'])}개 혼잡)")
-        if "traffic" in result:
+        if "error" not in result["traffic"]:
             traffic_info = result["traffic"]
             for route, info in traffic_info.items():
                 if "error" not in info:
                     print(f"  {route}번 배차: {info['estimated_headway']}분 간격")
-        for bus in data["buses"]:
-            print(f"  {bus['route']}번: {bus['arrival1']}")
+        for bus in data.routes:
+            print(f"  [{bus.station}] {bus.route}번 {bus.direction}: {bus.vehicles[0].message}")
+        for station, error in data.errors.items():
+            print(f"  [{station}] 조회 실패: {error}")
     else:
         print(f"[{timestamp} {weekday_name}] 실패: {data}")
 
 def analyze_weekday_patterns():
-    """요일별 패턴 분석"""
-    data_file = Path("realtime_data.jsonl")
-    if not data_file.exists():
+    """요일별 패턴 분석 (요약 집계에서 시간대별로 합산)"""
+    rollup = history_rollup.load_rollup()
+    if not rollup["routes"]:
         print("수집된 데이터가 없습니다")
         return {}
     
     # 요일별 시간대별 패턴
     weekday_patterns = {}  # {weekday: {hour: {route: count}}}
     
-    with open(data_file, encoding="utf-8") as f:
-        for line in f:
-            data = json.loads(line)
-            weekday = data.get("weekday", 0)
-            weekday_name = data.get("weekday_name", "?")
-            hour = data["hour"]
-            
-            if weekday not in weekday_patterns:
-                weekday_patterns[weekday] = {}
-            if hour not in weekday_patterns[weekday]:
-                weekday_patterns[weekday][hour] = {"421": 0, "400": 0, "405": 0}
-            
-            for bus in data["buses"]:
-                route = bus["route"]
-                if route in weekday_patterns[weekday][hour]:
-                    weekday_patterns[weekday][hour][route] += 1
+    for weekday, slot, route, cell in history_rollup.iter_route_cells(rollup):
+        hour = slot * history_rollup.SLOT_MINUTES // 60
+        hours = weekday_patterns.setdefault(weekday, {})
+        if hour not in hours:
+            hours[hour] = dict.fromkeys(ROUTE_NAMES, 0)
+        if route in hours[hour]:
+            hours[hour][route] += cell[history_rollup.COUNT]
     
     return weekday_patterns
 
+def analyze_collected_data():
+    """10분 슬롯별 노선 관측 횟수 {"HH:MM": {route: count}} (전체 요일 합산)"""
+    rollup = history_rollup.load_rollup()
+    patterns = {}
+    for _, slot, route, cell in history_rollup.iter_route_cells(rollup):
+        label = history_rollup.slot_label(slot)
+        if label not in patterns:
+            patterns[label] = dict.fromkeys(ROUTE_NAMES, 0)
+        if route in patterns[label]:
+            patterns[label][route] += cell[history_rollup.COUNT]
+    return patterns
+
+def _format_counts(counts):
+    return ", ".join(f"{route}번 {count}회" for route, count in counts.items())
+
 def compare_weekday_weekend():
     """평일 vs 주말 패턴 비교"""
     patterns = analyze_weekday_patterns()
@@ -119,18 +256,18 @@ def compare_weekday_weekend():
         
         for hour, routes in hours.items():
             if hour not in target:
-                target[hour] = {"421": 0, "400": 0, "405": 0}
+                target[hour] = dict.fromkeys(ROUTE_NAMES, 0)
             for route, count in routes.items():
                 target[hour][route] += count
     
     print("=== 평일 vs 주말 패턴 비교 ===")
     print("\n평일 (월-금):")
     for hour in sorted(weekday_data.keys()):
-        print(f"{hour:02d}시: 421번 {weekday_data[hour]['421']}회, 400번 {weekday_data[hour]['400']}회")
+        print(f"{hour:02d}시: {_format_counts(weekday_data[hour])}")
     
     print("\n주말 (토-일):")
     for hour in sorted(weekend_data.keys()):
-        print(f"{hour:02d}시: 421번 {weekend_data[hour]['421']}회, 400번 {weekend_data[hour]['400']}회")
+        print(f"{hour:02d}시: {_format_counts(weekend_data[hour])}")
     
     return weekday_data, weekend_data
 
@@ -143,27 +280,36 @@ def generate_10min_chart_data():
     
     print("=== 10분 간격 버스 운행 패턴 ===")
     for slot in sorted(patterns.keys()):
-        print(f"{slot}: 421번 {patterns[slot]['421']}회, 400번 {patterns[slot]['400']}회")
+        print(f"{slot}: {_format_counts(patterns[slot])}")
     
     # JavaScript 차트 데이터 형태로 출력
     slots = sorted(patterns.keys())
-    data_421 = [patterns[slot]["421"] for slot in slots]
-    data_400 = [patterns[slot]["400"] for slot in slots]
     
     print(f"\nJavaScript 차트 데이터:")
     print(f"labels: {slots}")
-    print(f"421번 data: {data_421}")
-    print(f"400번 data: {data_400}")
+    for route in ROUTE_NAMES:
+        print(f"{route}번 data: {[patterns[slot][route] for slot in slots]}")
 
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) > 1 and sys.argv[1] == "start":
-        print("10분 간격 데이터 수집 시작...")
+        interval = int(sys.argv[2]) if len(sys.argv) > 2 else 600  # 기본 10분
+        print(f"{interval}초 간격 데이터 수집 시작...")
+        # 정기 수집은 웹서버의 선제 갱신보다 먼저 호출 한도를 씀
+        quota.set_default_priority(quota.COLLECTOR)
+        # 수집에 걸린 시간만큼 밀리지 않도록 고정된 틱 시각에 맞춰 실행
+        next_tick = time.monotonic()
         while True:
             collect_realtime_data()
-            print("10분 대기 중...")
-            time.sleep(600)  # 10분
+            next_tick += interval
+            wait = next_tick - time.monotonic()
+            if wait < 0:
+                # 수집이 간격보다 오래 걸리면 밀린 틱은 건너뜀
+                next_tick += (-wait // interval + 1) * interval
+                wait = next_tick - time.monotonic()
+            print(f"{wait:.0f}초 대기 중...")
+            time.sleep(wait)
     elif len(sys.argv) > 1 and sys.argv[1] == "analyze":
         compare_weekday_weekend()
     elif len(sys.argv) > 1 and sys.argv[1] == "weekday":
@@ -177,6 +323,6 @@ if __name__ == "__main__":
         print("1회 테스트:")
         collect_realtime_data()
         print("\n사용법:")
-        print("  python3 collect_data.py start    # 지속 수집")
+        print("  python3 collect_data.py start [초]  # 지속 수집 (기본 600초 간격)")
         print("  python3 collect_data.py analyze  # 평일/주말 비교")
         print("  python3 collect_data.py weekday  # 요일별 상세")
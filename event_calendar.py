@@ -33,7 +33,11 @@ MAJOR_EVENTS = {
 
 def get_today_events():
     """오늘의 이벤트 확인"""
-    today = date.today().strftime("%Y-%m-%d")
+    return get_events_for(date.today())
+
+def get_events_for(day):
+    """특정 날짜의 이벤트 확인"""
+    today = day.strftime("%Y-%m-%d")
     events = []
     
     # 공휴일 확인
@@ -87,9 +91,9 @@ def get_week_events():
     
     return week_events
 
-def calculate_event_impact():
-    """이벤트 기반 교통 영향도 계산"""
-    events = get_today_events()
+def calculate_event_impact(day=None):
+    """이벤트 기반 교통 영향도 계산 (day가 없으면 오늘)"""
+    events = get_events_for(day) if day is not None else get_today_events()
     
     if not events:
         return {
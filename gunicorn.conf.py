@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""gunicorn 설정 - 프로덕션 실행용 (gunicorn -c gunicorn.conf.py server:app)
+
+무중단 배포: 코드 변경은 preload 때문에 HUP으로 반영되지 않으므로
+`kill -USR2 <master>`로 새 마스터를 띄운 뒤 `kill -QUIT <old master>`로 옛 워커를 정리한다.
+설정/워커 수만 바꿀 때는 `kill -HUP <master>`로 충분하다.
+"""
+import multiprocessing
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# I/O 대기가 대부분이므로 스레드 워커 사용 (SSE 연결 하나가 스레드 하나를 점유하므로
+# 워커당 SSE 연결은 MAX_STREAMS개(기본 8)로 제한해서 나머지 스레드를 일반 요청에 남겨둠)
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 4)))
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+
+# 앱을 마스터에서 한 번만 임포트하고 fork (메모리 공유, 워커 기동 빠름)
+preload_app = True
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# 메모리 누수 대비 워커 주기적 교체 (동시에 재시작되지 않도록 지터)
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+# 워커 간 공유 캐시 파일 (앱 임포트 전에 설정되어야 함)
+os.environ.setdefault(
+    "SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "anzagaza-cache.sqlite3")
+)
+
+
+def post_fork(server, worker):
+    """워커마다 백그라운드 갱신 시작 (리더 워커만 업스트림 조회)
+
+    스레드는 fork 후에 띄워야 하므로 preload된 마스터가 아니라 여기서 시작한다.
+    """
+    from server import start_background_refresh
+    start_background_refresh()
+
+
+def worker_exit(server, worker):
+    from server import refresher
+    refresher.stop()
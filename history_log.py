@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""수집 이력 일별 파티션 - JSONL 쓰기, 지난 날짜 압축, 구간 읽기
+
+수집 기록은 realtime_data/YYYY-MM-DD.jsonl 에 날짜별로 추가하고, 날짜가 지나면
+gzip(zstandard 패키지가 있으면 zstd)으로 압축한다. 파티션 도입 전의
+realtime_data.jsonl 도 가장 오래된 파티션으로 함께 읽는다.
+
+압축 전 파티션에는 희소 인덱스(<파일>.idx)가 붙는다. INDEX_STRIDE 바이트마다 한 줄씩
+"시각\\t위치"를 기록해서, 구간 읽기는 시작 시각 직전 위치로 바로 이동한다.
+기록은 시간순으로 추가된다고 가정한다 (수집기가 순서대로 추가).
+"""
+import bisect
+import fcntl
+import gzip
+import io
+import json
+import os
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DATA_DIR = Path("realtime_data")             # 일별 파티션 디렉터리
+LEGACY_FILE = Path("realtime_data.jsonl")    # 파티션 도입 전 단일 파일 (읽기 전용)
+INDEX_STRIDE = 64 * 1024  # 인덱스 간격(바이트) - 구간 읽기 시 더 읽는 양의 상한
+COMPRESSED_SUFFIX = ".zst" if zstandard else ".gz"
+
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+_TS_PREFIX = b'{"timestamp": "'   # 수집기가 쓰는 줄의 시작 (json.dumps 기본 구분자)
+_TS_END = len(_TS_PREFIX) + 19     # "YYYY-MM-DD HH:MM:SS" 끝 위치
+
+_cache = {}  # 인덱스 경로 → (stamp, timestamps, offsets)
+_cache_lock = threading.Lock()
+
+
+class Partition:
+    """이력 파일 하나 (date가 None이면 여러 날짜가 섞인 예전 단일 파일)"""
+    __slots__ = ("key", "date", "path", "compressed")
+
+    def __init__(self, key, date, path, compressed):
+        self.key = key
+        self.date = date
+        self.path = path
+        self.compressed = compressed
+
+
+def _to_timestamp(value):
+    """datetime/문자열 → 기록과 같은 형식의 시각 문자열 (문자열 비교 = 시간 비교)"""
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime(_TS_FORMAT)
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def partition_path(date, data_dir=DATA_DIR):
+    return Path(data_dir) / f"{date}.jsonl"
+
+
+def list_partitions(start=None, end=None, data_dir=DATA_DIR, legacy_file=LEGACY_FILE):
+    """날짜순 파티션 목록 (start/end가 있으면 해당 날짜 파티션만)"""
+    start, end = _to_timestamp(start), _to_timestamp(end)
+    by_date = {}
+    if Path(data_dir).is_dir():
+        for entry in os.scandir(data_dir):
+            name = entry.name
+            date = name[:10]
+            if name == f"{date}.jsonl":
+                by_date.setdefault(date, Partition(date, date, Path(entry.path), False))
+            elif name in (f"{date}.jsonl.gz", f"{date}.jsonl.zst"):
+                # 압축 중 중단되어 둘 다 있으면 압축본(원자적으로 생성됨)을 사용
+                by_date[date] = Partition(date, date, Path(entry.path), True)
+
+    partitions = []
+    if legacy_file is not None and Path(legacy_file).exists():
+        partitions.append(Partition(Path(legacy_file).name, None, Path(legacy_file), False))
+    for date in sorted(by_date):
+        if start is not None and date < start[:10]:
+            continue
+        if end is not None and date > end[:10]:
+            continue
+        partitions.append(by_date[date])
+    return partitions
+
+
+@contextmanager
+def open_partition(partition):
+    """파티션을 바이너리 읽기용으로 열기 (압축본은 풀면서 읽음)"""
+    suffix = partition.path.suffix
+    if suffix == ".gz":
+        with gzip.open(partition.path, "rb") as f:
+            yield f
+    elif suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{partition.path}: zstandard 패키지가 필요합니다")
+        with open(partition.path, "rb") as raw:
+            with zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+                yield io.BufferedReader(reader)
+    else:
+        with open(partition.path, "rb") as f:
+            yield f
+
+
+# ============ 인덱스 ============
+
+def _index_path(data_file):
+    return Path(str(data_file) + ".idx")
+
+
+def _read_index(data_file):
+    """인덱스 읽기 → (시각 리스트, 위치 리스트), 바뀌었을 때만 다시 파싱"""
+    path = _index_path(data_file)
+    stamp = _stamp(path)
+    if stamp is None:
+        return [], []
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1], cached[2]
+    timestamps, offsets = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            timestamp, offset = line.rstrip("\n").split("\t")
+            timestamps.append(timestamp)
+            offsets.append(int(offset))
+    with _cache_lock:
+        _cache[path] = (stamp, timestamps, offsets)
+    return timestamps, offsets
+
+
+def update_index(data_file):
+    """마지막 인덱스 위치 이후를 훑어서 INDEX_STRIDE마다 항목 추가
+
+    추가분(+최대 INDEX_STRIDE)만 읽으며, 데이터 파일이 교체되어 줄었으면 처음부터 다시 만든다.
+    """
+    data_stamp = _stamp(data_file)
+    if data_stamp is None:
+        raise FileNotFoundError(data_file)  # 압축되어 지워진 파티션에 인덱스를 만들지 않도록
+    data_size = data_stamp[1]
+    path = _index_path(data_file)
+
+    with open(path, "a+", encoding="utf-8") as index_file:
+        fcntl.flock(index_file, fcntl.LOCK_EX)
+        try:
+            timestamps, offsets = _read_index(data_file)
+            if offsets and offsets[-1] >= data_size:
+                index_file.truncate(0)
+                timestamps, offsets = [], []
+            if not data_size:
+                return
+
+            position = offsets[-1] if offsets else 0
+            last_indexed = position if offsets else None
+            entries = []
+            with open(data_file, "rb") as f:
+                f.seek(position)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # 쓰는 중인 마지막 줄은 다음에 반영
+                    if last_indexed is None or position - last_indexed >= INDEX_STRIDE:
+                        try:
+                            timestamp = json.loads(line)["timestamp"]
+                        except (json.JSONDecodeError, KeyError, TypeError):
+                            timestamp = None
+                        if timestamp:
+                            entries.append(f"{timestamp}\t{position}\n")
+                            last_indexed = position
+                    position += len(line)
+
+            if entries:
+                index_file.write("".join(entries))
+                index_file.flush()
+        finally:
+            fcntl.flock(index_file, fcntl.LOCK_UN)
+
+
+def rebuild_index(data_file):
+    _index_path(data_file).unlink(missing_ok=True)
+    update_index(data_file)
+
+
+# ============ 쓰기 ============
+
+def append_record(record, data_dir=DATA_DIR):
+    """기록 1건을 해당 날짜 파티션 끝에 추가하고 인덱스 갱신"""
+    path = partition_path(record["timestamp"][:10], data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    update_index(path)
+    return path
+
+
+def _compress_file(source, target):
+    tmp = target.with_name(target.name + ".tmp")
+    with open(source, "rb") as src, open(tmp, "wb") as raw:
+        if target.suffix == ".zst":
+            with zstandard.ZstdCompressor(level=10).stream_writer(raw) as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9) as dst:
+                shutil.copyfileobj(src, dst)
+    os.replace(tmp, target)  # 읽는 쪽이 반쯤 쓴 파일을 보지 않도록
+
+
+def compress_closed(today=None, data_dir=DATA_DIR):
+    """오늘 이전 날짜의 압축 전 파티션을 압축하고 원본/인덱스 삭제, 압축한 날짜 목록 반환"""
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    compressed = []
+    for partition in list_partitions(data_dir=data_dir, legacy_file=None):
+        if partition.date >= today:
+            continue
+        plain = partition_path(partition.date, data_dir)
+        if not partition.compressed:
+            _compress_file(plain, plain.with_name(plain.name + COMPRESSED_SUFFIX))
+            compressed.append(partition.date)
+        plain.unlink(missing_ok=True)
+        _index_path(plain).unlink(missing_ok=True)
+    return compressed
+
+
+def split_legacy(legacy_file=LEGACY_FILE, data_dir=DATA_DIR):
+    """예전 단일 JSONL을 일별 파티션으로 나누기 (원본은 .migrated로 이름 변경)"""
+    count = 0
+    with open(legacy_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                date = json.loads(line)["timestamp"][:10]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+            path = partition_path(date, data_dir)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as out:
+                out.write(line if line.endswith("\n") else line + "\n")
+            count += 1
+    os.replace(legacy_file, str(legacy_file) + ".migrated")
+    _index_path(legacy_file).unlink(missing_ok=True)
+    for partition in list_partitions(data_dir=data_dir, legacy_file=None):
+        if not partition.compressed:
+            rebuild_index(partition.path)
+    return count
+
+
+# ============ 읽기 ============
+
+def _peek_timestamp(line):
+    """JSON을 풀지 않고 줄 맨 앞의 timestamp 읽기 (수집기가 쓴 형식이 아니면 None)"""
+    if line.startswith(_TS_PREFIX) and line[_TS_END:_TS_END + 1] == b'"':
+        return line[len(_TS_PREFIX):_TS_END].decode("ascii", "replace")
+    return None
+
+
+def _project(record, fields):
+    return {name: record[name] for name in fields if name in record}
+
+
+def _read_partition(partition, start, end, fields=None):
+    """파티션 하나에서 start <= timestamp < end 인 기록 (end에 도달하면 True 반환)"""
+    position = 0
+    if start is not None and not partition.compressed:
+        update_index(partition.path)  # 인덱스 이후에 추가된 줄 반영 (추가분만 읽음)
+        timestamps, offsets = _read_index(partition.path)
+        # start 이전(또는 같은) 시각의 마지막 인덱스 항목부터 읽기
+        i = bisect.bisect_right(timestamps, start) - 1
+        if i >= 0:
+            position = offsets[i]
+
+    with open_partition(partition) as f:
+        if position:
+            f.seek(position)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # 쓰는 중인 마지막 줄
+            # 시간 조건은 가능하면 JSON을 풀기 전에 확인 (범위 밖 줄은 파싱하지 않음)
+            timestamp = _peek_timestamp(line)
+            if timestamp is not None:
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp >= end:
+                    return True
+            try:
+                record = json.loads(line)
+                if timestamp is None:
+                    timestamp = record["timestamp"]
+                    if start is not None and timestamp < start:
+                        continue
+                    if end is not None and timestamp >= end:
+                        return True
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+            yield _project(record, fields) if fields else record
+    return False
+
+
+def read_range(start=None, end=None, data_dir=DATA_DIR, legacy_file=LEGACY_FILE, fields=None):
+    """start <= timestamp < end 인 기록을 시간순으로 반환하는 제너레이터
+
+    start/end: datetime 또는 "YYYY-MM-DD HH:MM:SS" 문자열 (None이면 제한 없음)
+    fields: 남길 최상위 필드 목록 (없으면 기록 전체)
+    해당 날짜의 파티션만 열고, 깨진 줄과 쓰는 중인 마지막 줄은 건너뛴다.
+    """
+    start, end = _to_timestamp(start), _to_timestamp(end)
+    for partition in list_partitions(start, end, data_dir, legacy_file):
+        try:
+            past_end = yield from _read_partition(partition, start, end, fields)
+        except FileNotFoundError:
+            # 목록을 만든 뒤 압축되어 원본이 지워졌으면 압축본으로 다시 읽기
+            retry = [p for p in list_partitions(data_dir=data_dir, legacy_file=None)
+                     if p.date == partition.date and p.compressed]
+            if partition.date is None or not retry:
+                raise
+            past_end = yield from _read_partition(retry[0], start, end, fields)
+        if past_end and partition.date is not None:
+            break
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "split":
+        count = split_legacy()
+        print(f"{count}건을 {DATA_DIR}/ 일별 파티션으로 나눔")
+    elif len(sys.argv) > 1 and sys.argv[1] == "compress":
+        dates = compress_closed()
+        print(f"압축: {', '.join(dates) if dates else '없음'}")
+    elif len(sys.argv) > 3 and sys.argv[1] == "range":
+        count = sum(1 for _ in read_range(sys.argv[2], sys.argv[3]))
+        print(f"{sys.argv[2]} ~ {sys.argv[3]}: {count}건")
+    else:
+        for partition in list_partitions():
+            size = partition.path.stat().st_size
+            print(f"  {partition.path} ({size / 1024:.1f}KB{', 압축' if partition.compressed else ''})")
+        print("\n사용법:")
+        print("  python3 history_log.py split                  # 예전 realtime_data.jsonl을 일별로 나누기")
+        print("  python3 history_log.py compress               # 지난 날짜 파티션 압축")
+        print('  python3 history_log.py range "시작" "끝"       # 구간 기록 수 (YYYY-MM-DD HH:MM:SS)')
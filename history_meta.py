@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""수집 이력 메타데이터 - 건수/기간/요일별·시간별 건수를 추가 시점에 갱신"""
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import history_log
+
+META_FILE = Path("realtime_data.meta.json")
+
+
+def _empty_meta():
+    return {
+        "record_count": 0,
+        "first_timestamp": None,
+        "last_timestamp": None,
+        "per_weekday": [0] * 7,    # 0=월요일
+        "per_hour": [0] * 24,
+    }
+
+
+def _add_record(meta, record):
+    timestamp = record.get("timestamp")
+    weekday = record.get("weekday")
+    if weekday is None and timestamp:
+        weekday = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").weekday()
+
+    meta["record_count"] += 1
+    if timestamp:
+        if meta["first_timestamp"] is None:
+            meta["first_timestamp"] = timestamp
+        meta["last_timestamp"] = timestamp
+    if weekday is not None:
+        meta["per_weekday"][weekday] += 1
+    if "hour" in record:
+        meta["per_hour"][record["hour"]] += 1
+
+
+CLOSED = -1  # 압축된(더 이상 추가되지 않는) 파티션을 끝까지 반영했음
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _skip(f, count):
+    """앞의 count 바이트 건너뛰기 (zstd 스트림처럼 seek이 안 되는 파일은 읽어서 버림)"""
+    if f.seekable():
+        f.seek(count)
+        return
+    while count > 0:
+        chunk = f.read(min(count, 1 << 20))
+        if not chunk:
+            break
+        count -= len(chunk)
+
+
+@contextmanager
+def _file_lock(path):
+    """프로세스 간 잠금 (수집기와 웹 워커가 같은 집계 파일을 동시에 갱신하지 않도록)"""
+    with open(str(path) + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class IncrementalSidecar:
+    """수집 이력 옆에 두는 집계 파일 - 파티션별로 추가된 줄만 읽어서 갱신
+
+    empty(): 빈 집계 dict 생성 ("sizes" 키는 여기서 관리)
+    add_record(state, record): 기록 1건을 집계에 반영
+    """
+
+    def __init__(self, sidecar_file, empty, add_record,
+                 data_dir=history_log.DATA_DIR, legacy_file=history_log.LEGACY_FILE):
+        self.sidecar_file = sidecar_file
+        self.data_dir = data_dir
+        self.legacy_file = legacy_file
+        self._empty = empty
+        self._add_record = add_record
+        self._stamp = None
+        self._state = None
+        self._lock = threading.Lock()
+
+    def _new_state(self):
+        state = self._empty()
+        state["sizes"] = {}  # 파티션 → 집계에 반영된 바이트 수 (압축 후 끝까지 반영했으면 CLOSED)
+        return state
+
+    def _pending(self, state, partitions):
+        """반영할 파티션 목록 [(파티션, 반영된 바이트 수)], 처음부터 다시 만들어야 하면 None"""
+        sizes = state["sizes"]
+        if set(sizes) - {partition.key for partition in partitions}:
+            return None  # 지워진 파티션이 있음
+        pending = []
+        for partition in partitions:
+            done = sizes.get(partition.key, 0)
+            if partition.compressed:
+                if done != CLOSED:
+                    pending.append((partition, done))
+                continue
+            stamp = _stamp(partition.path)
+            size = stamp[2] if stamp else 0
+            if done == CLOSED or size < done:
+                return None  # 파일이 교체되었거나 줄었음
+            if size > done:
+                pending.append((partition, done))
+        return pending
+
+    def _catch_up(self, state, partition, done):
+        """done 바이트 이후의 완성된 줄만 읽어서 반영 (추가분만큼만 비용)"""
+        with history_log.open_partition(partition) as f:
+            if done:
+                _skip(f, done)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 쓰는 중인 마지막 줄은 다음에 반영
+                done += len(line)
+                try:
+                    self._add_record(state, json.loads(line))
+                except (json.JSONDecodeError, AttributeError, KeyError, IndexError, TypeError, ValueError):
+                    continue
+        state["sizes"][partition.key] = CLOSED if partition.compressed else done
+
+    def _save(self, state):
+        """임시 파일(쓰는 쪽마다 다른 이름)에 쓴 뒤 교체"""
+        path = Path(self.sidecar_file)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _read(self):
+        """집계 파일 읽기 (바뀌었을 때만 다시 파싱)"""
+        stamp = _stamp(self.sidecar_file)
+        if stamp is None:
+            return None
+        if self._stamp != stamp:
+            with open(self.sidecar_file, encoding="utf-8") as f:
+                self._state = json.load(f)
+            self._stamp = stamp
+        return self._state
+
+    def load(self):
+        """집계 반환
+
+        파티션 크기가 집계에 기록된 크기와 같으면 이력 파일을 열지 않는다.
+        줄이 추가됐으면 추가분만 읽어 반영하고(압축된 날짜는 한 번만 마저 읽음),
+        파티션이 지워졌거나 줄었거나 집계 파일이 없으면 처음부터 다시 만든다.
+        갱신은 잠금 파일로 프로세스 하나씩만 한다.
+        """
+        partitions = history_log.list_partitions(data_dir=self.data_dir, legacy_file=self.legacy_file)
+
+        with self._lock:
+            state = self._read()
+            pending = self._pending(state, partitions) if state and "sizes" in state else None
+            if pending == []:
+                return state
+            with _file_lock(self.sidecar_file):
+                return self._update(partitions)
+
+    def _update(self, partitions):
+        """(잠금 안에서) 다른 프로세스가 이미 반영했으면 그대로, 아니면 추가분 반영 후 저장"""
+        state = self._read()
+        pending = self._pending(state, partitions) if state and "sizes" in state else None
+        if pending == []:
+            return state
+
+        if pending is None:
+            state = self._new_state()
+            pending = [(partition, 0) for partition in partitions]
+        else:
+            state = json.loads(json.dumps(state))  # 캐시된 값을 건드리지 않도록 복사
+        for partition, done in pending:
+            try:
+                self._catch_up(state, partition, done)
+            except FileNotFoundError:
+                continue  # 읽는 사이 압축된 파티션은 다음에 압축본으로 반영
+
+        self._save(state)
+        self._state = state
+        self._stamp = _stamp(self.sidecar_file)
+        return state
+
+    def rebuild(self):
+        """집계 파일을 지우고 처음부터 다시 생성"""
+        with self._lock, _file_lock(self.sidecar_file):
+            Path(self.sidecar_file).unlink(missing_ok=True)
+            self._stamp = None
+            self._state = None
+        return self.load()
+
+
+def sidecar_api(default_file, empty, add_record):
+    """집계 파일 하나의 (load, rebuild) 함수 쌍 - 경로 조합마다 IncrementalSidecar 하나를 공유
+
+    load(): 집계 반환 (추가된 줄만 반영, 변화 없으면 파일을 열지 않음)
+            수집기가 줄을 추가한 직후 update_*로도 호출한다.
+    rebuild(): 집계를 처음부터 다시 생성
+    """
+    sidecars = {}
+
+    def sidecar(sidecar_file, data_dir, legacy_file):
+        key = (str(sidecar_file), str(data_dir), str(legacy_file))
+        if key not in sidecars:
+            sidecars[key] = IncrementalSidecar(sidecar_file, empty, add_record, data_dir, legacy_file)
+        return sidecars[key]
+
+    def load(sidecar_file=default_file, data_dir=history_log.DATA_DIR, legacy_file=history_log.LEGACY_FILE):
+        return sidecar(sidecar_file, data_dir, legacy_file).load()
+
+    def rebuild(sidecar_file=default_file, data_dir=history_log.DATA_DIR, legacy_file=history_log.LEGACY_FILE):
+        return sidecar(sidecar_file, data_dir, legacy_file).rebuild()
+
+    return load, rebuild
+
+
+load_meta, rebuild_meta = sidecar_api(META_FILE, _empty_meta, _add_record)
+update_meta = load_meta
+
+
+def data_version(meta=None):
+    """수집 이력 버전 문자열 (기록이 추가/교체되면 바뀜) - 파생 데이터 캐시 키로 사용"""
+    meta = meta if meta is not None else load_meta()
+    sizes = json.dumps(meta["sizes"], sort_keys=True)
+    return f"{meta['record_count']}-{hashlib.blake2b(sizes.encode(), digest_size=6).hexdigest()}"
+
+
+if __name__ == "__main__":
+    meta = rebuild_meta()
+    print(f"기록 수: {meta['record_count']}건")
+    print(f"기간: {meta['first_timestamp']} ~ {meta['last_timestamp']}")
+    weekday_names = ['월', '화', '수', '목', '금', '토', '일']
+    print("요일별: " + ", ".join(f"{weekday_names[i]} {n}" for i, n in enumerate(meta["per_weekday"])))
+    print("시간별: " + ", ".join(f"{h:02d}시 {n}" for h, n in enumerate(meta["per_hour"]) if n))
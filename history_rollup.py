@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""수집 이력 요약 집계 - 요일 × 10분 슬롯 × 노선별 건수/혼잡도/승객 수 합계
+
+수집기가 줄을 추가할 때마다 추가분만 반영하므로, 분석은 이력 길이와 무관하게
+이 집계만 읽으면 된다.
+"""
+from datetime import datetime
+from pathlib import Path
+
+from bus_state import congestion_code
+from history_meta import sidecar_api
+from passenger_estimate import estimate_passenger_count, get_bus_capacity
+
+ROLLUP_FILE = Path("realtime_data.rollup.json")
+SLOT_MINUTES = 10
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# 노선 셀: [관측 수, 혼잡도 합, 혼잡도 관측 수, 승객 수 합, 승객 수 관측 수]
+COUNT, CONGESTION_SUM, CONGESTION_N, PASSENGER_SUM, PASSENGER_N = range(5)
+
+
+def slot_of(hour, minute):
+    """시/분 → 10분 슬롯 번호 (0~143)"""
+    return hour * (60 // SLOT_MINUTES) + minute // SLOT_MINUTES
+
+
+def slot_label(slot):
+    """슬롯 번호 → "HH:MM" """
+    minutes = slot * SLOT_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _empty_rollup():
+    return {
+        "records": {},  # "요일:슬롯" → [수집 횟수, 버스 수 합]
+        "routes": {},   # "요일:슬롯:노선" → 노선 셀
+    }
+
+
+def _add_record(rollup, record):
+    now = datetime.strptime(record["timestamp"], "%Y-%m-%d %H:%M:%S")
+    weekday = record.get("weekday", now.weekday())
+    slot = slot_of(record.get("hour", now.hour), record.get("minute", now.minute))
+    buses = record.get("buses", [])
+
+    cell = rollup["records"].setdefault(f"{weekday}:{slot}", [0, 0])
+    cell[0] += 1
+    cell[1] += len(buses)
+
+    for bus in buses:
+        route = bus["route"]
+        cell = rollup["routes"].setdefault(f"{weekday}:{slot}:{route}", [0, 0, 0, 0, 0])
+        cell[COUNT] += 1
+        congestion = congestion_code(bus.get("congestion1"))
+        if congestion > 0:
+            cell[CONGESTION_SUM] += congestion
+            cell[CONGESTION_N] += 1
+            passengers = estimate_passenger_count(
+                congestion, get_bus_capacity(route), route, now=now
+            )["passengers"]
+            cell[PASSENGER_SUM] += passengers
+            cell[PASSENGER_N] += 1
+
+
+load_rollup, rebuild_rollup = sidecar_api(ROLLUP_FILE, _empty_rollup, _add_record)
+update_rollup = load_rollup
+
+
+def iter_record_cells(rollup):
+    """(요일, 슬롯, 수집 횟수, 버스 수 합)"""
+    for key, (records, buses) in rollup["records"].items():
+        weekday, slot = key.split(":")
+        yield int(weekday), int(slot), records, buses
+
+
+def iter_route_cells(rollup):
+    """(요일, 슬롯, 노선, 노선 셀)"""
+    for key, cell in rollup["routes"].items():
+        weekday, slot, route = key.split(":")
+        yield int(weekday), int(slot), route, cell
+
+
+if __name__ == "__main__":
+    rollup = rebuild_rollup()
+    records = sum(cell[2] for cell in iter_record_cells(rollup))
+    print(f"수집 {records}건 → 요일×슬롯 {len(rollup['records'])}칸, 노선 {len(rollup['routes'])}칸")
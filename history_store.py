@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""수집 이력 컬럼 저장소 - 고정 크기 세그먼트의 NumPy 배열 (memmap으로 로드)"""
+import fcntl
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import history_log
+from arrival_parser import parse_arrival
+from bus_state import LEGACY_STATION, congestion_code
+
+STORE_DIR = Path("history")
+SEGMENT_ROWS = 65536  # 세그먼트당 행 수 (버스 1대 도착 = 1행)
+
+# 컬럼 정의 (없는 값: 정수 -1, 실수 NaN)
+COLUMNS = {
+    "ts": np.int64,            # 수집 시각 (epoch 초, 로컬 시간 기준)
+    "station": np.int16,       # 정류장 ARS ID (사전 번호)
+    "route": np.int16,         # 노선 이름 (사전 번호)
+    "vehicle": np.int8,        # 1: 첫 번째 버스, 2: 두 번째 버스
+    "arrival_min": np.int16,   # 도착까지 남은 분 (곧 도착 = 0)
+    "stops_away": np.int16,    # 남은 정류장 수
+    "congestion": np.int8,     # 혼잡도 코드 (0: 정보없음, 1~4)
+    "temperature": np.float32,
+    "humidity": np.float32,
+    "is_raining": np.int8,     # 1/0 (날씨 정보 없음 = -1)
+    "is_snowing": np.int8,
+    "weather_impact": np.float32,
+    "event_impact": np.float32,
+    "traffic_impact": np.float32,
+    "headway": np.float32,     # 이 노선의 예상 배차 간격 (분)
+    "next_bus": np.float32,    # 이 노선의 다음 버스까지 (분)
+}
+# 문자열 컬럼은 메타데이터의 사전(meta["dictionary"][컬럼])에 넣고 번호만 저장
+# (레지스트리 설정에 따라 정류장/노선 이름의 길이와 문자가 정해져 있지 않음)
+DICTIONARY_COLUMNS = ("station", "route")
+
+def _factor(section, key):
+    """기록 안의 영향도 값 (오류/누락이면 NaN)"""
+    if not isinstance(section, dict) or "error" in section:
+        return np.nan
+    value = section.get(key)
+    return np.nan if value is None else float(value)
+
+
+def _flag(section, key):
+    """기록 안의 예/아니오 값 (오류/누락이면 -1)"""
+    if not isinstance(section, dict) or "error" in section:
+        return -1
+    return 1 if section.get(key) else 0
+
+
+def record_to_rows(record, station=LEGACY_STATION):
+    """수집 기록 1건 → 컬럼별 값 리스트 {컬럼: [값, ...]}"""
+    ts = int(datetime.strptime(record["timestamp"], "%Y-%m-%d %H:%M:%S").timestamp())
+    weather = record.get("weather")
+    traffic = record.get("traffic") or {}
+    shared = {
+        "temperature": _factor(weather, "temperature"),
+        "humidity": _factor(weather, "humidity"),
+        "is_raining": _flag(weather, "is_raining"),
+        "is_snowing": _flag(weather, "is_snowing"),
+        "weather_impact": _factor(weather, "impact_factor"),
+        "event_impact": _factor(record.get("events"), "impact_factor"),
+        "traffic_impact": _factor(record.get("road_traffic"), "total_impact"),
+    }
+
+    rows = {name: [] for name in COLUMNS}
+    for bus in record.get("buses", []):
+        headway = _factor(traffic.get(bus["route"]), "estimated_headway")
+        next_bus = _factor(traffic.get(bus["route"]), "next_bus")
+        for vehicle in (1, 2):
+            arrival = parse_arrival(bus.get(f"arrival{vehicle}"))
+            congestion = congestion_code(bus.get(f"congestion{vehicle}"))
+            rows["ts"].append(ts)
+            rows["station"].append(bus.get("station", station))
+            rows["route"].append(bus["route"])
+            rows["vehicle"].append(vehicle)
+            rows["arrival_min"].append(-1 if arrival.seconds is None else arrival.minutes)
+            rows["stops_away"].append(-1 if arrival.stops_away is None else arrival.stops_away)
+            rows["congestion"].append(congestion)
+            rows["headway"].append(headway)
+            rows["next_bus"].append(next_bus)
+            for name, value in shared.items():
+                rows[name].append(value)
+    return rows
+
+
+# ============ 메타데이터 / 잠금 ============
+
+def _meta_path(store_dir):
+    return Path(store_dir) / "meta.json"
+
+
+def load_meta(store_dir=STORE_DIR):
+    """세그먼트 목록 {segment_rows, segments: [{id, rows, ts_min, ts_max}], dictionary: {컬럼: [값]}}"""
+    path = _meta_path(store_dir)
+    if not path.exists():
+        return {"segment_rows": SEGMENT_ROWS, "segments": [], "dictionary": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _encode(meta, name, values):
+    """문자열 값들 → 사전 번호 (처음 보는 값은 사전에 추가)"""
+    words = meta.setdefault("dictionary", {}).setdefault(name, [])
+    index = {word: code for code, word in enumerate(words)}
+    codes = []
+    for value in values:
+        value = str(value)
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(words)
+            words.append(value)
+        codes.append(code)
+    return codes
+
+
+def _save_meta(meta, store_dir):
+    path = _meta_path(store_dir)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)  # 읽는 쪽이 반쯤 쓴 파일을 보지 않도록
+
+
+@contextmanager
+def _write_lock(store_dir):
+    Path(store_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(store_dir) / ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _segment_dir(store_dir, segment_id):
+    return Path(store_dir) / f"seg_{segment_id:05d}"
+
+
+def _open_segment(store_dir, segment_id, segment_rows, create=False):
+    """세그먼트 컬럼 파일을 memmap으로 열기 (create면 미리 할당)"""
+    seg_dir = _segment_dir(store_dir, segment_id)
+    if create:
+        seg_dir.mkdir(parents=True, exist_ok=True)
+    columns = {}
+    for name, dtype in COLUMNS.items():
+        path = seg_dir / f"{name}.npy"
+        if create and not path.exists():
+            columns[name] = np.lib.format.open_memmap(
+                path, mode="w+", dtype=dtype, shape=(segment_rows,)
+            )
+        else:
+            columns[name] = np.load(path, mmap_mode="r+" if create else "r")
+    return columns
+
+
+# ============ 쓰기 ============
+
+def _in_order(rows, last_ts):
+    """저장소 마지막 시각 이후이면서 시각이 줄어들지 않는 행만 남김
+
+    iter_segments()가 ts로 이진 탐색하므로 ts는 항상 오름차순이어야 한다.
+    이미 들어 있는 시각(수집기가 먼저 넣은 기록을 다시 가져오는 경우)과
+    앞 행보다 이른 행은 건너뛴다.
+    """
+    ts = np.asarray(rows["ts"], dtype=np.int64)
+    previous = np.maximum.accumulate(np.concatenate(([last_ts], ts)))[:-1]
+    keep = (ts > last_ts) & (ts >= previous)
+    if keep.all():
+        return rows
+    indices = np.flatnonzero(keep)
+    return {name: [values[i] for i in indices] for name, values in rows.items()}
+
+
+def append_rows(rows, store_dir=STORE_DIR):
+    """컬럼별 값 리스트를 저장소 끝에 추가 (세그먼트가 차면 다음 세그먼트 생성), 추가한 행 수 반환
+
+    저장소의 마지막 시각 이전 행과 순서가 어긋난 행은 추가하지 않는다.
+    """
+    if len(rows["ts"]) == 0:
+        return 0
+
+    with _write_lock(store_dir):
+        meta = load_meta(store_dir)
+        last_ts = meta["segments"][-1]["ts_max"] if meta["segments"] else None
+        rows = _in_order(rows, -1 if last_ts is None else last_ts)
+        total = len(rows["ts"])
+        if total == 0:
+            return 0
+        rows = dict(rows)
+        for name in DICTIONARY_COLUMNS:
+            rows[name] = _encode(meta, name, rows[name])
+        segment_rows = meta["segment_rows"]
+        written = 0
+        while written < total:
+            if not meta["segments"] or meta["segments"][-1]["rows"] >= segment_rows:
+                meta["segments"].append({
+                    "id": len(meta["segments"]), "rows": 0, "ts_min": None, "ts_max": None
+                })
+            segment = meta["segments"][-1]
+            columns = _open_segment(store_dir, segment["id"], segment_rows, create=True)
+
+            start = segment["rows"]
+            count = min(segment_rows - start, total - written)
+            for name, dtype in COLUMNS.items():
+                columns[name][start:start + count] = np.asarray(
+                    rows[name][written:written + count], dtype=dtype
+                )
+                columns[name].flush()
+
+            chunk_ts = rows["ts"][written:written + count]
+            segment["rows"] = start + count
+            segment["ts_min"] = int(chunk_ts[0]) if segment["ts_min"] is None else segment["ts_min"]
+            segment["ts_max"] = int(chunk_ts[-1])
+            written += count
+
+        _save_meta(meta, store_dir)
+    return total
+
+
+def append_record(record, station=LEGACY_STATION, store_dir=STORE_DIR):
+    """수집 기록 1건 추가"""
+    return append_rows(record_to_rows(record, station), store_dir)
+
+
+def import_history(records=None, station=LEGACY_STATION, store_dir=STORE_DIR, batch=1000):
+    """수집 이력을 저장소로 가져오기 (records가 없으면 전체 이력 파티션), 추가한 행 수 반환
+
+    저장소에 이미 있는 시각까지의 기록은 건너뛰므로 수집기가 돌던 중에 다시 실행해도 된다.
+    """
+    if records is None:
+        records = history_log.read_range()
+    appended = 0
+    count = 0
+    buffer = {name: [] for name in COLUMNS}
+    for record in records:
+        for name, values in record_to_rows(record, station).items():
+            buffer[name].extend(values)
+        count += 1
+        if count % batch == 0:
+            appended += append_rows(buffer, store_dir)
+            buffer = {name: [] for name in COLUMNS}
+    appended += append_rows(buffer, store_dir)
+    return appended
+
+
+def import_jsonl(jsonl_path, station=LEGACY_STATION, store_dir=STORE_DIR, batch=1000):
+    """JSONL 파일 하나를 저장소로 가져오기 (깨진 줄은 건너뜀)"""
+    def records():
+        with open(jsonl_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+    return import_history(records(), station, store_dir, batch)
+
+
+# ============ 읽기 ============
+
+def iter_segments(columns=None, start=None, end=None, store_dir=STORE_DIR):
+    """세그먼트별 {컬럼: memmap 슬라이스} (start <= ts < end, epoch 초)
+
+    파일을 파싱하지 않고 필요한 구간만 memmap으로 잘라서 준다.
+    station/route는 사전 번호 그대로이므로 decode()로 바꿔서 쓴다.
+    """
+    columns = list(columns or COLUMNS)
+    meta = load_meta(store_dir)
+    for segment in meta["segments"]:
+        if segment["rows"] == 0:
+            continue
+        if start is not None and segment["ts_max"] < start:
+            continue
+        if end is not None and segment["ts_min"] >= end:
+            continue
+
+        seg_dir = _segment_dir(store_dir, segment["id"])
+        ts = np.load(seg_dir / "ts.npy", mmap_mode="r")[:segment["rows"]]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = segment["rows"] if end is None else int(np.searchsorted(ts, end, side="left"))
+        if lo >= hi:
+            continue
+        yield {
+            name: (ts if name == "ts" else np.load(seg_dir / f"{name}.npy", mmap_mode="r"))[lo:hi]
+            for name in columns
+        }
+
+
+def decode(name, codes, meta=None, store_dir=STORE_DIR):
+    """사전 번호 배열 → 문자열 배열"""
+    meta = meta if meta is not None else load_meta(store_dir)
+    words = np.array(meta.get("dictionary", {}).get(name, []), dtype=str)
+    return words[codes] if len(codes) else np.empty(0, dtype=str)
+
+
+def load_columns(columns=None, start=None, end=None, store_dir=STORE_DIR):
+    """조건에 맞는 행을 컬럼별 배열로 합쳐서 반환 (station/route는 문자열로 풀어서)"""
+    columns = list(columns or COLUMNS)
+    parts = list(iter_segments(columns, start, end, store_dir))
+    meta = load_meta(store_dir)  # 세그먼트를 읽은 뒤의 사전 (사전은 늘어나기만 함)
+    result = {
+        name: (np.concatenate([part[name] for part in parts]) if parts
+               else np.empty(0, dtype=COLUMNS[name]))
+        for name in columns
+    }
+    for name in DICTIONARY_COLUMNS:
+        if name in result:
+            result[name] = decode(name, result[name], meta)
+    return result
+
+
+def row_count(store_dir=STORE_DIR):
+    return sum(segment["rows"] for segment in load_meta(store_dir)["segments"])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "import":
+        count = import_jsonl(sys.argv[2]) if len(sys.argv) > 2 else import_history()
+        print(f"{count}행 추가 → 총 {row_count()}행")
+    else:
+        meta = load_meta()
+        print(f"세그먼트: {len(meta['segments'])}개, 총 {row_count()}행")
+        for segment in meta["segments"]:
+            ts_min = datetime.fromtimestamp(segment["ts_min"]) if segment["ts_min"] else "-"
+            ts_max = datetime.fromtimestamp(segment["ts_max"]) if segment["ts_max"] else "-"
+            print(f"  seg_{segment['id']:05d}: {segment['rows']}행 ({ts_min} ~ {ts_max})")
+        print("\n사용법:")
+        print("  python3 history_store.py import [파일]  # 수집 이력(또는 JSONL 파일) 가져오기")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""공용 업스트림 HTTP 클라이언트 - 호스트별 커넥션 풀, 동시성 제한, 재시도, 호출 한도"""
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import quota
+
+logger = logging.getLogger(__name__)
+
+# 호스트별 설정
+# - connect/read: 시도 1회당 타임아웃(초)
+# - budget: 재시도를 포함한 전체 시간 예산(초)
+# - max_concurrent: 동시에 보낼 수 있는 요청 수 (= 커넥션 풀 크기)
+HOST_LIMITS = {
+    "ws.bus.go.kr": {"connect": 3, "read": 8, "budget": 15, "max_concurrent": 8},
+    "apis.data.go.kr": {"connect": 3, "read": 8, "budget": 15, "max_concurrent": 4},
+    "dapi.kakao.com": {"connect": 2, "read": 4, "budget": 6, "max_concurrent": 4},
+    "openapi.seoul.go.kr": {"connect": 3, "read": 10, "budget": 20, "max_concurrent": 2},
+}
+DEFAULT_LIMITS = {"connect": 3, "read": 10, "budget": 15, "max_concurrent": 4}
+
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.3          # 첫 재시도 대기(초), 이후 2배씩 증가
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_hosts = {}  # {host: (Session, Semaphore)}
+_hosts_lock = threading.Lock()
+
+
+def get_host_limits(host):
+    """호스트 설정 반환"""
+    return HOST_LIMITS.get(host, DEFAULT_LIMITS)
+
+
+def _get_host(host):
+    """호스트별 keep-alive 세션과 동시성 세마포어 (최초 1회 생성)"""
+    with _hosts_lock:
+        if host not in _hosts:
+            limits = get_host_limits(host)
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=limits["max_concurrent"],
+                max_retries=0,  # 재시도는 아래에서 직접 처리
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _hosts[host] = (session, threading.BoundedSemaphore(limits["max_concurrent"]))
+        return _hosts[host]
+
+
+def _backoff(attempt):
+    """지수 백오프 + full jitter"""
+    return random.uniform(0, RETRY_BACKOFF * (2 ** attempt))
+
+
+def get(url, params=None, headers=None, timeout=None, retries=MAX_RETRIES):
+    """GET 요청 (일시적 오류는 재시도)
+
+    timeout을 주면 호스트 기본 읽기 타임아웃 대신 사용한다.
+    재시도 후에도 실패하면 마지막 예외를 그대로 올리고,
+    재시도 대상 상태코드(5xx, 429)는 마지막 응답을 반환한다.
+    시간 예산 안에 동시 요청 자리가 나지 않으면 requests.exceptions.Timeout을 올린다.
+    params에 data.go.kr 인증키(serviceKey)가 있으면 시도마다 호출 한도 토큰을 꺼내고,
+    첫 시도부터 한도가 모자라면 quota.QuotaExceeded를 올린다.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    api_key = (params or {}).get("serviceKey")
+    limits = get_host_limits(host)
+    session, semaphore = _get_host(host)
+    read_timeout = timeout or limits["read"]
+    deadline = time.monotonic() + limits["budget"]
+
+    attempt = 0
+    while True:
+        if api_key:
+            try:
+                quota.acquire(api_key, host + parts.path)
+            except quota.QuotaExceeded:
+                if attempt == 0:
+                    raise
+                logger.warning(f"{host} 호출 한도 부족, 재시도 중단")
+                if error is not None:
+                    raise error
+                return response
+
+        # 동시 요청 자리도 시간 예산 안에서만 기다림
+        remaining = deadline - time.monotonic()
+        if not semaphore.acquire(timeout=max(remaining, 0)):
+            raise requests.exceptions.Timeout(f"{host} 동시 요청 자리 대기 시간 초과")
+        try:
+            response = session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=(limits["connect"], max(min(read_timeout, deadline - time.monotonic()), 0.5)),
+            )
+            if response.status_code not in RETRY_STATUS:
+                return response
+            error = None
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            response = None
+            error = e
+        finally:
+            semaphore.release()
+
+        delay = _backoff(attempt)
+        if attempt >= retries or time.monotonic() + delay >= deadline:
+            if error is not None:
+                raise error
+            return response
+
+        logger.warning(
+            f"{host} 요청 재시도 {attempt + 1}/{retries}: "
+            f"{error or response.status_code}"
+        )
+        time.sleep(delay)
+        attempt += 1
+
+
+def close():
+    """모든 커넥션 풀 닫기"""
+    with _hosts_lock:
+        for session, _ in _hosts.values():
+            session.close()
+        _hosts.clear()
@@ -1,34 +1,61 @@
 #!/usr/bin/env python3
 """머신러닝 예측 모델 - 수집된 데이터 기반"""
 import json
+import os
+import tempfile
+import threading
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
+import history_log
+import history_store
+from history_meta import data_version, load_meta
+from history_rollup import SLOT_MINUTES, iter_record_cells, load_rollup
+from registry import get_registry
+from slot_stats import slot_confidence
+from ttl_cache import TTLCache
 
-def load_collected_data():
-    """수집된 실시간 데이터 로드"""
-    data_file = Path("realtime_data.jsonl")
-    if not data_file.exists():
-        return []
-    
-    data = []
-    with open(data_file, encoding="utf-8") as f:
-        for line in f:
-            try:
-                data.append(json.loads(line))
-            except:
-                continue
-    return data
+def iter_collected_data(fields=None, start=None, end=None):
+    """수집된 실시간 데이터를 한 건씩 반환 (전체를 메모리에 올리지 않음)
 
-def extract_features(data_point):
-    """데이터에서 특성 추출"""
+    fields: 필요한 최상위 필드만 남김 (예: ("timestamp", "hour", "weather"))
+    start/end: 기간 제한 (start <= timestamp < end, 해당 날짜 파티션만 읽음)
+    쓰는 중인 마지막 줄과 깨진 줄은 건너뛴다.
+    """
+    return history_log.read_range(start, end, fields=fields)
+
+ROUTES = list(get_registry().route_names)  # 특성/조회표 열 순서 (레지스트리 노선 순서)
+
+# extract_features() 순서와 같은 기본 특성 + 배치용 추가 특성
+BASE_FEATURE_COLUMNS = [
+    "hour", "minute", "weekday", "is_weekend",
+    "temperature", "humidity", "weather_impact", "is_raining", "is_snowing",
+] + [f"{name}_{route}" for route in ROUTES for name in ("headway", "next_bus")]
+FEATURE_COLUMNS = BASE_FEATURE_COLUMNS + [
+    "event_impact", "traffic_impact",
+] + [f"route_{route}" for route in ROUTES]
+TARGETS = ("congestion", "passengers")
+
+# 기록에서 특성 계산에 필요한 필드만 읽음
+_FEATURE_FIELDS = ("timestamp", "hour", "minute", "weekday", "is_weekend",
+                   "weather", "traffic", "events", "road_traffic", "occupancy", "buses")
+
+_matrix_cache = TTLCache(ttl=3600, maxsize=8, name="feature_matrix")
+
+
+def _base_features(data_point):
+    """기록 1건의 기본 특성 (중첩된 날씨/배차 dict는 여기서 한 번만 해석)"""
     features = []
     
-    # 시간 특성
+    # 시간 특성 (예전 기록에는 weekday가 없으므로 timestamp에서 계산)
+    weekday = data_point.get("weekday")
+    if weekday is None and data_point.get("timestamp"):
+        weekday = datetime.strptime(data_point["timestamp"], "%Y-%m-%d %H:%M:%S").weekday()
+    weekday = weekday or 0
     features.append(data_point.get("hour", 0))
     features.append(data_point.get("minute", 0))
-    features.append(data_point.get("weekday", 0))
-    features.append(1 if data_point.get("is_weekend", False) else 0)
+    features.append(weekday)
+    features.append(1 if data_point.get("is_weekend", weekday >= 5) else 0)
     
     # 날씨 특성
     weather = data_point.get("weather", {})
@@ -43,7 +70,7 @@ def extract_features(data_point):
     
     # 교통 특성
     traffic = data_point.get("traffic", {})
-    for route in ["421", "400", "405"]:
+    for route in ROUTES:
         if route in traffic and "error" not in traffic[route]:
             features.append(traffic[route].get("estimated_headway", 10))
             features.append(traffic[route].get("next_bus", 5))
@@ -52,6 +79,166 @@ def extract_features(data_point):
     
     return features
 
+def extract_features(data_point):
+    """데이터에서 특성 추출"""
+    return _base_features(data_point)
+
+def _impact(section, key):
+    """이벤트/도로 영향도 (오류/누락이면 1.0)"""
+    if not isinstance(section, dict) or "error" in section:
+        return 1.0
+    value = section.get(key)
+    return 1.0 if value is None else float(value)
+
+def _route_targets(data_point, target):
+    """{노선: 목표값} - 혼잡도 코드(1~4) 또는 첫 번째 버스 예상 승객 수"""
+    if target == "congestion":
+        targets = {}
+        for bus in data_point.get("buses", []):
+            try:
+                congestion = int(bus.get("congestion1", 0))
+            except (TypeError, ValueError):
+                continue
+            if congestion > 0:
+                targets[bus["route"]] = congestion
+        return targets
+    
+    occupancy = data_point.get("occupancy")
+    if not isinstance(occupancy, dict) or "buses" not in occupancy:
+        return {}
+    return {
+        bus["route"]: bus["bus1_passengers"]
+        for bus in occupancy["buses"]
+        if isinstance(bus.get("bus1_passengers"), (int, float))
+    }
+
+def _featurize(records, target):
+    """기록 스트림 → (X, y) 한 번에 생성 (기록당 노선별 1행, 목표값 없는 노선은 제외)"""
+    rows, targets = [], []
+    route_onehot = {route: [1 if r == route else 0 for r in ROUTES] for route in ROUTES}
+    for data_point in records:
+        route_targets = _route_targets(data_point, target)
+        if not route_targets:
+            continue
+        shared = _base_features(data_point) + [
+            _impact(data_point.get("events"), "impact_factor"),
+            _impact(data_point.get("road_traffic"), "total_impact"),
+        ]
+        for route, value in route_targets.items():
+            if route not in route_onehot:
+                continue
+            rows.append(shared + route_onehot[route])
+            targets.append(value)
+    
+    X = np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURE_COLUMNS))
+    y = np.array(targets, dtype=np.float64)
+    X.flags.writeable = False  # 캐시에서 공유하므로 읽기 전용
+    y.flags.writeable = False
+    return X, y
+
+# 컬럼 저장소에서 혼잡도 특성을 만들 때 읽는 컬럼
+_STORE_COLUMNS = ("ts", "route", "vehicle", "congestion", "temperature", "humidity",
+                  "weather_impact", "is_raining", "is_snowing", "headway", "next_bus",
+                  "event_impact", "traffic_impact")
+
+
+def _fill(values, default):
+    """저장소의 빈 값(NaN) → 기록 기반 특성과 같은 기본값"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), default, values)
+
+
+def _featurize_columns(columns):
+    """컬럼 저장소 행 → 혼잡도 (X, y) - _featurize(기록, "congestion")과 같은 특성
+
+    기록당 노선별 1행(첫 번째 버스, 같은 노선이 두 번 있으면 나중 것)이고,
+    다른 노선의 배차 특성은 같은 시각의 그 노선 행에서 가져온다.
+    """
+    route_index = {route: i for i, route in enumerate(ROUTES)}
+    routes = np.array([route_index.get(str(route), -1) for route in columns["route"]], dtype=np.int64)
+    first = (np.asarray(columns["vehicle"]) == 1) & (routes >= 0)
+    times, slot = np.unique(np.asarray(columns["ts"]), return_inverse=True)
+
+    # 시각별 공통 특성 (시간, 날씨, 영향도) - 같은 시각의 행은 값이 같으므로 아무 행에서나
+    _, row_of = np.unique(slot, return_index=True)
+    moments = [datetime.fromtimestamp(int(ts)) for ts in times]
+    weekday = np.array([moment.weekday() for moment in moments], dtype=np.float64)
+    time_features = np.column_stack([
+        [moment.hour for moment in moments], [moment.minute for moment in moments],
+        weekday, weekday >= 5,
+    ])
+    raining, snowing = (np.asarray(columns[name])[row_of] == 1 for name in ("is_raining", "is_snowing"))
+    weather = np.column_stack([
+        _fill(columns["temperature"][row_of], 15), _fill(columns["humidity"][row_of], 50),
+        _fill(columns["weather_impact"][row_of], 1.0), raining, snowing,
+    ])
+
+    # 시각 x 노선 배차 특성 (행이 없는 노선은 기본값)
+    headway = np.tile(np.array([10.0, 5.0]), (len(times), len(ROUTES), 1))
+    headway[slot[first], routes[first], 0] = _fill(columns["headway"][first], 10)
+    headway[slot[first], routes[first], 1] = _fill(columns["next_bus"][first], 5)
+
+    impacts = np.column_stack([
+        _fill(columns["event_impact"][row_of], 1.0), _fill(columns["traffic_impact"][row_of], 1.0),
+    ])
+    shared = np.hstack([time_features, weather, headway.reshape(len(times), 2 * len(ROUTES)), impacts])
+
+    # 목표값: 혼잡도 정보가 있는 첫 번째 버스, 시각/노선마다 마지막 값을 처음 나온 자리에
+    targets = np.flatnonzero(first & (np.asarray(columns["congestion"]) > 0))
+    keys = slot[targets] * len(ROUTES) + routes[targets]
+    _, first_seen = np.unique(keys, return_index=True)
+    _, last_seen = np.unique(keys[::-1], return_index=True)
+    targets = targets[len(targets) - 1 - last_seen[np.argsort(first_seen)]]
+
+    X = np.hstack([shared[slot[targets]], np.eye(len(ROUTES))[routes[targets]]])
+    y = np.asarray(columns["congestion"])[targets].astype(np.float64)
+    X.flags.writeable = False  # 캐시에서 공유하므로 읽기 전용
+    y.flags.writeable = False
+    return X, y
+
+
+def _epoch(timestamp):
+    return int(datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").timestamp())
+
+
+def _store_covers(start, end):
+    """컬럼 저장소에 기간 안의 수집 이력이 모두 들어 있는지
+
+    예전 이력을 가져오지 않았거나 저장소 갱신이 밀렸으면 False (JSONL에서 읽음).
+    """
+    segments = history_store.load_meta()["segments"]
+    meta = load_meta()
+    if not segments or meta["first_timestamp"] is None:
+        return False
+    first = max(meta["first_timestamp"], start) if start else meta["first_timestamp"]
+    last = meta["last_timestamp"]
+    last_ts = min(_epoch(last), _epoch(end) - 1) if end else _epoch(last)
+    return segments[0]["ts_min"] <= _epoch(first) and segments[-1]["ts_max"] >= last_ts
+
+
+def _load_matrix(target, start, end):
+    """혼잡도는 컬럼 저장소가 기간을 다 갖고 있으면 memmap 컬럼에서, 아니면 JSONL에서"""
+    if target == "congestion" and _store_covers(start, end):
+        return _featurize_columns(history_store.load_columns(
+            _STORE_COLUMNS,
+            start=_epoch(start) if start else None,
+            end=_epoch(end) if end else None,
+        ))
+    return _featurize(iter_collected_data(_FEATURE_FIELDS, start, end), target)
+
+
+def build_feature_matrix(target="congestion", start=None, end=None):
+    """수집 이력(또는 기간)을 특성 행렬로 변환
+    
+    Returns: (X, y, columns) - X는 (행 수, 특성 수) 배열, y는 노선별 목표값
+    결과는 수집 이력 버전별로 캐시하므로 학습/평가가 JSON을 다시 파싱하지 않는다.
+    """
+    if target not in TARGETS:
+        raise ValueError(f"알 수 없는 목표값: {target}")
+    key = (data_version(), target, str(start), str(end))
+    X, y = _matrix_cache.get_or_load(key, lambda: _load_matrix(target, start, end))
+    return X, y, FEATURE_COLUMNS
+
 def simple_prediction_model(current_features):
     """간단한 규칙 기반 예측 모델"""
     hour, minute, weekday, is_weekend, temp, humidity, weather_impact, is_rain, is_snow = current_features[:9]
@@ -81,32 +268,196 @@ def simple_prediction_model(current_features):
     
     return min(base_congestion, 2.0)  # 최대 2배
 
-def predict_congestion():
-    """현재 시점 혼잡도 예측"""
-    now = datetime.now()
-    
-    # 현재 특성 생성
-    current_features = [
-        now.hour,
-        now.minute,
-        now.weekday(),
-        1 if now.weekday() >= 5 else 0,
-        15, 50, 1.0, 0, 0,  # 기본 날씨값 (실제로는 API에서)
-        10, 5, 10, 5, 10, 5  # 기본 교통값
+# ============ 학습 모델 (리지 회귀) ============
+
+MODEL_FILE = Path("congestion_model.npz")
+RIDGE_ALPHA = 1.0
+MIN_TRAINING_ROWS = 100  # 이보다 적으면 규칙 기반 모델 사용
+CONGESTION_SCALE = 3.0   # 혼잡도 코드(1~4) → 혼잡 배수 (3: 혼잡 = 1.0배)
+
+_HOUR = FEATURE_COLUMNS.index("hour")
+DESIGN_SIZE = 1 + len(FEATURE_COLUMNS) + 24  # 절편 + 특성 + 시간대 원-핫
+
+
+def _design(X):
+    """특성 행렬 → 설계 행렬 [1, X, 시간대 원-핫] (출퇴근 피크 같은 비선형 시간 효과용)"""
+    hours = np.zeros((len(X), 24))
+    hours[np.arange(len(X)), X[:, _HOUR].astype(int) % 24] = 1.0
+    return np.hstack([np.ones((len(X), 1)), X, hours])
+
+
+class CongestionModel:
+    """노선별 혼잡도 코드를 예측하는 리지 회귀 모델
+
+    충분통계(XᵀX, Xᵀy)를 누적하므로 새로 수집된 기록만으로 재학습할 수 있다.
+    """
+
+    def __init__(self, alpha=RIDGE_ALPHA):
+        self.alpha = alpha
+        self.xtx = np.zeros((DESIGN_SIZE, DESIGN_SIZE))
+        self.xty = np.zeros(DESIGN_SIZE)
+        self.rows = 0
+        self.weights = None
+        self.data_version = None   # 마지막으로 반영한 수집 이력 버전
+        self.trained_until = None  # 마지막으로 반영한 기록 시각
+        self.record_count = 0
+
+    @property
+    def ready(self):
+        return self.weights is not None and self.rows >= MIN_TRAINING_ROWS
+
+    def partial_fit(self, X, y):
+        """새 행을 충분통계에 더하고 가중치 다시 계산"""
+        if len(y) == 0:
+            return
+        D = _design(X)
+        self.xtx += D.T @ D
+        self.xty += D.T @ y
+        self.rows += len(y)
+        penalty = self.alpha * np.eye(DESIGN_SIZE)
+        penalty[0, 0] = 0.0  # 절편은 규제하지 않음
+        self.weights = np.linalg.solve(self.xtx + penalty, self.xty)
+
+    def predict(self, X):
+        return _design(X) @ self.weights
+
+    def save(self, path=MODEL_FILE):
+        path = Path(path)
+        # 워커/수집기가 동시에 저장할 수 있으므로 임시 파일은 쓰는 쪽마다 다른 이름
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with open(fd, "wb") as f:
+                np.savez(
+                    f, xtx=self.xtx, xty=self.xty,
+                    weights=self.weights if self.weights is not None else np.zeros(0),
+                    columns=np.array(FEATURE_COLUMNS),
+                    meta=np.array(json.dumps({
+                        "alpha": self.alpha, "rows": self.rows,
+                        "data_version": self.data_version,
+                        "trained_until": self.trained_until,
+                        "record_count": self.record_count,
+                    })),
+                )
+            os.replace(tmp, path)  # 다른 워커가 반쯤 쓴 파일을 읽지 않도록
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        """저장된 모델 로드 (없거나 특성 구성이 바뀌었으면 None)"""
+        try:
+            with np.load(path) as artifact:
+                if list(artifact["columns"]) != FEATURE_COLUMNS:
+                    return None
+                meta = json.loads(str(artifact["meta"]))
+                model = cls(meta["alpha"])
+                model.xtx = artifact["xtx"]
+                model.xty = artifact["xty"]
+                model.weights = artifact["weights"] if artifact["weights"].size else None
+        except (OSError, KeyError, ValueError):
+            return None
+        model.rows = meta["rows"]
+        model.data_version = meta["data_version"]
+        model.trained_until = meta["trained_until"]
+        model.record_count = meta["record_count"]
+        return model
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model(model_file=MODEL_FILE):
+    """학습 모델 반환 (처음 한 번 파일에서 로드, 이력이 늘었으면 추가분만 학습 후 저장)"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = CongestionModel.load(model_file) or CongestionModel()
+        
+        meta = load_meta()
+        version = data_version(meta)
+        if _model.data_version == version:
+            return _model
+        
+        if meta["record_count"] < _model.record_count:
+            _model = CongestionModel()  # 이력이 정리/교체되었으면 처음부터 학습
+        last = meta["last_timestamp"]
+        if last is not None:
+            # trained_until 다음 기록부터 이번 메타데이터의 마지막 기록까지만 반영
+            start = _next_second(_model.trained_until) if _model.trained_until else None
+            X, y, _ = build_feature_matrix("congestion", start=start, end=_next_second(last))
+            _model.partial_fit(X, y)
+            _model.trained_until = last
+        _model.data_version = version
+        _model.record_count = meta["record_count"]
+        try:
+            _model.save(model_file)
+        except OSError as e:
+            print(f"모델 저장 실패: {e}")
+        return _model
+
+
+def _next_second(timestamp):
+    moment = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S") + timedelta(seconds=1)
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def current_feature_rows(now=None, weather=None, traffic=None, events=None, road_traffic=None):
+    """현재 시점의 노선별 특성 행렬 (학습 때와 같은 열 구성)"""
+    now = now or datetime.now()
+    data_point = {
+        "hour": now.hour,
+        "minute": now.minute,
+        "weekday": now.weekday(),
+        "is_weekend": now.weekday() >= 5,
+        "weather": weather or {},
+        "traffic": traffic or {},
+    }
+    shared = _base_features(data_point) + [
+        _impact(events, "impact_factor"),
+        _impact(road_traffic, "total_impact"),
     ]
+    return np.array([
+        shared + [1 if r == route else 0 for r in ROUTES] for route in ROUTES
+    ], dtype=np.float64)
+
+
+def predict_congestion(weather=None, traffic=None, events=None, road_traffic=None):
+    """현재 시점 혼잡도 예측
+
+    학습 데이터가 충분하면 리지 회귀(노선별 예측 평균), 아니면 규칙 기반 모델.
+    weather/traffic/events/road_traffic: 이미 조회한 값 (없으면 기본값)
+    """
+    now = datetime.now()
+    X = current_feature_rows(now, weather, traffic, events, road_traffic)
     
-    predicted_congestion = simple_prediction_model(current_features)
+    model = get_model()
+    if model.ready:
+        route_codes = np.clip(model.predict(X), 1.0, 4.0)
+        route_factors = route_codes / CONGESTION_SCALE
+        predicted_congestion = min(float(route_factors.mean()), 2.0)
+        routes = {route: round(float(f), 2) for route, f in zip(ROUTES, route_factors)}
+        model_name = "ridge"
+    else:
+        predicted_congestion = simple_prediction_model(list(X[0, :len(BASE_FEATURE_COLUMNS)]))
+        routes = None
+        model_name = "rules"
     
-    # 예측 신뢰도 계산
-    data = load_collected_data()
-    confidence = min(len(data) / 100, 1.0)  # 데이터 많을수록 신뢰도 증가
+    # 예측 신뢰도: 현재 슬롯에서 관측된 혼잡도의 실제 분산(95% 신뢰구간 폭) 기반
+    data_points = load_meta()["record_count"]
+    confidence = slot_confidence(ROUTES, now)
     
-    return {
+    result = {
         "predicted_congestion": round(predicted_congestion, 2),
         "confidence": round(confidence, 2),
         "recommendation": get_ml_recommendation(predicted_congestion),
-        "data_points": len(data)
+        "data_points": data_points,
+        "model": model_name,
     }
+    if routes:
+        result["routes"] = routes
+    return result
 
 def get_ml_recommendation(congestion):
     """ML 기반 추천"""
@@ -120,31 +471,29 @@ def get_ml_recommendation(congestion):
         return "🔴 매우 혼잡 - 다른 시간 추천"
 
 def analyze_patterns():
-    """수집된 데이터 패턴 분석"""
-    data = load_collected_data()
-    if len(data) < 10:
-        return {"error": "분석하기에 데이터가 부족합니다"}
+    """수집된 데이터 패턴 분석 (요약 집계 기반)"""
+    rollup = load_rollup()
+    hourly_records = {}  # {hour: [수집 횟수, 버스 수 합]}
+    for _, slot, records, buses in iter_record_cells(rollup):
+        hour = slot * SLOT_MINUTES // 60
+        totals = hourly_records.setdefault(hour, [0, 0])
+        totals[0] += records
+        totals[1] += buses
     
-    # 시간대별 평균 계산
-    hourly_patterns = {}
-    for item in data:
-        hour = item.get("hour", 0)
-        if hour not in hourly_patterns:
-            hourly_patterns[hour] = []
-        
-        # 버스 수 계산
-        bus_count = len(item.get("buses", []))
-        hourly_patterns[hour].append(bus_count)
+    total = sum(records for records, _ in hourly_records.values())
+    if total < 10:
+        return {"error": "분석하기에 데이터가 부족합니다"}
     
-    # 평균 계산
-    hourly_avg = {}
-    for hour, counts in hourly_patterns.items():
-        hourly_avg[hour] = round(np.mean(counts), 1)
+    # 시간대별 평균 버스 수
+    hourly_avg = {
+        hour: round(buses / records, 1)
+        for hour, (records, buses) in hourly_records.items()
+    }
     
     return {
         "hourly_average": hourly_avg,
-        "total_data_points": len(data),
-        "analysis_period": f"{len(data) * 10}분간 수집"
+        "total_data_points": total,
+        "analysis_period": f"{total * 10}분간 수집"
     }
 
 if __name__ == "__main__":
@@ -155,6 +504,11 @@ if __name__ == "__main__":
     print(f"예측 신뢰도: {prediction['confidence']*100:.0f}%")
     print(f"추천: {prediction['recommendation']}")
     print(f"학습 데이터: {prediction['data_points']}개")
+    model = get_model()
+    print(f"모델: {prediction['model']} (학습 행 {model.rows}개, {model.trained_until}까지)")
+    if "routes" in prediction:
+        for route, factor in prediction["routes"].items():
+            print(f"  {route}번: {factor}배")
     
     print("\n=== 패턴 분석 ===")
     patterns = analyze_patterns()
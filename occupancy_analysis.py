@@ -1,122 +1,41 @@
 #!/usr/bin/env python3
 """버스 내 실제 승객 수 분석"""
 import json
-from seoul_api import get_bus_arrival_info
+from bus_state import StationSnapshot, as_snapshot
+from passenger_estimate import estimate_passenger_count, get_bus_capacity
+from slot_stats import load_slot_stats, slot_summary
+from station_snapshot import STATIONS, get_merged_snapshot
 
-def analyze_bus_occupancy():
-    """버스 혼잡도를 실제 승객 수로 변환"""
-    data = get_bus_arrival_info("03278")
-    
-    if "buses" not in data:
+def analyze_bus_occupancy(arrival_data=None, stations=STATIONS):
+    """버스 혼잡도를 실제 승객 수로 변환
+
+    arrival_data: 이미 조회한 도착정보 (없으면 stations의 합친 스냅샷 사용)
+    반환: 차량별 승객 수/노선별 추천을 채운 StationSnapshot (오류면 {"error": ...})
+    같은 스냅샷은 한 번만 분석하고, JSON 모양은 occupancy_dict()로 만든다.
+    """
+    data = arrival_data if arrival_data is not None else get_merged_snapshot(stations)
+    snapshot = as_snapshot(data)
+    
+    if snapshot is None:
         return {"error": "버스 정보 없음"}
+    if snapshot.analyzed:
+        return snapshot
     
-    occupancy_analysis = []
+    # 같은 시간대(평일/주말 × 10분 슬롯)에 관측된 승객 수 분포 - 집계 파일만 읽음
+    stats = load_slot_stats()
     
-    for bus in data["buses"]:
-        route = bus["route"]
-        
-        # 혼잡도 레벨 (1-4)
-        congestion1 = int(bus.get("congestion1", 0))
-        congestion2 = int(bus.get("congestion2", 0))
-        
+    for bus in snapshot.routes:
         # 혼잡도별 예상 승객 수 (버스 정원 기준)
-        bus_capacity = get_bus_capacity(route)
+        bus_capacity = get_bus_capacity(bus.route)
         
-        occupancy1 = estimate_passenger_count(congestion1, bus_capacity, route)
-        occupancy2 = estimate_passenger_count(congestion2, bus_capacity, route)
+        for vehicle in bus.vehicles:
+            vehicle.occupancy = estimate_passenger_count(vehicle.congestion, bus_capacity, bus.route)
         
-        occupancy_analysis.append({
-            "route": route,
-            "direction": bus["direction"],
-            "arrival1": bus["arrival1"],
-            "arrival2": bus["arrival2"],
-            "bus1_passengers": occupancy1["passengers"],
-            "bus1_occupancy_rate": occupancy1["rate"],
-            "bus1_comfort": occupancy1["comfort"],
-            "bus2_passengers": occupancy2["passengers"],
-            "bus2_occupancy_rate": occupancy2["rate"],
-            "bus2_comfort": occupancy2["comfort"],
-            "recommendation": get_occupancy_recommendation(occupancy1, occupancy2)
-        })
+        bus.recommendation = get_occupancy_recommendation(*(v.occupancy for v in bus.vehicles))
+        bus.usual_passengers = (slot_summary(bus.route, stats=stats) or {}).get("passengers")
     
-    return {"buses": occupancy_analysis}
-
-def get_bus_capacity(route):
-    """노선별 버스 정원"""
-    # 서울시 시내버스 표준 정원
-    capacity_map = {
-        "421": {"seats": 28, "standing": 42, "total": 70},  # 일반버스
-        "400": {"seats": 28, "standing": 42, "total": 70},  # 일반버스
-        "405": {"seats": 28, "standing": 42, "total": 70}   # 일반버스
-    }
-    
-    return capacity_map.get(route, {"seats": 28, "standing": 42, "total": 70})
-
-def estimate_passenger_count(congestion_level, capacity, route=None):
-    """혼잡도 레벨을 실제 승객 수로 변환 (노선별 차이 반영)"""
-    total_capacity = capacity["total"]
-    
-    # 문자열을 정수로 변환
-    try:
-        congestion_level = int(congestion_level)
-    except (ValueError, TypeError):
-        congestion_level = 0
-    
-    if congestion_level == 0:  # 정보 없음
-        return {
-            "passengers": "정보없음",
-            "rate": 0,
-            "comfort": "알 수 없음"
-        }
-    
-    # 노선별 기본 승객 수 조정
-    route_factor = 1.0
-    if route == "421":
-        route_factor = 1.1  # 421번이 더 인기
-    elif route == "400":
-        route_factor = 0.9  # 400번이 덜 혼잡
-    elif route == "405":
-        route_factor = 0.8  # 405번이 가장 한적
-    
-    # 시간대별 조정
-    from datetime import datetime
-    now = datetime.now()
-    time_factor = 1.0
-    if 7 <= now.hour <= 9 or 17 <= now.hour <= 19:
-        time_factor = 1.2  # 출퇴근 시간
-    elif now.weekday() >= 5:  # 주말
-        time_factor = 0.8
-    
-    if congestion_level == 1:  # 여유
-        base_passengers = 20
-    elif congestion_level == 2:  # 보통
-        base_passengers = 38
-    elif congestion_level == 3:  # 혼잡
-        base_passengers = 54
-    else:  # congestion_level == 4, 매우혼잡
-        base_passengers = 66
-    
-    # 노선별, 시간대별 조정 적용
-    passengers = int(base_passengers * route_factor * time_factor)
-    passengers = min(max(passengers, 5), total_capacity)  # 5명~70명 범위
-    
-    # 최종 승객 수 기반으로 comfort 결정 (일관성 보장)
-    if passengers <= 25:
-        comfort = "🟢 매우 편안 - 좌석 여유"
-    elif passengers <= 40:
-        comfort = "🟡 보통 - 좌석 대부분 차있음"
-    elif passengers <= 55:
-        comfort = "🟠 혼잡 - 입석 승객 많음"
-    else:
-        comfort = "🔴 매우혼잡 - 승차 어려움"
-    
-    occupancy_rate = round((passengers / total_capacity) * 100, 1)
-    
-    return {
-        "passengers": passengers,
-        "rate": occupancy_rate,
-        "comfort": comfort
-    }
+    snapshot.analyzed = True
+    return snapshot
 
 def get_occupancy_recommendation(bus1, bus2):
     """승객 수 기반 추천"""
@@ -132,11 +51,15 @@ def get_occupancy_recommendation(bus1, bus2):
     else:
         return f"🔴 두 버스 모두 혼잡 - 다른 시간 고려 ({bus1['passengers']}명, {bus2['passengers']}명)"
 
-def get_comfort_statistics():
-    """편안함 통계"""
-    analysis = analyze_bus_occupancy()
+def get_comfort_statistics(analysis=None):
+    """편안함 통계
+
+    analysis: analyze_bus_occupancy() 결과 (없으면 새로 분석)
+    """
+    if analysis is None:
+        analysis = analyze_bus_occupancy()
     
-    if "error" in analysis:
+    if not isinstance(analysis, StationSnapshot):
         return analysis
     
     comfort_stats = {
@@ -148,10 +71,10 @@ def get_comfort_statistics():
     
     total_buses = 0
     
-    for bus in analysis["buses"]:
-        for bus_num in [1, 2]:
-            passengers = bus[f"bus{bus_num}_passengers"]
-            if isinstance(passengers, int):
+    for bus in analysis.routes:
+        for vehicle in bus.vehicles:
+            passengers = vehicle.passengers
+            if passengers is not None:
                 total_buses += 1
                 if passengers <= 20:
                     comfort_stats["very_comfortable"] += 1
@@ -191,20 +114,23 @@ if __name__ == "__main__":
     
     # 개별 버스 분석
     occupancy = analyze_bus_occupancy()
-    if "error" in occupancy:
+    if not isinstance(occupancy, StationSnapshot):
         print(f"오류: {occupancy['error']}")
     else:
-        for bus in occupancy["buses"]:
+        for bus in occupancy.occupancy_dict()["buses"]:
             print(f"\n{bus['route']}번 → {bus['direction']}")
             print(f"  첫 번째: {bus['arrival1']} - {bus['bus1_passengers']}명 ({bus['bus1_occupancy_rate']}%)")
             print(f"           {bus['bus1_comfort']}")
             print(f"  두 번째: {bus['arrival2']} - {bus['bus2_passengers']}명 ({bus['bus2_occupancy_rate']}%)")
             print(f"           {bus['bus2_comfort']}")
             print(f"  추천: {bus['recommendation']}")
+            usual = bus['usual_passengers']
+            if usual and usual['ci95']:
+                print(f"  평소 이 시간: {usual['mean']}명 (95% 신뢰구간 {usual['ci95'][0]}~{usual['ci95'][1]}명, {usual['count']}회 관측)")
     
     # 전체 통계
     print(f"\n=== 현재 시간대 편안함 통계 ===")
-    stats = get_comfort_statistics()
+    stats = get_comfort_statistics(occupancy)
     if "error" not in stats:
         print(f"분석 버스: {stats['total_buses_analyzed']}대")
         dist = stats['comfort_distribution']
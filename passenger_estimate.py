@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""혼잡도 코드 → 예상 승객 수 (버스 정원, 노선별 수요, 시간대 반영)
+
+실시간 분석(occupancy_analysis)과 이력 집계(history_rollup, slot_stats)가 같이 쓴다.
+"""
+from datetime import datetime
+
+from bus_state import congestion_code
+from registry import get_registry
+
+
+def get_bus_capacity(route):
+    """노선별 버스 정원 (레지스트리 설정)"""
+    return get_registry().route(route).capacity
+
+
+def estimate_passenger_count(congestion_level, capacity, route=None, now=None):
+    """혼잡도 레벨을 실제 승객 수로 변환 (노선별 차이 반영)
+
+    now: 시간대 보정 기준 시각 (없으면 현재 시각, 지난 기록을 집계할 때 기록 시각 전달)
+    """
+    total_capacity = capacity["total"]
+
+    congestion_level = congestion_code(congestion_level)
+
+    if congestion_level == 0:  # 정보 없음
+        return {
+            "passengers": "정보없음",
+            "rate": 0,
+            "comfort": "알 수 없음"
+        }
+
+    # 노선별 기본 승객 수 조정 (레지스트리 설정)
+    route_factor = get_registry().route(route).demand_factor if route else 1.0
+
+    # 시간대별 조정
+    if now is None:
+        now = datetime.now()
+    time_factor = 1.0
+    if 7 <= now.hour <= 9 or 17 <= now.hour <= 19:
+        time_factor = 1.2  # 출퇴근 시간
+    elif now.weekday() >= 5:  # 주말
+        time_factor = 0.8
+
+    if congestion_level == 1:  # 여유
+        base_passengers = 20
+    elif congestion_level == 2:  # 보통
+        base_passengers = 38
+    elif congestion_level == 3:  # 혼잡
+        base_passengers = 54
+    else:  # congestion_level == 4, 매우혼잡
+        base_passengers = 66
+
+    # 노선별, 시간대별 조정 적용
+    passengers = int(base_passengers * route_factor * time_factor)
+    passengers = min(max(passengers, 5), total_capacity)  # 5명~70명 범위
+
+    # 최종 승객 수 기반으로 comfort 결정 (일관성 보장)
+    if passengers <= 25:
+        comfort = "🟢 매우 편안 - 좌석 여유"
+    elif passengers <= 40:
+        comfort = "🟡 보통 - 좌석 대부분 차있음"
+    elif passengers <= 55:
+        comfort = "🟠 혼잡 - 입석 승객 많음"
+    else:
+        comfort = "🔴 매우혼잡 - 승차 어려움"
+
+    occupancy_rate = round((passengers / total_capacity) * 100, 1)
+
+    return {
+        "passengers": passengers,
+        "rate": occupancy_rate,
+        "comfort": comfort
+    }
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""혼잡도 예측 조회표 - 요일 × 10분 슬롯 × 노선 (7 × 144 × 3)
+
+예측 입력의 대부분(요일, 시각, 노선)은 매주 반복되므로 모델을 미리 전 구간에 대해
+한 번 계산해 두고, 요청 시에는 배열 조회 + 실시간 날씨/도로 배수만 곱한다.
+모델이 다시 학습되었거나 앞으로 7일의 이벤트 일정이 바뀌면 새로 만든다.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from event_calendar import calculate_event_impact
+from history_rollup import SLOT_MINUTES, SLOTS_PER_DAY, slot_label, slot_of
+from ml_model import (BASE_FEATURE_COLUMNS, CONGESTION_SCALE, FEATURE_COLUMNS, ROUTES,
+                      current_feature_rows, get_ml_recommendation, get_model,
+                      simple_prediction_model)
+
+TABLE_MAX_AGE = 300  # 초, get_table()이 모델/일정 변경을 확인하는 주기
+LIVE_HORIZON = 120   # 분, 구간 예측에서 현재 날씨/도로 배수를 적용하는 범위
+
+_COLUMN = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+
+class PredictionTable:
+    """요일별(앞으로 7일) 슬롯별 노선별 기본 혼잡 배수 + 날짜별 이벤트 배수"""
+    __slots__ = ("values", "event_factors", "dates", "model", "data_points", "key", "built_at")
+
+    def __init__(self, values, event_factors, dates, model, data_points, key):
+        self.values = values                # float32 (7, 144, 노선 수), 날씨/이벤트/도로 보정 전
+        self.event_factors = event_factors  # float32 (7,), 요일별 해당 날짜의 이벤트 배수
+        self.dates = dates                  # 요일(0=월) → "YYYY-MM-DD" (앞으로 7일 중 해당 요일)
+        self.model = model                  # "ridge" 또는 "rules"
+        self.data_points = data_points
+        self.key = key
+        self.built_at = time.time()
+
+    def event_factor(self, moment):
+        """해당 시각 날짜의 이벤트 배수 (조회표 범위 밖의 날짜면 1.0)"""
+        weekday = moment.weekday()
+        if self.dates[weekday] != moment.strftime("%Y-%m-%d"):
+            return 1.0
+        return float(self.event_factors[weekday])
+
+    def lookup(self, moment=None, route=None):
+        """해당 시각의 기본 혼잡 배수 (route가 없으면 노선 평균)"""
+        moment = moment or datetime.now()
+        cell = self.values[moment.weekday(), slot_of(moment.hour, moment.minute)]
+        return float(cell[ROUTES.index(route)] if route else cell.mean())
+
+    def day_series(self, weekday, route=None):
+        """요일 하루치 슬롯별 기본 혼잡 배수 (144,)"""
+        values = self.values[weekday]
+        return values[:, ROUTES.index(route)] if route else values.mean(axis=1)
+
+
+def _upcoming_dates(today):
+    """요일(0=월) → 오늘부터 7일 중 해당 요일 날짜"""
+    dates = [None] * 7
+    for offset in range(7):
+        day = today + timedelta(days=offset)
+        dates[day.weekday()] = day
+    return dates
+
+
+def _grid_features():
+    """(7 × 144 × 노선) 행의 특성 행렬 - 날씨/배차/이벤트/도로는 평상시 기본값"""
+    base = current_feature_rows(datetime(2000, 1, 3))  # 노선별 기본값 행 (시각 열은 아래에서 덮어씀)
+    weekdays, slots, routes = np.meshgrid(
+        np.arange(7), np.arange(SLOTS_PER_DAY), np.arange(len(ROUTES)), indexing="ij"
+    )
+    X = base[routes.ravel()].copy()
+    minutes = slots.ravel() * SLOT_MINUTES
+    X[:, _COLUMN["hour"]] = minutes // 60
+    X[:, _COLUMN["minute"]] = minutes % 60
+    X[:, _COLUMN["weekday"]] = weekdays.ravel()
+    X[:, _COLUMN["is_weekend"]] = weekdays.ravel() >= 5
+    return X
+
+
+def build_table(model=None, today=None):
+    """모델을 전 구간에 대해 한 번 평가해서 조회표 생성"""
+    model = model or get_model()
+    today = today or datetime.now().date()
+    dates = _upcoming_dates(today)
+    event_factors = np.array(
+        [calculate_event_impact(day)["impact_factor"] for day in dates], dtype=np.float32
+    )
+    shape = (7, SLOTS_PER_DAY, len(ROUTES))
+
+    X = _grid_features()
+    if model.ready:
+        codes = np.clip(model.predict(X), 1.0, 4.0)
+        values = (codes / CONGESTION_SCALE).reshape(shape)
+        model_name = "ridge"
+    else:
+        # 규칙 기반 모델은 노선과 무관하므로 첫 번째 노선 행만 평가
+        rows = X[::len(ROUTES), :len(BASE_FEATURE_COLUMNS)]
+        per_slot = np.array([simple_prediction_model(list(row)) for row in rows])
+        values = np.repeat(per_slot.reshape(7, SLOTS_PER_DAY, 1), len(ROUTES), axis=2)
+        model_name = "rules"
+
+    key = _table_key(model, dates, event_factors)
+    return PredictionTable(
+        np.minimum(values, 2.0).astype(np.float32), event_factors,
+        [day.strftime("%Y-%m-%d") for day in dates], model_name, model.record_count, key,
+    )
+
+
+def _table_key(model, dates, event_factors):
+    return (model.data_version, model.ready, tuple(str(day) for day in dates),
+            tuple(event_factors.tolist()))
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def refresh_table():
+    """모델이나 앞으로 7일의 이벤트 일정이 바뀌었으면 조회표를 다시 만들고 반환"""
+    global _table
+    with _table_lock:
+        model = get_model()
+        dates = _upcoming_dates(datetime.now().date())
+        event_factors = np.array(
+            [calculate_event_impact(day)["impact_factor"] for day in dates], dtype=np.float32
+        )
+        if _table is None or _table.key != _table_key(model, dates, event_factors):
+            _table = build_table(model)
+        else:
+            _table.built_at = time.time()
+        return _table
+
+
+def get_table():
+    """현재 조회표 (TABLE_MAX_AGE마다 변경 여부 확인, 그 사이에는 배열만 반환)"""
+    table = _table
+    if table is None or time.time() - table.built_at > TABLE_MAX_AGE:
+        table = refresh_table()
+    return table
+
+
+def as_table(table):
+    """조회표면 그대로, 없거나 갱신 실패 값({"error": ...})이면 프로세스의 조회표"""
+    return table if isinstance(table, PredictionTable) else get_table()
+
+
+def _live_factors(weather, road_traffic):
+    """실시간 날씨/도로 배수 (오류/누락이면 1.0)"""
+    weather_factor = 1.0
+    if isinstance(weather, dict) and "error" not in weather:
+        weather_factor = float(weather.get("impact_factor", 1.0))
+    traffic_factor = 1.0
+    if isinstance(road_traffic, dict) and "error" not in road_traffic:
+        traffic_factor = float(road_traffic.get("total_impact", 1.0))
+    return weather_factor, traffic_factor
+
+
+def predict_from_table(table=None, moment=None, weather=None, road_traffic=None, route=None):
+    """조회표 기반 예측 - 기본 배수에 실시간 날씨/이벤트/도로 배수를 곱함"""
+    table = as_table(table)
+    moment = moment or datetime.now()
+    base = table.lookup(moment, route)
+    weather_factor, traffic_factor = _live_factors(weather, road_traffic)
+    event_factor = table.event_factor(moment)
+
+    base_prediction = min(base * weather_factor, 2.0)
+    return {
+        "predicted_congestion": round(base_prediction * event_factor * traffic_factor, 2),
+        "base_prediction": round(base_prediction, 2),
+        "weather_impact": weather_factor,
+        "event_impact": event_factor,
+        "traffic_impact": traffic_factor,
+        "recommendation": get_ml_recommendation(base_prediction),
+        "model": table.model,
+    }
+
+
+def predict_range(start, end, step_minutes=SLOT_MINUTES, table=None, weather=None,
+                  road_traffic=None, route=None, now=None):
+    """[start, end) 구간을 step_minutes 간격으로 한 번에 예측 (predict_from_table과 같은 배수 조합)
+
+    날씨/도로 배수는 현재 값이므로 지금부터 LIVE_HORIZON 이내의 시각에만 적용하고,
+    이벤트 배수는 조회표에 날짜별로 들어 있는 값을 쓴다.
+    반환: 열 단위 배열 {"times", "predicted_congestion", "base_prediction", ...}
+    """
+    table = as_table(table)
+    now = now or datetime.now()
+    minutes = np.arange(
+        np.datetime64(start, "m"), np.datetime64(end, "m"), np.timedelta64(step_minutes, "m")
+    )
+    days = minutes.astype("datetime64[D]")
+    weekdays = (days.astype(np.int64) + 3) % 7  # 1970-01-01은 목요일
+    minute_of_day = (minutes - days).astype(np.int64)
+    slots = minute_of_day // SLOT_MINUTES
+
+    cells = table.values[weekdays, slots]
+    base = cells[:, ROUTES.index(route)] if route else cells.mean(axis=1)
+
+    table_dates = np.array(table.dates, dtype="datetime64[D]")
+    event_factors = np.where(table_dates[weekdays] == days, table.event_factors[weekdays], 1.0)
+
+    weather_factor, traffic_factor = _live_factors(weather, road_traffic)
+    offset = minutes - np.datetime64(now, "m")
+    live = (offset >= np.timedelta64(-SLOT_MINUTES, "m")) & (offset < np.timedelta64(LIVE_HORIZON, "m"))
+    weather_factors = np.where(live, weather_factor, 1.0)
+    traffic_factors = np.where(live, traffic_factor, 1.0)
+
+    base_prediction = np.minimum(base * weather_factors, 2.0)
+    return {
+        "times": [str(t) for t in minutes],
+        "predicted_congestion": np.round(base_prediction * event_factors * traffic_factors, 2).tolist(),
+        "base_prediction": np.round(base_prediction, 2).tolist(),
+        "weather_impact": weather_factors.tolist(),
+        "event_impact": np.round(event_factors, 2).tolist(),
+        "traffic_impact": traffic_factors.tolist(),
+        "model": table.model,
+    }
+
+
+if __name__ == "__main__":
+    table = refresh_table()
+    print(f"모델: {table.model}, 조회표 {table.values.shape} ({table.values.nbytes / 1024:.1f}KB)")
+    weekday_names = ['월', '화', '수', '목', '금', '토', '일']
+    for weekday in range(7):
+        series = table.day_series(weekday)
+        quiet = np.argsort(series[6 * 6:23 * 6])[:3] + 6 * 6  # 06~23시 중 가장 한적한 슬롯
+        print(f"{weekday_names[weekday]} ({table.dates[weekday]}, 이벤트 {table.event_factors[weekday]}배): "
+              + ", ".join(f"{slot_label(s)} {series[s]:.2f}" for s in sorted(quiet)))
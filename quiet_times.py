@@ -3,9 +3,17 @@
 from datetime import datetime, timedelta
 import json
 from pathlib import Path
+import numpy as np
+from history_rollup import slot_label, slot_of
+from ml_model import ROUTES, get_ml_recommendation
+from prediction_table import as_table
+from slot_stats import congestion_confidence, load_slot_stats, slot_summary
 
-def get_quiet_time_recommendations():
-    """한적한 시간대 추천"""
+def get_quiet_time_recommendations(table=None):
+    """한적한 시간대 추천
+
+    table: 예측 조회표 (없거나 갱신 실패 값이면 프로세스의 조회표 사용)
+    """
     now = datetime.now()
     
     recommendations = {
@@ -13,11 +21,45 @@ def get_quiet_time_recommendations():
         "best_times_today": get_best_times_today(),
         "next_quiet_time": get_next_quiet_time(),
         "avoid_times": get_avoid_times(),
-        "weekly_pattern": get_weekly_pattern()
+        "weekly_pattern": get_weekly_pattern(),
+        "predicted_quiet_slots": get_predicted_quiet_slots(table, now),
+        "observed_now": get_observed_slot_stats(now)
     }
     
     return recommendations
 
+def get_predicted_quiet_slots(table=None, now=None, limit=3):
+    """예측 조회표 기준 오늘 남은 시간 중 가장 한적한 10분 슬롯 (모델을 다시 평가하지 않음)"""
+    now = now or datetime.now()
+    table = as_table(table)
+    first = slot_of(now.hour, now.minute)
+    remaining = table.day_series(now.weekday())[first:] * table.event_factor(now)
+    quietest = sorted(np.argsort(remaining, kind="stable")[:limit])
+    return [
+        {
+            "time": slot_label(first + i),
+            "predicted_congestion": round(float(remaining[i]), 2),
+            "recommendation": get_ml_recommendation(float(remaining[i]))
+        }
+        for i in quietest
+    ]
+
+def get_observed_slot_stats(now=None):
+    """지금 시간대(평일/주말 × 10분 슬롯)에 실제 관측된 노선별 승객 수/혼잡도 평균과 신뢰구간"""
+    now = now or datetime.now()
+    stats = load_slot_stats()
+    observed = {}
+    for route in ROUTES:
+        summary = slot_summary(route, now, stats)
+        if summary is None:
+            continue
+        observed[route] = {
+            "passengers": summary["passengers"],
+            "congestion": summary["congestion1"],
+            "confidence": congestion_confidence(summary)
+        }
+    return observed
+
 def analyze_current_time():
     """현재 시간 분석"""
     now = datetime.now()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""업스트림 API 호출 한도 관리 - data.go.kr 인증키별/엔드포인트별 토큰 버킷
+
+data.go.kr 인증키는 키 전체와 API(엔드포인트)마다 하루 호출 한도가 있다.
+호출 전에 키 버킷과 엔드포인트 버킷에서 토큰을 하나씩 꺼내고, 버킷은 하루 한도를
+하루에 걸쳐 고르게 다시 채운다. 버킷 용량(BURST_HOURS분)만큼은 몰아서 쓸 수 있으므로
+출퇴근 시간에 폴링을 늘려도 되고, 날짜별 사용량으로 하루 한도는 넘지 않는다.
+
+버킷 상태는 SQLite 파일에 저장하므로 재시작하거나 여러 프로세스(웹 워커, 수집기)가
+같은 키를 써도 소비량이 이어진다. 토큰이 모자라면 우선순위가 낮은 호출부터 거절한다.
+"""
+import contextlib
+import contextvars
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from shared_cache import LocalConnection
+
+logger = logging.getLogger(__name__)
+
+QUOTA_DB_ENV = "QUOTA_DB_PATH"
+DEFAULT_DB_PATH = "upstream_quota.sqlite"
+
+# 우선순위 (작을수록 먼저)
+COLLECTOR = 0    # 수집기 정기 폴링 (빠지면 이력에 구멍이 남음)
+INTERACTIVE = 1  # 사용자 요청 시점의 직접 조회
+BACKGROUND = 2   # 웹서버의 선제 갱신 (다음 요청을 위해 미리 받아두는 것)
+
+PRIORITY_NAMES = {COLLECTOR: "collector", INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# 우선순위별로 남겨둬야 하는 버킷 용량 비율 (남은 토큰이 이보다 적으면 거절)
+RESERVE = {COLLECTOR: 0.0, INTERACTIVE: 0.1, BACKGROUND: 0.25}
+
+# 하루 호출 한도 - 키 전체, 엔드포인트 기본값, 엔드포인트별 예외 {"호스트/경로": 한도}
+KEY_DAILY_LIMIT = int(os.environ.get("QUOTA_KEY_DAILY_LIMIT", 100000))
+ENDPOINT_DAILY_LIMIT = int(os.environ.get("QUOTA_ENDPOINT_DAILY_LIMIT", 10000))
+ENDPOINT_LIMITS = {}
+BURST_HOURS = 2  # 버킷 용량 = 하루 한도의 몇 시간분
+
+_priority = contextvars.ContextVar("quota_priority", default=None)
+_default_priority = INTERACTIVE
+
+
+class QuotaExceeded(Exception):
+    """호출 한도가 모자라서 요청을 보내지 않음"""
+
+
+@contextlib.contextmanager
+def priority(level):
+    """이 블록 안의 업스트림 호출 우선순위 지정
+
+    스레드 풀로 넘기는 작업은 contextvars.copy_context().run으로 감싸야 이어진다.
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_default_priority(level):
+    """priority()로 지정하지 않은 호출의 우선순위 (수집기 프로세스는 COLLECTOR)"""
+    global _default_priority
+    _default_priority = level
+
+
+def current_priority():
+    level = _priority.get()
+    return _default_priority if level is None else level
+
+
+def key_id(api_key):
+    """인증키 식별자 (파일에는 키 원문 대신 해시만 저장)"""
+    return hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()
+
+
+class QuotaScheduler:
+    """SQLite에 상태를 저장하는 인증키/엔드포인트 토큰 버킷
+
+    연결은 shared_cache.LocalConnection으로 프로세스/스레드마다 따로 연다.
+    """
+
+    def __init__(self, path, key_limit=KEY_DAILY_LIMIT, endpoint_limit=ENDPOINT_DAILY_LIMIT,
+                 endpoint_limits=None):
+        self.path = str(path)
+        self.key_limit = key_limit
+        self.endpoint_limit = endpoint_limit
+        self.endpoint_limits = ENDPOINT_LIMITS if endpoint_limits is None else endpoint_limits
+        self._conn = LocalConnection(path, """
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                daily_limit INTEGER NOT NULL
+            );
+        """)
+
+    def _buckets(self, api_key, endpoint):
+        """(버킷 이름, 하루 한도) - 키 전체 + 이 키의 엔드포인트"""
+        kid = key_id(api_key)
+        return (
+            (kid, self.key_limit),
+            (f"{kid}:{endpoint}", self.endpoint_limits.get(endpoint, self.endpoint_limit)),
+        )
+
+    @staticmethod
+    def _refill(row, limit, now, today):
+        """저장된 상태에서 지금까지 채워진 (토큰, 오늘 사용량)"""
+        capacity = limit * BURST_HOURS / 24
+        if row is None:
+            return capacity, 0
+        tokens, updated_at, day, used = row
+        tokens = min(capacity, tokens + max(now - updated_at, 0) * limit / 86400)
+        return tokens, used if day == today else 0
+
+    def acquire(self, api_key, endpoint, level=None, now=None):
+        """토큰 1개 소비 (모자라면 QuotaExceeded)
+
+        키 버킷과 엔드포인트 버킷 모두에서 꺼낼 수 있을 때만 소비한다.
+        저장소 오류는 호출을 막지 않고 로그만 남긴다.
+        """
+        level = current_priority() if level is None else level
+        now = time.time() if now is None else now
+        today = datetime.fromtimestamp(now).strftime("%Y-%m-%d")
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            logger.error(f"호출 한도 저장소 오류, 확인 없이 호출: {e}")
+            return
+        try:
+            updates = []
+            for name, limit in self._buckets(api_key, endpoint):
+                row = conn.execute(
+                    "SELECT tokens, updated_at, day, used FROM buckets WHERE name = ?", (name,)
+                ).fetchone()
+                tokens, used = self._refill(row, limit, now, today)
+                reserve = RESERVE[level] * limit * BURST_HOURS / 24
+                if used >= limit or tokens < 1 + reserve:
+                    conn.execute("ROLLBACK")
+                    raise QuotaExceeded(
+                        f"{endpoint} 호출 한도 부족 ({PRIORITY_NAMES[level]}, 오늘 {used}/{limit}회)"
+                    )
+                updates.append((name, tokens - 1, now, today, used + 1, limit))
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets (name, tokens, updated_at, day, used, daily_limit) "
+                "VALUES (?, ?, ?, ?, ?, ?)", updates
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK")
+            logger.error(f"호출 한도 저장소 오류, 확인 없이 호출: {e}")
+
+    def usage(self, now=None):
+        """버킷별 오늘 사용량 [{bucket, used, limit, tokens}]"""
+        now = time.time() if now is None else now
+        today = datetime.fromtimestamp(now).strftime("%Y-%m-%d")
+        rows = self._conn().execute(
+            "SELECT name, tokens, updated_at, day, used, daily_limit FROM buckets ORDER BY name"
+        ).fetchall()
+        result = []
+        for name, *state, limit in rows:
+            tokens, used = self._refill(tuple(state), limit, now, today)
+            result.append({"bucket": name, "used": used, "limit": limit, "tokens": int(tokens)})
+        return result
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """프로세스 공용 스케줄러 (QUOTA_DB_PATH가 빈 문자열이면 None = 한도 관리 안 함)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            path = os.environ.get(QUOTA_DB_ENV, DEFAULT_DB_PATH)
+            if _scheduler is None and path:
+                _scheduler = QuotaScheduler(path)
+    return _scheduler
+
+
+def acquire(api_key, endpoint, level=None):
+    """공용 스케줄러에서 토큰 1개 소비 (모자라면 QuotaExceeded)"""
+    scheduler = get_scheduler()
+    if scheduler is not None:
+        scheduler.acquire(api_key, endpoint, level)
+
+
+if __name__ == "__main__":
+    scheduler = get_scheduler()
+    if scheduler is None:
+        print("호출 한도 관리 꺼짐 (QUOTA_DB_PATH가 비어 있음)")
+    else:
+        print(f"호출 한도 저장소: {scheduler.path}")
+        for bucket in scheduler.usage():
+            print(f"  {bucket['bucket']}: 오늘 {bucket['used']}/{bucket['limit']}회, "
+                  f"남은 토큰 {bucket['tokens']}")
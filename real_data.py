@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """서울시 OpenAPI에서 실제 10분 간격 버스 데이터 조회"""
-import requests
+import http_client
 import json
 from seoul_api import get_api_key
 
@@ -32,7 +32,7 @@ def get_bus_time_data(route="421", year_month="202411"):
     url = f"http://openapi.seoul.go.kr:8088/{api_key}/json/CardBusTimeNew/1/100/{year_month}/{route}/"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url)
         return response.json()
     except Exception as e:
         return {"error": str(e)}
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""정류장/노선 레지스트리 - 정류장, 노선 ID, 정원, 방향 설정을 한 곳에서 관리
+
+기본값은 보광동주민센터(03278, 03518)의 421/400/405번이고, ROUTE_CONFIG 환경변수로
+JSON 설정 파일(routes.example.json 참고)을 지정하면 그 내용을 쓴다.
+프로세스 시작 후 처음 읽을 때 한 번만 불러온다.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+DEFAULT_CAPACITY = {"seats": 28, "standing": 42, "total": 70}  # 서울시 시내버스 표준 정원
+
+DEFAULT_CONFIG = {
+    "stations": [
+        {"ars_id": "03278", "name": "보광동주민센터", "routes": ["421", "400", "405"]},
+        {"ars_id": "03518", "name": "보광동주민센터", "routes": ["421", "400", "405"]},
+    ],
+    "routes": {
+        "421": {"route_id": "100100409", "demand_factor": 1.1, "start": "보광동주민센터", "end": "매봉역",
+                "nearby_seqs": [23, 24, 25]},  # 421번이 더 인기
+        "400": {"route_id": "100100596", "demand_factor": 0.9, "start": "보광동주민센터", "end": "매봉역",
+                "nearby_seqs": [23, 24, 25]},  # 400번이 덜 혼잡
+        "405": {"route_id": None, "demand_factor": 0.8, "start": "보광동주민센터", "end": "매봉역"},  # 가장 한적
+    },
+}
+
+
+class Station:
+    """정류장 (routes: 이 정류장에서 볼 노선, 비어 있으면 등록된 전체 노선)"""
+    __slots__ = ("ars_id", "name", "routes")
+
+    def __init__(self, ars_id, name="", routes=()):
+        self.ars_id = ars_id
+        self.name = name
+        self.routes = tuple(routes)
+
+
+class Route:
+    """노선 (route_id: 서울시 버스 노선 ID, GPS 조회용)"""
+    __slots__ = ("name", "route_id", "capacity", "demand_factor", "start", "end", "nearby_seqs")
+
+    def __init__(self, name, route_id=None, capacity=None, demand_factor=1.0,
+                 start="", end="", nearby_seqs=()):
+        self.name = name
+        self.route_id = route_id
+        self.capacity = capacity or DEFAULT_CAPACITY
+        self.demand_factor = demand_factor  # 노선별 승객 수 보정 배수
+        self.start = start
+        self.end = end
+        self.nearby_seqs = tuple(nearby_seqs)  # 정류장 근처 정류장 순번 (GPS 분포 분석용)
+
+
+class Registry:
+    """정류장/노선 설정"""
+
+    def __init__(self, config):
+        self.routes = {
+            name: Route(name, **options) for name, options in config.get("routes", {}).items()
+        }
+        self.route_names = tuple(self.routes)
+        self.stations = tuple(
+            Station(station["ars_id"], station.get("name", ""), station.get("routes", ()))
+            for station in config.get("stations", [])
+        )
+        self.station_ids = tuple(station.ars_id for station in self.stations)
+        if not self.station_ids or not self.route_names:
+            raise ValueError("정류장과 노선이 하나 이상 필요합니다")
+
+    def route(self, name):
+        """노선 설정 (등록되지 않은 노선이면 기본값)"""
+        return self.routes.get(name) or Route(name)
+
+    def station_routes(self):
+        """정류장 ARS ID → 볼 노선 집합"""
+        return {
+            station.ars_id: frozenset(station.routes or self.route_names)
+            for station in self.stations
+        }
+
+
+def load_registry(path=None):
+    """설정 파일(없으면 ROUTE_CONFIG 환경변수, 그것도 없으면 기본값)로 레지스트리 생성"""
+    path = path or os.environ.get("ROUTE_CONFIG")
+    if not path:
+        return Registry(DEFAULT_CONFIG)
+    with open(Path(path), encoding="utf-8") as f:
+        return Registry(json.load(f))
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """프로세스 공용 레지스트리 (처음 호출할 때 한 번만 불러옴)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = load_registry()
+    return _registry
+
+
+if __name__ == "__main__":
+    registry = get_registry()
+    print(f"정류장 {len(registry.stations)}곳, 노선 {len(registry.routes)}개")
+    for station in registry.stations:
+        print(f"  {station.ars_id} {station.name}: {', '.join(station.routes or registry.route_names)}")
+    for route in registry.routes.values():
+        print(f"  {route.name}번 ({route.route_id or 'ID 없음'}) {route.start} → {route.end}, "
+              f"정원 {route.capacity['total']}명, 보정 {route.demand_factor}배")
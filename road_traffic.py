@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """주변 도로 정체 정보 - 카카오맵 API 연동"""
 
-import requests
+import http_client
 import json
 import os
 from pathlib import Path
@@ -62,7 +62,7 @@ def get_traffic_info():
                 "radius": 2000,
             }
 
-            response = requests.get(url, headers=headers, params=params, timeout=5)
+            response = http_client.get(url, headers=headers, params=params)
 
             # 실제로는 더 복잡한 파싱이 필요하지만, 데모용으로 간소화
             traffic_level = estimate_traffic_level(road["name"])
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """서울시 OpenAPI 호출 모듈"""
 import os
-import requests
+import http_client
+from bus_state import StationSnapshot
+from registry import get_registry
 from pathlib import Path
 
 def get_api_key():
@@ -27,8 +29,8 @@ def get_api_key():
                     return lines[j].split("password")[1].strip()
     return None
 
-def get_bus_arrival_info(station_id="03278"):
-    """버스 도착 정보 조회 (보광동주민센터)"""
+def get_bus_arrival_info(station_id):
+    """정류장(ARS ID) 버스 도착 정보 조회"""
     api_key = get_api_key()
     if not api_key:
         return {"error": "API 키를 찾을 수 없습니다"}
@@ -41,22 +43,12 @@ def get_bus_arrival_info(station_id="03278"):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params)
         data = response.json()
         
-        # 데이터 가공
+        # 데이터 가공 (응답 JSON 모양은 to_dict()로)
         if data.get('msgBody', {}).get('itemList'):
-            buses = []
-            for item in data['msgBody']['itemList']:
-                buses.append({
-                    'route': item['rtNm'],
-                    'direction': item['adirection'],
-                    'arrival1': item['arrmsg1'],
-                    'arrival2': item['arrmsg2'],
-                    'congestion1': item['congestion1'],
-                    'congestion2': item['congestion2']
-                })
-            return {'buses': buses}
+            return StationSnapshot.from_items(station_id, data['msgBody']['itemList'])
         return data
     except Exception as e:
         return {"error": str(e)}
@@ -75,7 +67,7 @@ def get_bus_position(route_id="100100421"):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params)
         return response.json()
     except Exception as e:
         return {"error": str(e)}
@@ -94,7 +86,7 @@ def search_bus_stop(stop_name="보광동주민센터"):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params)
         return response.json()
     except Exception as e:
         return {"error": str(e)}
@@ -113,15 +105,14 @@ def search_bus_route(route_name="421"):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params)
         return response.json()
     except Exception as e:
         return {"error": str(e)}
 if __name__ == "__main__":
     # 테스트
     print("API 키:", get_api_key()[:20] + "..." if get_api_key() else "없음")
-    print("\n=== 보광동주민센터 정류장 정보 ===")
-    print("ARS ID 03278:")
-    print(get_bus_arrival_info("03278"))
-    print("\nARS ID 03518:")
-    print(get_bus_arrival_info("03518"))
+    for station in get_registry().stations:
+        print(f"\n=== {station.name} (ARS ID {station.ars_id}) ===")
+        result = get_bus_arrival_info(station.ars_id)
+        print(result.to_dict() if isinstance(result, StationSnapshot) else result)
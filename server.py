@@ -3,9 +3,10 @@
 import os
 import json
 import logging
-from functools import lru_cache
+import threading
+import time
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 
 # 로깅 설정
 logging.basicConfig(
@@ -18,48 +19,122 @@ app = Flask(__name__, static_folder='static', template_folder='templates')
 
 # API 모듈 임포트
 try:
-    from seoul_api import get_bus_arrival_info
+    from station_snapshot import get_merged_snapshot
+    from bus_state import StationSnapshot
     from weather_api import get_weather_data
     from traffic_data import analyze_bus_distribution, calculate_headway_pattern
     from ml_model import predict_congestion
+    from prediction_table import predict_from_table, predict_range, refresh_table
+    from ml_model import ROUTES
+    from slot_stats import slot_confidence
     from event_calendar import calculate_event_impact
     from road_traffic import get_traffic_info
     from occupancy_analysis import analyze_bus_occupancy, get_comfort_statistics
     from quiet_times import get_quiet_time_recommendations, get_simple_recommendation
     from unified_recommendation import get_unified_recommendation, get_detailed_bus_recommendations
+    from background_refresher import BackgroundRefresher
+    from shared_cache import get_shared_cache
+    from quota import get_scheduler
+    from ttl_cache import TTLCache
+    from cached_response import serialize_response, build_response, content_etag
 except ImportError as e:
     logger.error(f"모듈 임포트 실패: {e}")
     raise
 
 
+# 멀티 워커(gunicorn)에서는 SHARED_CACHE_PATH의 SQLite 파일로 캐시를 공유
+shared_store = get_shared_cache()
+
+
+def current_headway():
+    """스냅샷의 도착정보로 배차간격 분석 (아직 없으면 None = 기본값)
+
+    calculate_headway_pattern(None)은 업스트림을 직접 조회하므로, 예측 작업이
+    도착정보 갱신과 별도로 호출 한도를 쓰지 않도록 스냅샷이 없을 때는 넘기지 않는다.
+    """
+    arrivals = refresher.get("arrivals")
+    return None if arrivals is None else calculate_headway_pattern(arrivals)
+
+
+# 업스트림 데이터는 백그라운드에서 주기별로 갱신하고 핸들러는 스냅샷만 읽음
+# (공유 캐시가 있으면 리더 워커 하나만 업스트림 조회)
+refresher = BackgroundRefresher(store=shared_store)
+refresher.register("arrivals", lambda: get_merged_snapshot(refresh=True), interval=30)
+refresher.register("weather", get_weather_data, interval=600)
+refresher.register("prediction", lambda: predict_congestion(
+    weather=refresher.get("weather"),
+    traffic=current_headway(),
+    events=refresher.get("events"),
+    road_traffic=refresher.get("road_traffic"),
+), interval=300)
+refresher.register("events", calculate_event_impact, interval=3600)
+# 모델/이벤트 일정이 바뀌었을 때만 다시 계산되는 요일×슬롯×노선 예측 조회표
+refresher.register("prediction_table", refresh_table, interval=300)
+refresher.register("road_traffic", get_traffic_info, interval=300)
+
+
+def start_background_refresh():
+    """백그라운드 갱신 시작 (BACKGROUND_REFRESH=0이면 비활성화)"""
+    if os.environ.get("BACKGROUND_REFRESH", "1") != "0":
+        refresher.start()
+
+
+# 엔드포인트별 캐시 (통계 조회용)
+_route_caches = []
+
+
 # 캐싱 데코레이터 (5분)
-def cache_for(seconds=300):
+def cache_for(seconds=300, maxsize=32, error_ttl=10, vary_query=False):
+    """엔드포인트 응답 캐싱
+
+    vary_query: 쿼리 파라미터별로 따로 캐싱하고 뷰 함수에 query(dict)로 넘김
+        (stale 갱신 스레드에는 요청 컨텍스트가 없어서 request.args를 읽을 수 없음)
+
+    - 응답은 직렬화된 바이트(+gzip)와 ETag로 저장, If-None-Match가 맞으면 304
+    - 동시에 들어온 미스는 한 번만 실행 (나머지는 결과 대기)
+    - 만료 후 같은 시간만큼은 옛 응답을 주면서 백그라운드에서 갱신
+    - 5xx 응답과 예외는 error_ttl초 동안만 캐싱 (만료 후 stale로 내주지 않음)
+    - 공유 캐시가 있으면 워커끼리 직렬화된 응답을 공유 (워커 하나만 생성)
+    """
     def decorator(func):
-        cache = {}
-        cache_time = {}
-        
+        cache = TTLCache(ttl=seconds, maxsize=maxsize, stale_ttl=seconds,
+                         error_ttl=error_ttl, name=func.__name__)
+        _route_caches.append(cache)
+
+        def ttl_for(cached):
+            return error_ttl if cached.status >= 500 else seconds
+
         def wrapper(*args, **kwargs):
-            key = (func.__name__, args, tuple(sorted(kwargs.items())))
-            now = datetime.now()
-            
-            if key in cache and (now - cache_time[key]).total_seconds() < seconds:
-                return cache[key]
-            
+            key = (args, tuple(sorted(kwargs.items())))
+            if vary_query:
+                query = request.args.to_dict()
+                key += (tuple(sorted(query.items())),)
+                kwargs = dict(kwargs, query=query)
+
+            def render():
+                # stale 갱신은 별도 스레드에서 돌므로 앱 컨텍스트를 직접 연다
+                with app.app_context():
+                    return serialize_response(app.make_response(func(*args, **kwargs)))
+
+            def load():
+                if shared_store is None:
+                    return render()
+                return shared_store.get_or_load(f"route:{func.__name__}:{key!r}", render, ttl=ttl_for)
+
             try:
-                result = func(*args, **kwargs)
-                cache[key] = result
-                cache_time[key] = now
-                return result
+                cached = cache.get_or_load(key, load, ttl=ttl_for, stale=lambda cached: cached.status < 500)
             except Exception as e:
                 logger.error(f"캐시 함수 실행 실패 {func.__name__}: {e}")
                 return {"error": str(e)}
+            return build_response(cached, request)
         
         wrapper.__name__ = func.__name__  # Flask 엔드포인트 이름 설정 중요!
+        wrapper.cache = cache
         return wrapper
     return decorator
 
 
-# ============ API 엔드포인트 ============
+# ============ 페이지 ============
 
 @app.route('/')
 def index():
@@ -81,17 +156,186 @@ def serve_static(path):
         return jsonify({"error": "파일을 찾을 수 없습니다"}), 404
 
 
+# ============ 응답 조립 (개별 API와 대시보드 공용) ============
+
+def build_quiet_times(arrivals, prediction, table):
+    """통합 추천 + 시간대 추천 (시간대 추천은 한 번만 계산해서 공유)"""
+    quiet_times = get_quiet_time_recommendations(table)
+    return {
+        "unified_recommendation": get_unified_recommendation(
+            arrivals, ml_prediction=prediction, quiet_times=quiet_times
+        ),
+        "detailed_recommendations": quiet_times
+    }
+
+
+def build_bus(arrivals):
+    """버스별 승객 수 + 상세 추천 + 편안함 통계"""
+    # 승객 수 분석 1회 → 나머지는 결과 재사용
+    occupancy_data = analyze_bus_occupancy(arrivals)
+    detailed_buses = get_detailed_bus_recommendations(occupancy_data)
+    comfort_stats = get_comfort_statistics(occupancy_data)
+    
+    # 응답 경계에서만 기존 JSON 모양으로 변환
+    analyzed = isinstance(occupancy_data, StationSnapshot)
+    result = {
+        "buses": occupancy_data.occupancy_dict()["buses"] if analyzed else [],
+        "detailed_recommendations": detailed_buses.get("buses", []),
+        "comfort_stats": comfort_stats
+    }
+    
+    if not analyzed:
+        result["warning"] = occupancy_data["error"]
+    
+    return result
+
+
+def build_prediction(table, weather, events, road_traffic):
+    """예측 조회표에 실시간 날씨/이벤트/도로 영향 반영 (요청마다 모델을 평가하지 않음)"""
+    prediction = predict_from_table(table, weather=weather, road_traffic=road_traffic)
+    
+    return {
+        **prediction,
+        "confidence": slot_confidence(ROUTES),
+        "events": events.get('events', []),
+        "event_recommendation": events.get('recommendation', ''),
+        "traffic_recommendation": road_traffic.get('recommendation', ''),
+        "congested_roads": road_traffic.get('congested_roads', []),
+        "smooth_roads": road_traffic.get('smooth_roads', [])
+    }
+
+
+def build_traffic(arrivals):
+    """배차간격 분석"""
+    return calculate_headway_pattern(arrivals)
+
+
+def build_weather(weather):
+    """날씨 (오류면 오류 그대로)"""
+    return dict(weather)
+
+
+def build_dashboard(snapshot):
+    """한 스냅샷으로 대시보드 전체 섹션 조립
+
+    섹션 하나가 실패해도 나머지는 그대로 내려준다.
+    """
+    sections = {
+        "quiet_times": (lambda: build_quiet_times(snapshot["arrivals"], snapshot["prediction"],
+                                                  snapshot["prediction_table"]),
+                        "추천 데이터를 가져올 수 없습니다"),
+        "bus": (lambda: build_bus(snapshot["arrivals"]),
+                "버스 정보를 가져올 수 없습니다"),
+        "prediction": (lambda: build_prediction(snapshot["prediction_table"], snapshot["weather"],
+                                                snapshot["events"], snapshot["road_traffic"]),
+                       "예측 데이터를 가져올 수 없습니다"),
+        "weather": (lambda: build_weather(snapshot["weather"]),
+                    "날씨 데이터를 가져올 수 없습니다"),
+        "traffic": (lambda: build_traffic(snapshot["arrivals"]),
+                    "교통 데이터를 가져올 수 없습니다"),
+    }
+    
+    result = {}
+    for name, (build, error_message) in sections.items():
+        try:
+            result[name] = build()
+        except Exception as e:
+            logger.error(f"대시보드 {name} 섹션 오류: {e}", exc_info=True)
+            result[name] = {"error": error_message}
+    return result
+
+
+# 스냅샷 버전별 대시보드 섹션 (SSE 구독자 전체가 공유)
+STREAM_KEEPALIVE = 25  # 초, 프록시가 유휴 연결을 끊지 않도록
+STREAM_MAX_AGE = 300   # 초, 이후 연결을 닫으면 EventSource가 다시 연결 (스레드가 순환되도록)
+# SSE 연결 하나가 gthread 스레드 하나를 점유하므로 워커당 동시 연결 수를 제한해서
+# 나머지 스레드는 일반 API와 /health에 남겨둠
+MAX_STREAMS = int(os.environ.get("MAX_STREAMS", 8))
+_stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+_stream_sections = TTLCache(ttl=600, maxsize=4, name="stream_sections")
+
+
+def get_stream_sections(version):
+    """스냅샷 버전의 {섹션: (ETag, 내용)} - 버전마다 한 번만 조립"""
+    def load():
+        sections = build_dashboard(refresher.current())
+        return {name: (content_etag(payload), payload) for name, payload in sections.items()}
+    return _stream_sections.get_or_load(version, load)
+
+
+# ============ API 엔드포인트 ============
+
+@app.route('/api/dashboard')
+@cache_for(seconds=30)
+def api_dashboard():
+    """대시보드 전체 (추천/버스/예측/날씨/배차간격을 한 번에)"""
+    try:
+        return jsonify({
+            **build_dashboard(refresher.current()),
+            "timestamp": datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"dashboard API 오류: {e}", exc_info=True)
+        return jsonify({"error": "대시보드 데이터를 가져올 수 없습니다"}), 500
+
+
+@app.route('/api/stream')
+def api_stream():
+    """대시보드 변경분 푸시 (Server-Sent Events)
+
+    스냅샷이 갱신될 때마다 내용이 바뀐 섹션만 `update` 이벤트로 보낸다.
+    첫 이벤트에는 모든 섹션이 들어간다.
+    워커당 MAX_STREAMS개까지만 받고(넘으면 503), 연결은 STREAM_MAX_AGE초 뒤에 닫는다.
+    """
+    if not _stream_slots.acquire(blocking=False):
+        response = jsonify({"error": "실시간 연결이 많습니다. 잠시 후 다시 시도해주세요"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "30"
+        return response
+
+    def generate():
+        sent_etags = {}
+        version = None
+        deadline = time.monotonic() + STREAM_MAX_AGE
+        yield "retry: 5000\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            version = refresher.wait_for_update(version, timeout=min(STREAM_KEEPALIVE, remaining))
+            refresher.current()  # 갱신 스레드가 꺼져 있으면 여기서 만료된 값을 다시 조회
+            version = refresher.version
+            
+            changed = {}
+            for name, (etag, payload) in get_stream_sections(version).items():
+                if sent_etags.get(name) != etag:
+                    sent_etags[name] = etag
+                    changed[name] = payload
+            
+            if changed:
+                changed["timestamp"] = datetime.now().isoformat()
+                yield f"event: update\ndata: {json.dumps(changed, ensure_ascii=False)}\n\n"
+            else:
+                yield ": keepalive\n\n"
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    # 생성기가 한 번도 돌지 않고 끊겨도 응답이 닫힐 때 자리를 돌려줌
+    response.call_on_close(_stream_slots.release)
+    return response
+
+
 @app.route('/api/quiet-times')
 @cache_for(seconds=60)
 def api_quiet_times():
     """통합 추천 시스템"""
     try:
-        unified = get_unified_recommendation()
-        detailed_recommendations = get_quiet_time_recommendations()
-        
         return jsonify({
-            "unified_recommendation": unified,
-            "detailed_recommendations": detailed_recommendations,
+            **build_quiet_times(refresher.get_or_fetch("arrivals"), refresher.get_or_fetch("prediction"),
+                                refresher.get_or_fetch("prediction_table")),
             "timestamp": datetime.now().isoformat()
         })
     except Exception as e:
@@ -104,21 +348,10 @@ def api_quiet_times():
 def api_bus():
     """개별 버스별 상세 추천"""
     try:
-        detailed_buses = get_detailed_bus_recommendations()
-        occupancy_data = analyze_bus_occupancy()
-        comfort_stats = get_comfort_statistics()
-        
-        result = {
-            "buses": occupancy_data.get("buses", []),
-            "detailed_recommendations": detailed_buses.get("buses", []),
-            "comfort_stats": comfort_stats,
+        return jsonify({
+            **build_bus(refresher.get_or_fetch("arrivals")),
             "timestamp": datetime.now().isoformat()
-        }
-        
-        if "error" in occupancy_data:
-            result["warning"] = occupancy_data["error"]
-        
-        return jsonify(result)
+        })
     except Exception as e:
         logger.error(f"bus API 오류: {e}", exc_info=True)
         return jsonify({"error": "버스 정보를 가져올 수 없습니다"}), 500
@@ -129,46 +362,92 @@ def api_bus():
 def api_prediction():
     """ML 예측 모델 + 이벤트 + 교통"""
     try:
-        prediction = predict_congestion()
-        events = calculate_event_impact()
-        road_traffic = get_traffic_info()
-        
-        # 모든 영향 반영
-        base_pred = prediction.get('predicted_congestion', 0)
-        event_factor = events.get('impact_factor', 1)
-        traffic_factor = road_traffic.get('total_impact', 1)
-        
-        final_prediction = base_pred * event_factor * traffic_factor
-        
-        result = {
-            "predicted_congestion": round(final_prediction, 2),
-            "base_prediction": base_pred,
-            "event_impact": event_factor,
-            "traffic_impact": traffic_factor,
-            "confidence": prediction.get('confidence', 0),
-            "recommendation": prediction.get('recommendation', ''),
-            "events": events.get('events', []),
-            "event_recommendation": events.get('recommendation', ''),
-            "traffic_recommendation": road_traffic.get('recommendation', ''),
-            "congested_roads": road_traffic.get('congested_roads', []),
-            "smooth_roads": road_traffic.get('smooth_roads', []),
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        return jsonify(result)
+        result = build_prediction(
+            refresher.get_or_fetch("prediction_table"),
+            refresher.get_or_fetch("weather"),
+            refresher.get_or_fetch("events"),
+            refresher.get_or_fetch("road_traffic")
+        )
+        return jsonify({**result, "timestamp": datetime.now().isoformat()})
     except Exception as e:
         logger.error(f"prediction API 오류: {e}", exc_info=True)
         return jsonify({"error": "예측 데이터를 가져올 수 없습니다"}), 500
 
 
+MAX_RANGE_POINTS = 7 * 24 * 12  # 5분 간격 7일
+MAX_RANGE_STEP = 24 * 60  # 간격은 최대 하루
+
+
+def parse_range_args(args, now=None):
+    """from/to/step/route 쿼리 → (시작, 끝, 간격(분), 노선), 잘못된 값이면 ValueError
+
+    from/to: ISO 시각("2025-01-06T07:00") 또는 오늘의 "HH:MM", 기본값은 오늘 하루
+    시간대가 붙은 시각("...+09:00")은 서버 현지 시각으로 바꿔서 쓴다.
+    """
+    now = now or datetime.now()
+
+    def parse_time(value):
+        if len(value) <= 5:
+            return datetime.combine(now.date(), datetime.strptime(value, "%H:%M").time())
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is not None:
+            moment = moment.astimezone().replace(tzinfo=None)
+        return moment
+
+    start = parse_time(args["from"]) if args.get("from") else datetime.combine(now.date(), datetime.min.time())
+    end = parse_time(args["to"]) if args.get("to") else start + timedelta(days=1)
+    try:
+        step = int(args.get("step", 10))
+    except ValueError:
+        raise ValueError("step은 분 단위 정수여야 합니다") from None
+    route = args.get("route") or None
+    if not 1 <= step <= MAX_RANGE_STEP:
+        raise ValueError(f"step은 1~{MAX_RANGE_STEP}분이어야 합니다")
+    if end <= start:
+        raise ValueError("to는 from보다 뒤여야 합니다")
+    if (end - start) / timedelta(minutes=step) > MAX_RANGE_POINTS:
+        raise ValueError(f"한 번에 최대 {MAX_RANGE_POINTS}개 시점까지 예측할 수 있습니다")
+    if route is not None and route not in ROUTES:
+        raise ValueError(f"지원하지 않는 노선입니다: {route}")
+    return start, end, step, route
+
+
+@app.route('/api/prediction/range')
+@cache_for(seconds=300, maxsize=64, vary_query=True)
+def api_prediction_range(query):
+    """구간 예측 - from~to를 step분 간격으로 한 번에 계산 (하루치 차트용)"""
+    try:
+        start, end, step, route = parse_range_args(query)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        result = predict_range(
+            start, end, step,
+            table=refresher.get_or_fetch("prediction_table"),
+            weather=refresher.get_or_fetch("weather"),
+            road_traffic=refresher.get_or_fetch("road_traffic"),
+            route=route,
+        )
+        return jsonify({
+            **result,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "step": step,
+            "route": route,
+            "timestamp": datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"prediction range API 오류: {e}", exc_info=True)
+        return jsonify({"error": "구간 예측 데이터를 가져올 수 없습니다"}), 500
+
+
 @app.route('/api/traffic')
 @cache_for(seconds=300)
 def api_traffic():
     """교통 빅데이터 (배차간격 분석)"""
     try:
-        headway_data = calculate_headway_pattern()
         return jsonify({
-            **headway_data,  # 배차간격 데이터 직접 포함
+            **build_traffic(refresher.get_or_fetch("arrivals")),  # 배차간격 데이터 직접 포함
             "timestamp": datetime.now().isoformat()
         })
     except Exception as e:
@@ -181,7 +460,7 @@ def api_traffic():
 def api_weather():
     """날씨 정보"""
     try:
-        weather = get_weather_data()
+        weather = build_weather(refresher.get_or_fetch("weather"))
         if "error" in weather:
             return jsonify(weather), 500
         
@@ -232,10 +511,28 @@ def server_error(error):
 
 # ============ 헬스체크 ============
 
+def get_quota_usage():
+    """업스트림 호출 한도 버킷별 오늘 사용량 (한도 관리가 꺼져 있거나 저장소 오류면 None)"""
+    scheduler = get_scheduler()
+    if scheduler is None:
+        return None
+    try:
+        return scheduler.usage()
+    except Exception as e:
+        logger.error(f"호출 한도 사용량 조회 실패: {e}")
+        return None
+
+
 @app.route('/health')
 def health():
     """서버 상태 확인"""
-    return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()}), 200
+    return jsonify({
+        "status": "healthy",
+        "background_refresh": refresher.running,
+        "caches": [cache.stats() for cache in _route_caches],
+        "quota": get_quota_usage(),
+        "timestamp": datetime.now().isoformat()
+    }), 200
 
 
 if __name__ == "__main__":
@@ -244,4 +541,7 @@ if __name__ == "__main__":
     
     # 개발 환경: debug=True, 프로덕션: debug=False
     debug = os.environ.get("FLASK_ENV") == "development"
+    # 디버그 리로더의 부모 프로세스에서는 갱신 스레드를 띄우지 않음
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_refresh()
     app.run(host="0.0.0.0", port=port, debug=debug)
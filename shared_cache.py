@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""프로세스 간 공유 캐시 - SQLite 파일 기반 (gunicorn 워커끼리 공유)"""
+import fcntl
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_ENV = "SHARED_CACHE_PATH"
+
+
+class LocalConnection:
+    """프로세스/스레드마다 따로 여는 SQLite 연결 (fork 안전, WAL)
+
+    호출하면 현재 스레드의 연결을 반환하고, fork된 자식에서는 새로 연다.
+    schema(CREATE TABLE IF NOT EXISTS ...)는 처음 만들 때 한 번 실행한다.
+    """
+
+    def __init__(self, path, schema):
+        self.path = str(path)
+        self._local = threading.local()
+        self().executescript(schema)
+
+    def __call__(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+class SharedCache:
+    """SQLite 기반 TTL 키-값 저장소
+
+    같은 파일을 여는 모든 프로세스가 값을 공유한다.
+    값은 pickle로 저장하며, 연결은 프로세스/스레드마다 따로 연다 (fork 안전).
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._conn = LocalConnection(path, """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                updated_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY,
+                owner INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            );
+        """)
+        self._leader_file = None
+
+    def get(self, key, default=None):
+        """만료되지 않은 값 반환"""
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return pickle.loads(row[0]) if row else default
+
+    def get_if_newer(self, key, since):
+        """since(epoch초) 이후에 저장된 값이면 (값, 저장 시각), 아니면 None"""
+        row = self._conn().execute(
+            "SELECT value, updated_at FROM cache WHERE key = ? AND updated_at > ? AND expires_at > ?",
+            (key, since, time.time())
+        ).fetchone()
+        return (pickle.loads(row[0]), row[1]) if row else None
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, updated_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now, now + ttl)
+        )
+        return now
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+    def acquire_lease(self, key, seconds):
+        """key에 대한 짧은 작업 권한 획득 (다른 프로세스가 갖고 있으면 False)"""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+            if row and row[0] > now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, os.getpid(), now + seconds)
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release_lease(self, key):
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, os.getpid()))
+
+    def get_or_load(self, key, loader, ttl, wait=5):
+        """공유 캐시 값 반환, 없으면 프로세스 하나만 loader 실행
+
+        다른 프로세스가 로딩 중이면 최대 wait초 동안 결과를 기다리고,
+        그래도 없으면 직접 실행한다.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        lease_key = f"load:{key}"
+        deadline = time.monotonic() + wait
+        while not self.acquire_lease(lease_key, wait):
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+            value = self.get(key)
+            if value is not None:
+                return value
+
+        try:
+            value = loader()
+            self.set(key, value, ttl(value) if callable(ttl) else ttl)
+            return value
+        finally:
+            self.release_lease(lease_key)
+
+    def try_become_leader(self):
+        """프로세스 전체에서 하나만 잡을 수 있는 리더 잠금 (프로세스 종료 시 자동 해제)"""
+        if self._leader_file is not None:
+            return True
+        lock_file = open(self.path + ".leader", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._leader_file = lock_file
+        logger.info(f"공유 캐시 리더 획득 (pid {os.getpid()})")
+        return True
+
+
+def get_shared_cache():
+    """SHARED_CACHE_PATH 환경변수가 있으면 공유 캐시, 없으면 None"""
+    path = os.environ.get(SHARED_CACHE_ENV)
+    return SharedCache(path) if path else None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""슬롯별 온라인 통계 - 평일/주말 × 10분 슬롯 × 노선별 승객 수/혼잡도의 평균·분산
+
+수집 기록 1건마다 Welford 방식으로 O(1) 갱신하므로 이력 전체를 다시 읽지 않고도
+실제 분산에 기반한 신뢰구간을 낼 수 있다.
+"""
+import math
+from datetime import datetime
+from pathlib import Path
+
+from bus_state import congestion_code
+from history_meta import sidecar_api
+from history_rollup import slot_label, slot_of
+from passenger_estimate import estimate_passenger_count, get_bus_capacity
+
+STATS_FILE = Path("realtime_data.slotstats.json")
+METRICS = ("passengers", "congestion1", "congestion2")
+Z_95 = 1.96
+CONFIDENCE_TOLERANCE = 0.5  # 혼잡도 코드 95% 신뢰구간 반폭이 이 값 이상이면 신뢰도 0
+MIN_CONGESTION_STD = 0.5    # 관측이 적어 분산이 0으로 나와도 코드 단위만큼의 불확실성은 둠
+
+
+def day_type(moment):
+    """0: 평일, 1: 주말"""
+    return int(moment.weekday() >= 5)
+
+
+def _empty_stats():
+    return {
+        "cells": {},  # "평일/주말:슬롯:노선" → [n, 평균, M2] × METRICS
+    }
+
+
+def _update(cell, offset, value):
+    """Welford 갱신 - cell[offset:offset + 3] = [n, 평균, 편차 제곱합]"""
+    n = cell[offset] + 1
+    delta = value - cell[offset + 1]
+    mean = cell[offset + 1] + delta / n
+    cell[offset] = n
+    cell[offset + 1] = mean
+    cell[offset + 2] += delta * (value - mean)
+
+
+def _add_record(stats, record):
+    now = datetime.strptime(record["timestamp"], "%Y-%m-%d %H:%M:%S")
+    prefix = f"{day_type(now)}:{slot_of(now.hour, now.minute)}"
+    for bus in record.get("buses", []):
+        route = bus["route"]
+        codes = (congestion_code(bus.get("congestion1")), congestion_code(bus.get("congestion2")))
+        if not any(codes):
+            continue
+        cell = stats["cells"].setdefault(f"{prefix}:{route}", [0, 0.0, 0.0] * len(METRICS))
+        if codes[0]:
+            passengers = estimate_passenger_count(codes[0], get_bus_capacity(route), route, now=now)
+            _update(cell, 0, passengers["passengers"])
+        for i, code in enumerate(codes, start=1):
+            if code:
+                _update(cell, 3 * i, code)
+
+
+load_slot_stats, rebuild_slot_stats = sidecar_api(STATS_FILE, _empty_stats, _add_record)
+update_slot_stats = load_slot_stats
+
+
+def _summary(cell, offset):
+    n, mean, m2 = cell[offset:offset + 3]
+    if n == 0:
+        return None
+    std = math.sqrt(m2 / (n - 1)) if n > 1 else None
+    half = Z_95 * std / math.sqrt(n) if std is not None else None
+    return {
+        "count": n,
+        "mean": round(mean, 2),
+        "std": round(std, 2) if std is not None else None,
+        "ci95": [round(mean - half, 2), round(mean + half, 2)] if half is not None else None,
+    }
+
+
+def slot_summary(route, moment=None, stats=None):
+    """해당 시각 슬롯의 노선 통계 {지표: {count, mean, std, ci95}} (관측이 없으면 None)"""
+    moment = moment or datetime.now()
+    stats = stats if stats is not None else load_slot_stats()
+    cell = stats["cells"].get(f"{day_type(moment)}:{slot_of(moment.hour, moment.minute)}:{route}")
+    if cell is None:
+        return None
+    return {metric: _summary(cell, 3 * i) for i, metric in enumerate(METRICS)}
+
+
+def congestion_confidence(summary):
+    """혼잡도 95% 신뢰구간 폭 기반 신뢰도 (0~1, 관측 2건 미만이면 0)"""
+    congestion = summary and summary["congestion1"]
+    if not congestion or congestion["std"] is None:
+        return 0.0
+    half = Z_95 * max(congestion["std"], MIN_CONGESTION_STD) / math.sqrt(congestion["count"])
+    return round(max(0.0, 1.0 - half / CONFIDENCE_TOLERANCE), 2)
+
+
+def slot_confidence(routes, moment=None, stats=None):
+    """노선들의 현재 슬롯 신뢰도 평균 (관측이 없는 노선은 0)"""
+    stats = stats if stats is not None else load_slot_stats()
+    scores = [congestion_confidence(slot_summary(route, moment, stats)) for route in routes]
+    return round(sum(scores) / len(scores), 2) if scores else 0.0
+
+
+if __name__ == "__main__":
+    stats = rebuild_slot_stats()
+    print(f"슬롯 통계 {len(stats['cells'])}칸")
+    for key, cell in sorted(stats["cells"].items()):
+        kind, slot, route = key.split(":")
+        passengers = _summary(cell, 0)
+        if passengers:
+            print(f"  {'주말' if kind == '1' else '평일'} {slot_label(int(slot))} {route}번: "
+                  f"{passengers['mean']}명 (n={passengers['count']}, 95% CI {passengers['ci95']})")
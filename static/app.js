@@ -59,16 +59,23 @@ async function refreshQuietTimes() {
     
     try {
         const response = await fetch('/api/quiet-times');
-        const data = await response.json();
-        
-        document.getElementById('mainRecommendation').innerHTML = formatMainRecommendation(data.unified_recommendation);
-        document.getElementById('quietTimesInfo').innerHTML = formatQuietTimesInfo(data.detailed_recommendations);
+        renderQuietTimes(await response.json());
     } catch (e) {
         document.getElementById('mainRecommendation').innerHTML = '오류: ' + e.message;
         document.getElementById('quietTimesInfo').innerHTML = '오류: ' + e.message;
     }
 }
 
+function renderQuietTimes(data) {
+    if (data.error) {
+        document.getElementById('mainRecommendation').innerHTML = '오류: ' + data.error;
+        document.getElementById('quietTimesInfo').innerHTML = '오류: ' + data.error;
+        return;
+    }
+    document.getElementById('mainRecommendation').innerHTML = formatMainRecommendation(data.unified_recommendation);
+    document.getElementById('quietTimesInfo').innerHTML = formatQuietTimesInfo(data.detailed_recommendations);
+}
+
 function formatMainRecommendation(unified) {
     const main = unified.main_recommendation;
     const statusClass = main.color === '#22c55e' ? 'status-success' : 
@@ -134,13 +141,17 @@ async function refreshPrediction() {
     document.getElementById('predictionInfo').innerHTML = '로딩 중...';
     try {
         const response = await fetch('/api/prediction');
-        const data = await response.json();
-        document.getElementById('predictionInfo').innerHTML = formatPredictionInfo(data);
+        renderPrediction(await response.json());
     } catch (e) {
         document.getElementById('predictionInfo').innerHTML = '오류: ' + e.message;
     }
 }
 
+function renderPrediction(data) {
+    document.getElementById('predictionInfo').innerHTML =
+        data.error ? '오류: ' + data.error : formatPredictionInfo(data);
+}
+
 function formatPredictionInfo(data) {
     const confidence = Math.round(data.confidence * 100);
     const congestionColor = data.predicted_congestion < 0.7 ? '#22c55e' : 
@@ -187,13 +198,16 @@ async function refreshWeather() {
     document.getElementById('weatherInfo').innerHTML = '로딩 중...';
     try {
         const response = await fetch('/api/weather');
-        const data = await response.json();
-        document.getElementById('weatherInfo').innerHTML = formatWeatherInfo(data);
+        renderWeather(await response.json());
     } catch (e) {
         document.getElementById('weatherInfo').innerHTML = '오류: ' + e.message;
     }
 }
 
+function renderWeather(data) {
+    document.getElementById('weatherInfo').innerHTML = formatWeatherInfo(data);
+}
+
 function formatWeatherInfo(data) {
     if (data.error) return `<div class="status-box status-danger">❌ ${data.error}</div>`;
     
@@ -217,13 +231,16 @@ async function refreshTraffic() {
     document.getElementById('trafficInfo').innerHTML = '로딩 중...';
     try {
         const response = await fetch('/api/traffic');
-        const data = await response.json();
-        document.getElementById('trafficInfo').innerHTML = formatTrafficInfo(data);
+        renderTraffic(await response.json());
     } catch (e) {
         document.getElementById('trafficInfo').innerHTML = '오류: ' + e.message;
     }
 }
 
+function renderTraffic(data) {
+    document.getElementById('trafficInfo').innerHTML = formatTrafficInfo(data);
+}
+
 function formatTrafficInfo(data) {
     // timestamp 제외한 실제 데이터만 필터링
     const routes = Object.entries(data).filter(([key]) => key !== 'timestamp' && key !== 'error');
@@ -264,13 +281,16 @@ async function refreshBus() {
     document.getElementById('busInfo').innerHTML = '로딩 중...';
     try {
         const response = await fetch('/api/bus');
-        const data = await response.json();
-        document.getElementById('busInfo').innerHTML = formatBusInfo(data);
+        renderBus(await response.json());
     } catch (e) {
         document.getElementById('busInfo').innerHTML = '오류: ' + e.message;
     }
 }
 
+function renderBus(data) {
+    document.getElementById('busInfo').innerHTML = formatBusInfo(data);
+}
+
 function formatBusInfo(data) {
     if (data.error) return `<div class="bus-item"><div class="status-box status-danger">❌ ${data.error}</div></div>`;
     if (!data.buses || data.buses.length === 0) return '<div class="bus-item"><div class="status-box status-light">📍 버스 정보 없음</div></div>';
@@ -334,21 +354,67 @@ function formatBusInfo(data) {
     return html;
 }
 
-// 페이지 로드시 정보 가져오기
-function refreshAll() {
-    refreshQuietTimes();
-    refreshBus();
-    refreshPrediction();
-    refreshWeather();
-    refreshTraffic();
+// 대시보드 섹션별 렌더러
+const sectionRenderers = {
+    quiet_times: renderQuietTimes,
+    bus: renderBus,
+    prediction: renderPrediction,
+    weather: renderWeather,
+    traffic: renderTraffic
+};
+
+// 대시보드 전체 또는 바뀐 섹션만 렌더링 (같은 시점의 데이터)
+function renderDashboard(data) {
+    for (const [name, render] of Object.entries(sectionRenderers)) {
+        if (data[name]) render(data[name]);
+    }
     document.getElementById('lastUpdate').textContent = 
-        '마지막 업데이트: ' + new Date().toLocaleTimeString('ko-KR');
+        '마지막 업데이트: ' + new Date(data.timestamp).toLocaleTimeString('ko-KR');
+}
+
+// 페이지 로드시 정보 가져오기
+async function refreshAll() {
+    try {
+        const response = await fetch('/api/dashboard');
+        const data = await response.json();
+        if (data.error) throw new Error(data.error);
+        renderDashboard(data);
+    } catch (e) {
+        ['mainRecommendation', 'quietTimesInfo', 'predictionInfo', 'weatherInfo', 'busInfo', 'trafficInfo']
+            .forEach(id => { document.getElementById(id).innerHTML = '오류: ' + e.message; });
+    }
 }
 
-refreshAll();
+// 실시간 푸시 (SSE) - 연결이 안 되면 60초 폴링으로 대체
+let pollTimer = null;
+
+function startPolling() {
+    if (pollTimer) return;
+    refreshAll();
+    pollTimer = setInterval(refreshAll, 60000);
+}
+
+function stopPolling() {
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
+
+function connectStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    const source = new EventSource('/api/stream');
+    // 서버는 바뀐 섹션만 보냄 (첫 이벤트는 전체)
+    source.addEventListener('update', (event) => {
+        stopPolling();
+        renderDashboard(JSON.parse(event.data));
+    });
+    // 끊기면 브라우저가 재연결을 시도하는 동안 폴링
+    source.onerror = () => startPolling();
+}
 
-// 60초마다 자동 새로고침
-setInterval(refreshAll, 60000);
+connectStream();
 
 // 현재 요일 표시 (요소가 있으면 표시)
 const days = ['일요일', '월요일', '화요일', '수요일', '목요일', '금요일', '토요일'];
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""정류장 도착정보 스냅샷 - 한 틱에 정류장당 한 번만 조회해서 공유"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bus_state import StationSnapshot, merge_snapshots
+from registry import get_registry
+from seoul_api import get_bus_arrival_info
+from ttl_cache import TTLCache
+
+STATIONS = get_registry().station_ids  # 설정된 전체 정류장 (합친 스냅샷 기본값)
+DEFAULT_STATION = STATIONS[0]
+SNAPSHOT_TTL = 30          # 같은 틱으로 보는 시간(초)
+ERROR_TTL = 5              # 오류 응답은 짧게 유지
+
+_snapshots = TTLCache(ttl=SNAPSHOT_TTL, maxsize=64, error_ttl=ERROR_TTL, name="station_snapshot")
+
+
+def _snapshot_ttl(data):
+    return SNAPSHOT_TTL if isinstance(data, StationSnapshot) else ERROR_TTL
+
+
+def get_station_snapshot(station_id=DEFAULT_STATION, refresh=False):
+    """정류장 도착정보 스냅샷 반환
+
+    SNAPSHOT_TTL초 이내에 조회한 결과가 있으면 그대로 재사용한다.
+    동시에 여러 요청이 들어와도 실제 API 호출은 한 번만 일어난다.
+    refresh=True면 캐시를 무시하고 새로 조회한다 (수집기/백그라운드 갱신용).
+    반환값은 여러 모듈이 공유하므로 수정하지 말 것.
+    """
+    if refresh:
+        _snapshots.delete(station_id)
+    return _snapshots.get_or_load(
+        station_id, lambda: get_bus_arrival_info(station_id), ttl=_snapshot_ttl
+    )
+
+
+# 여러 정류장을 동시에 조회 (틱마다 스레드를 새로 만들지 않도록 재사용)
+# (동시 요청 수는 http_client의 호스트별 제한을 따르고, 호출 한도 우선순위는 호출한 쪽 것을 이어받음)
+_executor = ThreadPoolExecutor(max_workers=min(len(STATIONS), 8), thread_name_prefix="station")
+_merged = {}  # 정류장 목록 → (원본 스냅샷들, 합친 스냅샷)
+_merged_lock = threading.Lock()
+
+
+def get_station_snapshots(stations=STATIONS, refresh=False):
+    """정류장별 스냅샷 {정류장: 스냅샷 또는 오류} - 정류장마다 따로 캐싱, 동시에 조회"""
+    stations = tuple(stations)
+    if len(stations) == 1:
+        return {stations[0]: get_station_snapshot(stations[0], refresh)}
+    futures = {
+        station: _executor.submit(contextvars.copy_context().run, get_station_snapshot, station, refresh)
+        for station in stations
+    }
+    snapshots = {}
+    for station, future in futures.items():
+        try:
+            snapshots[station] = future.result()
+        except Exception as e:
+            snapshots[station] = {"error": str(e)}
+    return snapshots
+
+
+def get_merged_snapshot(stations=STATIONS, refresh=False):
+    """여러 정류장의 도착정보를 노선·방향별로 합친 스냅샷 (레지스트리에 설정된 노선만)
+
+    원본 스냅샷이 그대로면 같은 합친 스냅샷 객체를 돌려주므로
+    승객 수 분석 결과도 그대로 재사용된다. 모든 정류장이 실패하면 오류 dict.
+    """
+    stations = tuple(stations)
+    snapshots = get_station_snapshots(stations, refresh)
+    sources = tuple(snapshots[station] for station in stations)
+    with _merged_lock:
+        cached = _merged.get(stations)
+        if cached and all(a is b for a, b in zip(cached[0], sources)):
+            return cached[1]
+    merged = merge_snapshots(snapshots, get_registry().station_routes())
+    with _merged_lock:
+        _merged[stations] = (sources, merged)
+    return merged
+
+
+def invalidate_snapshot(station_id=None):
+    """스냅샷 무효화 (station_id 없으면 전체)"""
+    if station_id is None:
+        _snapshots.clear()
+    else:
+        _snapshots.delete(station_id)
+    with _merged_lock:
+        _merged.clear()
+
+
+def get_snapshot_stats():
+    """스냅샷 캐시 통계"""
+    return _snapshots.stats()
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    first = get_merged_snapshot()
+    elapsed_first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    second = get_merged_snapshot()
+    elapsed_second = time.perf_counter() - start
+
+    print(f"정류장 {', '.join(STATIONS)} 동시 조회: {elapsed_first*1000:.1f}ms, 재사용: {elapsed_second*1000:.3f}ms")
+    print(f"동일 객체: {first is second}")
+    print(first.to_dict() if isinstance(first, StationSnapshot) else first)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""도착 메시지 파서 테스트"""
+import unittest
+
+from arrival_parser import ARRIVING, ENDED, RUNNING, UNKNOWN, WAITING, parse_arrival
+from traffic_data import calculate_headway_pattern
+
+
+class TestParseArrival(unittest.TestCase):
+    """arrmsg 문자열 → (초, 남은 정류장, 상태)"""
+
+    def test_minutes_seconds_and_stops(self):
+        arrival = parse_arrival("3분12초후[2번째 전]")
+        self.assertEqual((arrival.seconds, arrival.stops_away, arrival.status), (192, 2, RUNNING))
+        self.assertEqual(arrival.minutes, 3)
+
+    def test_minutes_only_and_seconds_only(self):
+        self.assertEqual(parse_arrival("8분후[4번째 전]").seconds, 480)
+        self.assertEqual(parse_arrival("45초후[1번째 전]").seconds, 45)
+        self.assertIsNone(parse_arrival("5분후").stops_away)
+
+    def test_special_statuses(self):
+        self.assertEqual(parse_arrival("곧 도착").status, ARRIVING)
+        self.assertEqual(parse_arrival("곧 도착").seconds, 0)
+        self.assertEqual(parse_arrival("출발대기").status, WAITING)
+        self.assertEqual(parse_arrival("운행종료").status, ENDED)
+        self.assertIsNone(parse_arrival("운행종료").seconds)
+        self.assertEqual(parse_arrival("").status, UNKNOWN)
+        self.assertEqual(parse_arrival(None).status, UNKNOWN)
+
+    def test_memoized(self):
+        self.assertIs(parse_arrival("7분3초후[3번째 전]"), parse_arrival("7분3초후[3번째 전]"))
+
+
+class TestHeadwayPattern(unittest.TestCase):
+    """파싱된 도착 정보로 배차간격 추정"""
+
+    def test_arriving_bus_counts(self):
+        headway = calculate_headway_pattern({"buses": [
+            {"route": "421", "arrival1": "곧 도착", "arrival2": "8분12초후[4번째 전]"},
+            {"route": "400", "arrival1": "출발대기", "arrival2": "운행종료"},
+        ]})
+        self.assertEqual(headway["421"]["estimated_headway"], 8)
+        self.assertEqual(headway["421"]["second_bus_stops"], 4)
+        self.assertNotIn("400", headway)
+
+
+if __name__ == "__main__":
+    unittest.main()
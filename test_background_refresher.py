@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""백그라운드 갱신기 테스트"""
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from background_refresher import BackgroundRefresher
+from shared_cache import SharedCache
+
+
+class TestSharedStore(unittest.TestCase):
+    """공유 캐시를 쓰는 갱신기 테스트"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SharedCache(Path(self.tmp.name) / "cache.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _keys(self):
+        return [row[0] for row in self.store._conn().execute("SELECT key FROM cache ORDER BY key")]
+
+    def test_leader_purges_expired_entries(self):
+        self.store.set("route:old", "x", ttl=-1)
+        self.store.set("route:fresh", "y", ttl=60)
+        refresher = BackgroundRefresher(max_workers=1, store=self.store)
+        refresher.start()
+        try:
+            for _ in range(100):
+                if "route:old" not in self._keys():
+                    break
+                time.sleep(0.01)
+        finally:
+            refresher.stop()
+        self.assertEqual(self._keys(), ["route:fresh"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""정류장 도착정보 모델 테스트"""
+import functools
+import pickle
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import occupancy_analysis
+import slot_stats
+import station_snapshot
+from bus_state import RouteState, StationSnapshot, as_snapshot, merge_snapshots
+from occupancy_analysis import analyze_bus_occupancy, get_comfort_statistics
+from utils import find_best_bus
+
+ITEMS = [
+    {"rtNm": "421", "adirection": "매봉역", "arrmsg1": "3분12초후[2번째 전]",
+     "arrmsg2": "11분후[6번째 전]", "congestion1": "3", "congestion2": "1"},
+    {"rtNm": "405", "adirection": "염곡동", "arrmsg1": "곧 도착",
+     "arrmsg2": "운행종료", "congestion1": "2", "congestion2": "0"},
+]
+
+
+class TestStationSnapshot(unittest.TestCase):
+    """스냅샷 생성/직렬화 테스트"""
+
+    def test_serializes_to_api_shape(self):
+        snapshot = StationSnapshot.from_items("03278", ITEMS)
+        self.assertEqual(snapshot.to_dict()["buses"][0], {
+            "station": "03278", "route": "421", "direction": "매봉역",
+            "arrival1": "3분12초후[2번째 전]", "arrival2": "11분후[6번째 전]",
+            "congestion1": "3", "congestion2": "1",
+        })
+        round_trip = as_snapshot(snapshot.to_dict())
+        self.assertEqual(round_trip.to_dict(), snapshot.to_dict())
+        self.assertEqual(snapshot.routes[0].vehicles[0].arrival.seconds, 192)
+
+    def test_pickles_for_shared_cache(self):
+        snapshot = pickle.loads(pickle.dumps(StationSnapshot.from_items("03278", ITEMS)))
+        self.assertEqual(snapshot.routes[1].vehicles[1].arrival.status, "운행종료")
+
+    def test_error_response(self):
+        self.assertIsNone(as_snapshot({"error": "API 키를 찾을 수 없습니다"}))
+        self.assertIn("error", analyze_bus_occupancy({"error": "x"}))
+
+
+class TestOccupancyAnnotation(unittest.TestCase):
+    """승객 수 분석은 같은 스냅샷에 결과를 채움"""
+
+    def setUp(self):
+        # 슬롯 통계는 빈 임시 디렉터리에서 읽음 (작업 디렉터리에 통계 파일이 생기지 않도록)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        load = functools.partial(
+            slot_stats.load_slot_stats, sidecar_file=root / "data.slotstats.json",
+            data_dir=root / "data", legacy_file=root / "data.jsonl")
+        patch = mock.patch.object(occupancy_analysis, "load_slot_stats", load)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_annotates_in_place_once(self):
+        snapshot = StationSnapshot.from_items("03278", ITEMS)
+        analyzed = analyze_bus_occupancy(snapshot)
+        self.assertIs(analyzed, snapshot)
+        first = snapshot.routes[0].vehicles[0]
+        self.assertIsInstance(first.passengers, int)
+        self.assertIsNone(snapshot.routes[1].vehicles[1].passengers)
+
+        occupancy = first.occupancy
+        self.assertIs(analyze_bus_occupancy(snapshot).routes[0].vehicles[0].occupancy, occupancy)
+
+        bus = snapshot.occupancy_dict()["buses"][1]
+        self.assertEqual(bus["bus2_passengers"], "정보없음")
+        self.assertEqual(bus["eta1"]["status"], "곧 도착")
+        self.assertEqual(get_comfort_statistics(snapshot)["total_buses_analyzed"], 3)
+
+    def test_find_best_bus_on_routes(self):
+        snapshot = analyze_bus_occupancy(StationSnapshot.from_items("03278", ITEMS))
+        best, passengers = find_best_bus(snapshot.routes)
+        expected = min(v.passengers for r in snapshot.routes for v in r.vehicles if v.passengers)
+        self.assertEqual(passengers, expected)
+        self.assertIsInstance(snapshot.routes[0], RouteState)
+
+
+def _item(route, direction, message):
+    return {"rtNm": route, "adirection": direction, "arrmsg1": message,
+            "arrmsg2": "운행종료", "congestion1": "2", "congestion2": "0"}
+
+
+class TestMultiStation(unittest.TestCase):
+    """여러 정류장 스냅샷 합치기"""
+
+    def test_merge_is_direction_aware(self):
+        merged = merge_snapshots({
+            "03278": StationSnapshot.from_items("03278", [_item("421", "매봉역", "5분후[3번째 전]")]),
+            "03518": StationSnapshot.from_items("03518", [
+                _item("421", "매봉역", "2분후[1번째 전]"),
+                _item("421", "염곡동", "7분후[4번째 전]"),
+            ]),
+        })
+        routes = {(r.route, r.direction): r for r in merged.routes}
+        self.assertEqual(len(routes), 2)
+        self.assertEqual(routes["421", "매봉역"].station, "03518")  # 먼저 오는 쪽
+        self.assertEqual(merged.station, "03278,03518")
+
+    def test_partial_and_total_failure(self):
+        ok = StationSnapshot.from_items("03278", [_item("400", "매봉역", "곧 도착")])
+        merged = merge_snapshots({"03278": ok, "03518": {"error": "시간 초과"}})
+        self.assertEqual(len(merged.routes), 1)
+        self.assertEqual(merged.errors, {"03518": "시간 초과"})
+        failed = merge_snapshots({"03278": {"error": "a"}, "03518": {"error": "b"}})
+        self.assertEqual(failed, {
+            "error": "03278: a; 03518: b",
+            "station": "03278,03518",
+            "station_errors": {"03278": "a", "03518": "b"},
+        })
+
+    def test_stations_fetched_concurrently_and_merged_once(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fetch(station_id):
+            barrier.wait()  # 두 정류장 조회가 동시에 진행되지 않으면 시간 초과
+            return StationSnapshot.from_items(station_id, [_item("421", station_id, "3분후")])
+
+        station_snapshot.invalidate_snapshot()
+        with mock.patch.object(station_snapshot, "get_bus_arrival_info", fetch):
+            first = station_snapshot.get_merged_snapshot(("03278", "03518"))
+            second = station_snapshot.get_merged_snapshot(("03278", "03518"))
+        station_snapshot.invalidate_snapshot()
+        self.assertIs(first, second)
+        self.assertEqual(sorted(r.station for r in first.routes), ["03278", "03518"])
+
+
+if __name__ == "__main__":
+    unittest.main()
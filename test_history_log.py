@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""수집 이력 구간 읽기 테스트"""
+import io
+import tempfile
+import threading
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+import history_log
+import history_meta
+
+
+class TestHistoryLog(unittest.TestCase):
+    """희소 인덱스 기반 구간 읽기 테스트"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name) / "data"
+        # 인덱스 항목이 여러 개 생기도록 간격을 작게
+        patcher = mock.patch.object(history_log, "INDEX_STRIDE", 200)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        start = datetime(2025, 12, 29, 6, 0)
+        for i in range(100):
+            timestamp = (start + timedelta(minutes=20 * i)).strftime("%Y-%m-%d %H:%M:%S")
+            history_log.append_record({"timestamp": timestamp, "i": i}, self.data_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, start=None, end=None):
+        return [r["i"] for r in history_log.read_range(start, end, self.data_dir, legacy_file=None)]
+
+    def test_range_matches_full_scan(self):
+        got = self._read(datetime(2025, 12, 29, 7, 0), datetime(2025, 12, 29, 9, 0))
+        self.assertEqual(got, list(range(3, 9)))
+
+    def test_records_are_partitioned_by_day(self):
+        dates = [p.date for p in history_log.list_partitions(data_dir=self.data_dir, legacy_file=None)]
+        self.assertEqual(dates, ["2025-12-29", "2025-12-30"])
+        self.assertEqual(self._read(), list(range(100)))
+
+    def test_index_is_sparse(self):
+        timestamps, offsets = history_log._read_index(
+            history_log.partition_path("2025-12-29", self.data_dir))
+        self.assertGreater(len(offsets), 1)
+        self.assertLess(len(offsets), 100)
+        self.assertEqual(offsets, sorted(offsets))
+
+    def test_compressed_partition_is_read_transparently(self):
+        self.assertEqual(history_log.compress_closed("2025-12-30", self.data_dir), ["2025-12-29"])
+        partitions = history_log.list_partitions(data_dir=self.data_dir, legacy_file=None)
+        self.assertEqual([p.compressed for p in partitions], [True, False])
+        self.assertFalse(history_log.partition_path("2025-12-29", self.data_dir).exists())
+        got = self._read(datetime(2025, 12, 29, 7, 0), datetime(2025, 12, 29, 9, 0))
+        self.assertEqual(got, list(range(3, 9)))
+        self.assertEqual(self._read(), list(range(100)))
+
+    def test_fields_projection(self):
+        got = list(history_log.read_range(
+            "2025-12-29 07:00:00", "2025-12-29 07:20:00", self.data_dir, legacy_file=None, fields=("i",)))
+        self.assertEqual(got, [{"i": 3}])
+
+    def test_records_without_leading_timestamp_are_filtered(self):
+        path = history_log.partition_path("2025-12-30", self.data_dir)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"i": 100, "timestamp": "2025-12-30 23:00:00"}\n')
+        self.assertEqual(self._read("2025-12-30 22:00:00"), [100])
+        self.assertEqual(self._read("2025-12-30 23:30:00"), [])
+
+    def test_partial_last_line_is_skipped(self):
+        path = history_log.partition_path("2025-12-30", self.data_dir)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"timestamp": "2025-12-30 23:00:00"')
+        self.assertEqual(self._read("2025-12-30 22:50:00"), [])
+
+
+class _Unseekable(io.RawIOBase):
+    """seek이 안 되는 압축 해제 스트림 흉내 (zstandard의 stream_reader)"""
+
+    def __init__(self, f):
+        self._f = f
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._f.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class TestIncrementalSidecar(unittest.TestCase):
+    """집계 파일 추가분 반영 테스트"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name) / "data"
+        self.meta_file = Path(self.tmp.name) / "data.meta.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, day, count):
+        for i in range(count):
+            history_log.append_record({"timestamp": f"{day} 08:{i:02d}:00", "hour": 8}, self.data_dir)
+
+    def _load(self):
+        return history_meta.load_meta(self.meta_file, self.data_dir, legacy_file=None)
+
+    def test_partially_read_partition_catches_up_after_unseekable_compression(self):
+        self._append("2025-12-29", 3)
+        self.assertEqual(self._load()["record_count"], 3)
+        self._append("2025-12-29", 2)
+        history_log.compress_closed("2025-12-30", self.data_dir)
+
+        real_open = history_log.open_partition
+
+        @contextmanager
+        def open_unseekable(partition):
+            with real_open(partition) as f:
+                yield io.BufferedReader(_Unseekable(f)) if partition.compressed else f
+
+        with mock.patch.object(history_log, "open_partition", open_unseekable):
+            meta = self._load()
+        self.assertEqual(meta["record_count"], 5)
+        self.assertEqual(meta["per_hour"][8], 5)
+
+    def test_concurrent_writers_do_not_share_temp_file(self):
+        # 프로세스마다 따로 있는 인스턴스 흉내 - 스레드 락을 공유하지 않음
+        self._append("2025-12-29", 3)
+        sidecars = [
+            history_meta.IncrementalSidecar(self.meta_file, history_meta._empty_meta,
+                                            history_meta._add_record, self.data_dir, None)
+            for _ in range(8)
+        ]
+        barrier = threading.Barrier(len(sidecars))
+        results, errors = [], []
+
+        def load(sidecar):
+            barrier.wait()
+            try:
+                results.append(sidecar.load()["record_count"])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=load, args=(sidecar,)) for sidecar in sidecars]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [3] * len(sidecars))
+        self.assertEqual(list(Path(self.tmp.name).glob("*.tmp")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""수집 이력 요약 집계 테스트"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import history_log
+import history_rollup
+
+
+def _record(timestamp, congestion="2"):
+    return {
+        "timestamp": timestamp,
+        "buses": [{"route": "421", "arrival1": "곧 도착", "congestion1": congestion}],
+    }
+
+
+class TestHistoryRollup(unittest.TestCase):
+    """추가분만 반영하는 요일 × 슬롯 × 노선 집계 테스트"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name) / "data"
+        self.data_dir.mkdir()
+        self.data_file = self.data_dir / "2025-12-27.jsonl"
+        self.rollup_file = Path(self.tmp.name) / "data.rollup.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, *lines):
+        with open(self.data_file, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    def _load(self):
+        return history_rollup.load_rollup(self.rollup_file, self.data_dir, legacy_file=None)
+
+    def test_counts_by_weekday_slot_route(self):
+        # 2025-12-27은 토요일, 08:15 → 슬롯 49
+        self._append(json.dumps(_record("2025-12-27 08:15:00")) + "\n")
+        self._append(json.dumps(_record("2025-12-27 08:19:00", "4")) + "\n")
+        cell = self._load()["routes"]["5:49:421"]
+        self.assertEqual(cell[history_rollup.COUNT], 2)
+        self.assertEqual(cell[history_rollup.CONGESTION_SUM], 6)
+        self.assertEqual(cell[history_rollup.PASSENGER_N], 2)
+
+    def test_appended_lines_are_added_incrementally(self):
+        self._append(json.dumps(_record("2025-12-27 08:15:00")) + "\n")
+        self.assertEqual(self._load()["records"]["5:49"][0], 1)
+        self._append(json.dumps(_record("2025-12-27 08:16:00")) + "\n")
+        self.assertEqual(self._load()["records"]["5:49"][0], 2)
+
+    def test_partial_last_line_is_deferred(self):
+        line = json.dumps(_record("2025-12-27 08:15:00")) + "\n"
+        self._append(line, line[:20])
+        self.assertEqual(self._load()["records"]["5:49"][0], 1)
+        self._append(line[20:])
+        self.assertEqual(self._load()["records"]["5:49"][0], 2)
+
+    def test_truncated_file_rebuilds(self):
+        self._append(json.dumps(_record("2025-12-27 08:15:00")) + "\n")
+        self._append(json.dumps(_record("2025-12-27 08:16:00")) + "\n")
+        self._load()
+        self.data_file.write_text(json.dumps(_record("2025-12-27 09:00:00")) + "\n", encoding="utf-8")
+        rollup = self._load()
+        self.assertNotIn("5:49", rollup["records"])
+        self.assertEqual(rollup["records"]["5:54"][0], 1)
+
+    def test_compressed_partition_is_counted_once(self):
+        self._append(json.dumps(_record("2025-12-27 08:15:00")) + "\n")
+        self._load()
+        self._append(json.dumps(_record("2025-12-27 08:16:00")) + "\n")
+        history_log.compress_closed("2025-12-28", self.data_dir)
+        self.assertEqual(self._load()["records"]["5:49"][0], 2)
+        self.assertEqual(self._load()["records"]["5:49"][0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""수집 이력 컬럼 저장소 테스트"""
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import history_store
+
+
+def _record(timestamp, *routes, station="03278"):
+    return {
+        "timestamp": timestamp,
+        "buses": [
+            {"station": station, "route": route, "arrival1": "3분12초후[2번째 전]", "arrival2": "곧 도착",
+             "congestion1": "2", "congestion2": "3"}
+            for route in routes
+        ],
+    }
+
+
+class TestHistoryStore(unittest.TestCase):
+    """세그먼트 추가/읽기 테스트"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store_dir = Path(self.tmp.name) / "history"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_long_and_non_ascii_names_round_trip(self):
+        # 레지스트리 설정으로 들어오는 긴/한글 노선 이름이 잘리거나 섞이지 않아야 함
+        history_store.append_record(_record("2025-12-29 08:00:00", "421", "마포08", "N6001"),
+                                    store_dir=self.store_dir)
+        history_store.append_record(_record("2025-12-29 08:10:00", "마포08", station="1234567"),
+                                    store_dir=self.store_dir)
+        columns = history_store.load_columns(("route", "station", "vehicle"), store_dir=self.store_dir)
+        self.assertEqual(columns["route"].tolist(),
+                         ["421", "421", "마포08", "마포08", "N6001", "N6001", "마포08", "마포08"])
+        self.assertEqual(columns["station"].tolist()[-1], "1234567")
+        self.assertEqual(history_store.load_meta(self.store_dir)["dictionary"]["route"],
+                         ["421", "마포08", "N6001"])
+
+    def test_import_skips_rows_already_in_store(self):
+        # 수집기가 먼저 넣은 기록 뒤에 전체 이력을 가져와도 중복/역순이 생기지 않아야 함
+        history_store.append_record(_record("2025-12-30 08:00:00", "421"), store_dir=self.store_dir)
+        appended = history_store.import_history(
+            [_record("2025-12-29 08:00:00", "421"), _record("2025-12-30 08:00:00", "421"),
+             _record("2025-12-30 08:10:00", "400")],
+            store_dir=self.store_dir,
+        )
+        self.assertEqual(appended, 2)
+        self.assertEqual(history_store.row_count(self.store_dir), 4)
+        ts = history_store.load_columns(("ts",), store_dir=self.store_dir)["ts"]
+        self.assertTrue((ts[1:] >= ts[:-1]).all())
+
+    def test_out_of_order_rows_are_skipped(self):
+        history_store.import_history(
+            [_record("2025-12-29 08:10:00", "421"), _record("2025-12-29 08:00:00", "400"),
+             _record("2025-12-29 08:20:00", "405")],
+            store_dir=self.store_dir,
+        )
+        start = datetime(2025, 12, 29, 8, 5).timestamp()
+        end = datetime(2025, 12, 29, 8, 15).timestamp()
+        columns = history_store.load_columns(("route",), start=start, end=end, store_dir=self.store_dir)
+        self.assertEqual(columns["route"].tolist(), ["421", "421"])
+        self.assertEqual(history_store.row_count(self.store_dir), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
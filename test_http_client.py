@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""공용 업스트림 HTTP 클라이언트 테스트 (재시도, 백오프, 시간 예산, 호출 한도)"""
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+import http_client
+import quota
+
+HOST = "upstream.test"
+URL = f"http://{HOST}/api"
+
+
+def _response(status):
+    return mock.Mock(status_code=status)
+
+
+class TestGet(unittest.TestCase):
+    """http_client.get 재시도/시간 예산/호출 한도 테스트"""
+
+    def setUp(self):
+        self.session = mock.Mock()
+        self.semaphore = threading.BoundedSemaphore(1)
+        patches = [
+            mock.patch.dict(http_client.HOST_LIMITS,
+                            {HOST: {"connect": 1, "read": 1, "budget": 5, "max_concurrent": 1}}),
+            mock.patch.object(http_client, "_get_host", return_value=(self.session, self.semaphore)),
+            mock.patch.object(http_client, "_backoff", return_value=0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_retries_transient_status(self):
+        self.session.get.side_effect = [_response(503), _response(200)]
+        self.assertEqual(http_client.get(URL).status_code, 200)
+        self.assertEqual(self.session.get.call_count, 2)
+
+    def test_returns_last_response_after_retries(self):
+        self.session.get.return_value = _response(502)
+        self.assertEqual(http_client.get(URL, retries=2).status_code, 502)
+        self.assertEqual(self.session.get.call_count, 3)
+
+    def test_raises_last_error_after_retries(self):
+        self.session.get.side_effect = requests.exceptions.ConnectionError("reset")
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            http_client.get(URL, retries=1)
+        self.assertEqual(self.session.get.call_count, 2)
+
+    def test_client_error_is_not_retried(self):
+        self.session.get.return_value = _response(404)
+        self.assertEqual(http_client.get(URL).status_code, 404)
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_stops_retrying_when_budget_runs_out(self):
+        self.session.get.return_value = _response(503)
+        started = time.monotonic()
+        with mock.patch.object(http_client, "_backoff", return_value=10):
+            self.assertEqual(http_client.get(URL, retries=5).status_code, 503)
+        self.assertEqual(self.session.get.call_count, 1)  # 대기하면 예산(5초)을 넘기므로 바로 반환
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_waiting_for_a_slot_is_bounded_by_budget(self):
+        http_client.HOST_LIMITS[HOST]["budget"] = 0.1
+        self.semaphore.acquire()  # 다른 요청이 자리를 차지
+        try:
+            started = time.monotonic()
+            with self.assertRaises(requests.exceptions.Timeout):
+                http_client.get(URL)
+            self.assertLess(time.monotonic() - started, 2)
+        finally:
+            self.semaphore.release()
+        self.session.get.assert_not_called()
+
+    def test_slot_released_after_error(self):
+        self.session.get.side_effect = [requests.exceptions.Timeout("slow"), _response(200)]
+        self.assertEqual(http_client.get(URL).status_code, 200)
+        self.assertTrue(self.semaphore.acquire(blocking=False))
+        self.semaphore.release()
+
+    def test_quota_exceeded_on_first_attempt(self):
+        with mock.patch.object(quota, "acquire", side_effect=quota.QuotaExceeded("한도")):
+            with self.assertRaises(quota.QuotaExceeded):
+                http_client.get(URL, params={"serviceKey": "key"})
+        self.session.get.assert_not_called()
+
+    def test_quota_exceeded_on_retry_returns_last_response(self):
+        self.session.get.return_value = _response(503)
+        with mock.patch.object(quota, "acquire", side_effect=[None, quota.QuotaExceeded("한도")]) as acquire:
+            self.assertEqual(http_client.get(URL, params={"serviceKey": "key"}).status_code, 503)
+        self.assertEqual(self.session.get.call_count, 1)
+        acquire.assert_called_with("key", f"{HOST}/api")
+
+
+class TestBackoff(unittest.TestCase):
+    """재시도 대기 시간 테스트"""
+
+    def test_full_jitter_doubles_each_attempt(self):
+        with mock.patch.object(http_client.random, "uniform", side_effect=lambda low, high: (low, high)):
+            bounds = [http_client._backoff(attempt) for attempt in range(3)]
+        self.assertEqual(bounds, [(0, http_client.RETRY_BACKOFF * 2 ** attempt) for attempt in range(3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""머신러닝 특성 행렬 테스트"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import history_store
+import ml_model
+
+
+def _record(congestion_421="3", passengers_421=54):
+    return {
+        "timestamp": "2025-12-29 08:15:00",
+        "hour": 8,
+        "minute": 15,
+        "weather": {"temperature": -2, "humidity": 40, "impact_factor": 1.1,
+                    "is_raining": False, "is_snowing": True},
+        "traffic": {"421": {"estimated_headway": 8, "next_bus": 2}, "400": {"error": "x"}},
+        "events": {"impact_factor": 1.3},
+        "road_traffic": {"error": "x"},
+        "occupancy": {"buses": [{"route": "421", "bus1_passengers": passengers_421},
+                                {"route": "400", "bus1_passengers": "정보없음"}]},
+        "buses": [{"route": "421", "congestion1": congestion_421},
+                  {"route": "400", "congestion1": "0"},
+                  {"route": "405", "congestion1": "2"}],
+    }
+
+
+class TestFeatureMatrix(unittest.TestCase):
+    """배치 특성 행렬 생성 테스트"""
+
+    def test_matches_single_record_features(self):
+        X, y = ml_model._featurize([_record()], "congestion")
+        columns = ml_model.FEATURE_COLUMNS
+        self.assertEqual(X.shape, (2, len(columns)))  # 400번은 혼잡도 정보 없음
+        base = ml_model.extract_features(_record())
+        self.assertEqual(list(X[0, :len(base)]), base)
+        row = dict(zip(columns, X[0]))
+        self.assertEqual(row["weekday"], 0)  # weekday가 없으면 timestamp에서 계산
+        self.assertEqual(row["event_impact"], 1.3)
+        self.assertEqual(row["traffic_impact"], 1.0)
+        self.assertEqual(row["route_421"], 1)
+        self.assertEqual(list(y), [3, 2])
+
+    def test_passenger_target_skips_missing(self):
+        X, y = ml_model._featurize([_record(), _record(passengers_421=20)], "passengers")
+        self.assertEqual(list(y), [54, 20])
+        self.assertTrue(all(X[:, ml_model.FEATURE_COLUMNS.index("route_421")] == 1))
+
+    def test_empty_history(self):
+        X, y = ml_model._featurize([], "congestion")
+        self.assertEqual(X.shape, (0, len(ml_model.FEATURE_COLUMNS)))
+        self.assertEqual(y.shape, (0,))
+
+    def test_store_columns_match_records(self):
+        records = [_record(), dict(_record("1"), timestamp="2025-12-29 08:20:00", minute=20,
+                                   weather={"error": "x"}, events={"error": "x"})]
+        records[1]["buses"] = records[1]["buses"] + [{"route": "421", "congestion1": "4"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            history_store.import_history(records, store_dir=tmp)
+            columns = history_store.load_columns(ml_model._STORE_COLUMNS, store_dir=tmp)
+        X, y = ml_model._featurize_columns(columns)
+        expected_X, expected_y = ml_model._featurize(records, "congestion")
+        np.testing.assert_allclose(X, expected_X, rtol=1e-6)  # 저장소는 float32
+        np.testing.assert_array_equal(y, expected_y)
+        self.assertEqual(list(y), [3, 2, 4, 2])  # 같은 노선이 두 번이면 나중 것
+
+    def test_store_used_only_when_it_covers_history(self):
+        history = {"first_timestamp": "2025-12-29 08:15:00", "last_timestamp": "2025-12-29 08:20:00"}
+        store = {"segments": [{"ts_min": ml_model._epoch("2025-12-29 08:15:00"),
+                               "ts_max": ml_model._epoch("2025-12-29 08:15:00")}]}
+        with mock.patch.object(ml_model, "load_meta", return_value=history), \
+                mock.patch.object(history_store, "load_meta", return_value=store):
+            self.assertFalse(ml_model._store_covers(None, None))  # 저장소 갱신이 밀림
+            self.assertTrue(ml_model._store_covers(None, "2025-12-29 08:15:01"))
+            store["segments"][0]["ts_min"] += 60  # 예전 이력을 가져오지 않음
+            self.assertFalse(ml_model._store_covers(None, "2025-12-29 08:15:01"))
+
+    def test_empty_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            columns = history_store.load_columns(ml_model._STORE_COLUMNS, store_dir=tmp)
+        X, y = ml_model._featurize_columns(columns)
+        self.assertEqual(X.shape, (0, len(ml_model.FEATURE_COLUMNS)))
+        self.assertEqual(y.shape, (0,))
+
+
+class TestCongestionModel(unittest.TestCase):
+    """리지 회귀 모델 테스트"""
+
+    def _data(self, n, seed):
+        rng = np.random.default_rng(seed)
+        X = np.zeros((n, len(ml_model.FEATURE_COLUMNS)))
+        X[:, ml_model.FEATURE_COLUMNS.index("hour")] = rng.integers(5, 23, n)
+        X[:, ml_model.FEATURE_COLUMNS.index("weather_impact")] = rng.uniform(0.9, 1.3, n)
+        y = 1.5 + 1.5 * (X[:, 0] >= 17) + X[:, ml_model.FEATURE_COLUMNS.index("weather_impact")]
+        return X, y
+
+    def test_incremental_fit_matches_full_fit(self):
+        X1, y1 = self._data(80, 1)
+        X2, y2 = self._data(60, 2)
+        incremental = ml_model.CongestionModel()
+        incremental.partial_fit(X1, y1)
+        incremental.partial_fit(X2, y2)
+        full = ml_model.CongestionModel()
+        full.partial_fit(np.vstack([X1, X2]), np.concatenate([y1, y2]))
+        np.testing.assert_allclose(incremental.weights, full.weights)
+        self.assertTrue(incremental.ready)
+
+    def test_learns_hour_effect(self):
+        model = ml_model.CongestionModel()
+        model.partial_fit(*self._data(200, 3))
+        evening, morning = self._data(2, 4)[0], self._data(2, 4)[0]
+        evening[:, 0], morning[:, 0] = 18, 10
+        self.assertGreater(model.predict(evening).mean(), model.predict(morning).mean() + 1)
+
+    def test_save_and_load(self):
+        model = ml_model.CongestionModel()
+        model.partial_fit(*self._data(120, 5))
+        model.data_version = "120-abc"
+        model.trained_until = "2025-12-29 08:00:00"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model.npz"
+            model.save(path)
+            loaded = ml_model.CongestionModel.load(path)
+            self.assertEqual([p.name for p in Path(tmp).iterdir()], ["model.npz"])  # 임시 파일 남지 않음
+        np.testing.assert_allclose(loaded.weights, model.weights)
+        self.assertEqual((loaded.rows, loaded.data_version, loaded.trained_until),
+                         (120, "120-abc", "2025-12-29 08:00:00"))
+
+    def test_missing_artifact(self):
+        self.assertIsNone(ml_model.CongestionModel.load("/nonexistent/model.npz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""prediction_table 조회표 테스트"""
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+import numpy as np
+
+import ml_model
+import prediction_table
+
+
+def _trained_model(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n, len(ml_model.FEATURE_COLUMNS)))
+    X[:, ml_model.FEATURE_COLUMNS.index("hour")] = rng.integers(5, 23, n)
+    X[:, ml_model.FEATURE_COLUMNS.index("weekday")] = rng.integers(0, 7, n)
+    y = 1.5 + 1.5 * (X[:, 0] >= 17)
+    model = ml_model.CongestionModel()
+    model.partial_fit(X, y)
+    return model
+
+
+class TestPredictionTable(unittest.TestCase):
+    """요일 × 슬롯 × 노선 조회표 테스트"""
+
+    def test_lookup_matches_model(self):
+        model = _trained_model()
+        table = prediction_table.build_table(model, today=date(2026, 10, 12))
+        self.assertEqual(table.values.shape, (7, 144, len(ml_model.ROUTES)))
+        self.assertEqual(table.model, "ridge")
+
+        moment = datetime(2026, 10, 14, 18, 25)
+        codes = np.clip(model.predict(ml_model.current_feature_rows(moment)), 1.0, 4.0)
+        expected = codes / ml_model.CONGESTION_SCALE
+        for i, route in enumerate(ml_model.ROUTES):
+            self.assertAlmostEqual(table.lookup(moment, route), expected[i], places=5)
+        self.assertGreater(table.lookup(datetime(2026, 10, 14, 18, 0)),
+                           table.lookup(datetime(2026, 10, 14, 9, 0)))
+
+    def test_rules_fallback(self):
+        table = prediction_table.build_table(ml_model.CongestionModel(), today=date(2026, 10, 12))
+        self.assertEqual(table.model, "rules")
+        moment = datetime(2026, 10, 14, 8, 0)
+        features = ml_model.extract_features({
+            "hour": 8, "minute": 0, "weekday": 2, "is_weekend": False, "weather": {}, "traffic": {}
+        })
+        self.assertAlmostEqual(table.lookup(moment), ml_model.simple_prediction_model(features), places=5)
+
+    def test_live_factors_applied(self):
+        table = prediction_table.build_table(_trained_model(), today=date(2026, 10, 12))
+        moment = datetime(2026, 10, 14, 12, 0)
+        plain = prediction_table.predict_from_table(table, moment)
+        rainy = prediction_table.predict_from_table(
+            table, moment, weather={"impact_factor": 1.2}, road_traffic={"total_impact": 1.1}
+        )
+        self.assertAlmostEqual(rainy["base_prediction"], min(plain["base_prediction"] * 1.2, 2.0), places=1)
+        self.assertEqual(rainy["traffic_impact"], 1.1)
+        # 조회표 범위 밖의 날짜에는 이벤트 배수를 적용하지 않음
+        self.assertEqual(table.event_factor(datetime(2027, 1, 6, 12, 0)), 1.0)
+
+    def test_range_matches_single_lookups(self):
+        table = prediction_table.build_table(_trained_model(), today=date(2026, 10, 12))
+        now = datetime(2026, 10, 14, 17, 0)
+        weather = {"impact_factor": 1.2}
+        result = prediction_table.predict_range(
+            datetime(2026, 10, 14, 16, 0), datetime(2026, 10, 15, 16, 0), 30,
+            table=table, weather=weather, route="421", now=now
+        )
+        self.assertEqual(len(result["times"]), 48)
+        for i, time in enumerate(result["times"]):
+            moment = datetime.fromisoformat(time)
+            live = now - timedelta(minutes=10) <= moment < now + timedelta(minutes=prediction_table.LIVE_HORIZON)
+            single = prediction_table.predict_from_table(
+                table, moment, weather=weather if live else None, route="421"
+            )
+            self.assertAlmostEqual(result["predicted_congestion"][i], single["predicted_congestion"], places=2)
+            self.assertEqual(result["weather_impact"][i], single["weather_impact"])
+
+    def test_failed_refresh_value_falls_back_to_process_table(self):
+        # 백그라운드 갱신이 실패하면 스냅샷 값이 {"error": ...} dict
+        table = prediction_table.build_table(_trained_model(), today=date(2026, 10, 12))
+        moment = datetime(2026, 10, 14, 12, 0)
+        with mock.patch.object(prediction_table, "get_table", return_value=table):
+            failed = prediction_table.predict_from_table({"error": "갱신 실패"}, moment)
+            ranged = prediction_table.predict_range(
+                moment, moment + timedelta(hours=1), table={"error": "갱신 실패"}, now=moment)
+        self.assertEqual(failed, prediction_table.predict_from_table(table, moment))
+        self.assertEqual(len(ranged["times"]), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
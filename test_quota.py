@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""업스트림 호출 한도(토큰 버킷) 테스트"""
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import quota
+
+ENDPOINT = "ws.bus.go.kr/api/rest/stationinfo/getStationByUid"
+NOW = datetime(2025, 12, 29, 8, 0).timestamp()
+
+
+class TestQuotaScheduler(unittest.TestCase):
+    """인증키/엔드포인트 버킷, 우선순위, 저장 테스트"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "quota.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scheduler(self, endpoint_limit=48):
+        # BURST_HOURS=2 → 버킷 용량 = 하루 한도의 1/12 (48회면 4개)
+        return quota.QuotaScheduler(self.path, key_limit=1200, endpoint_limit=endpoint_limit)
+
+    def test_burst_then_refill(self):
+        scheduler = self._scheduler()
+        for _ in range(4):
+            scheduler.acquire("key", ENDPOINT, quota.COLLECTOR, now=NOW)
+        with self.assertRaises(quota.QuotaExceeded):
+            scheduler.acquire("key", ENDPOINT, quota.COLLECTOR, now=NOW)
+        # 하루 48회 → 30분마다 1개씩 다시 채워짐
+        scheduler.acquire("key", ENDPOINT, quota.COLLECTOR, now=NOW + 1800)
+
+    def test_endpoints_have_separate_buckets(self):
+        scheduler = self._scheduler()
+        for _ in range(4):
+            scheduler.acquire("key", ENDPOINT, quota.COLLECTOR, now=NOW)
+        scheduler.acquire("key", "ws.bus.go.kr/api/rest/buspos/getBusPosByRtid", quota.COLLECTOR, now=NOW)
+        scheduler.acquire("other-key", ENDPOINT, quota.COLLECTOR, now=NOW)
+
+    def test_collector_uses_reserve_left_by_background(self):
+        scheduler = self._scheduler()
+        for _ in range(3):
+            scheduler.acquire("key", ENDPOINT, quota.BACKGROUND, now=NOW)
+        # 남은 1개는 선제 갱신에는 주지 않고 수집기 몫으로 남김
+        with self.assertRaises(quota.QuotaExceeded):
+            scheduler.acquire("key", ENDPOINT, quota.BACKGROUND, now=NOW)
+        scheduler.acquire("key", ENDPOINT, quota.COLLECTOR, now=NOW)
+
+    def test_usage_persists_across_restart(self):
+        scheduler = self._scheduler()
+        for _ in range(4):
+            scheduler.acquire("key", ENDPOINT, quota.COLLECTOR, now=NOW)
+
+        restarted = self._scheduler()
+        with self.assertRaises(quota.QuotaExceeded):
+            restarted.acquire("key", ENDPOINT, quota.COLLECTOR, now=NOW)
+        usage = {bucket["bucket"]: bucket for bucket in restarted.usage(now=NOW)}
+        self.assertEqual(usage[f"{quota.key_id('key')}:{ENDPOINT}"]["used"], 4)
+        self.assertIn(quota.key_id("key"), usage)  # 인증키 원문은 저장하지 않음
+        self.assertFalse(any(name.startswith("key") for name in usage))
+
+    def test_daily_usage_resets_next_day(self):
+        scheduler = self._scheduler()
+        scheduler.acquire("key", ENDPOINT, quota.COLLECTOR, now=NOW)
+        tomorrow = datetime(2025, 12, 30, 0, 1).timestamp()
+        self.assertTrue(all(bucket["used"] == 0 for bucket in scheduler.usage(now=tomorrow)))
+
+    def test_priority_context(self):
+        self.assertEqual(quota.current_priority(), quota.INTERACTIVE)
+        with quota.priority(quota.BACKGROUND):
+            self.assertEqual(quota.current_priority(), quota.BACKGROUND)
+        self.assertEqual(quota.current_priority(), quota.INTERACTIVE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""정류장/노선 레지스트리 테스트"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import registry
+from bus_state import StationSnapshot, merge_snapshots
+
+
+class TestRegistry(unittest.TestCase):
+    """설정 파일 로드 및 기본값 테스트"""
+
+    def test_default_config(self):
+        default = registry.load_registry()
+        self.assertEqual(default.route_names, ("421", "400", "405"))
+        self.assertEqual(default.station_ids, ("03278", "03518"))
+        self.assertEqual(default.route("421").demand_factor, 1.1)
+        self.assertEqual(default.route("421").capacity["total"], 70)
+        self.assertEqual(default.route("9999").demand_factor, 1.0)  # 미등록 노선은 기본값
+
+    def test_config_file(self):
+        config = {
+            "stations": [{"ars_id": "22010", "name": "강남역", "routes": ["140"]},
+                         {"ars_id": "22011", "name": "강남역"}],
+            "routes": {"140": {"route_id": "100100022", "capacity": {"seats": 25, "standing": 45, "total": 70}},
+                       "N13": {"demand_factor": 0.7}},
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "routes.json"
+            path.write_text(json.dumps(config), encoding="utf-8")
+            loaded = registry.load_registry(path)
+        self.assertEqual(loaded.route_names, ("140", "N13"))
+        self.assertEqual(loaded.route("140").capacity["seats"], 25)
+        self.assertEqual(loaded.station_routes(), {"22010": {"140"}, "22011": {"140", "N13"}})
+
+    def test_example_config_matches_default(self):
+        example = registry.load_registry(Path(__file__).parent / "routes.example.json")
+        self.assertEqual(example.route_names, registry.load_registry().route_names)
+
+    def test_empty_config_rejected(self):
+        with self.assertRaises(ValueError):
+            registry.Registry({"stations": [], "routes": {}})
+
+    def test_merge_keeps_configured_routes_only(self):
+        item = {"adirection": "매봉역", "arrmsg1": "곧 도착", "arrmsg2": "운행종료",
+                "congestion1": "2", "congestion2": "0"}
+        snapshot = StationSnapshot.from_items("03278", [{**item, "rtNm": "421"}, {**item, "rtNm": "110A"}])
+        merged = merge_snapshots({"03278": snapshot}, {"03278": frozenset({"421"})})
+        self.assertEqual([route.route for route in merged.routes], ["421"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""웹서버 엔드포인트 테스트"""
+import time
+import unittest
+from unittest import mock
+from datetime import datetime, timedelta, timezone
+
+import server
+
+
+class TestStreamLimit(unittest.TestCase):
+    """SSE 동시 연결 제한 테스트"""
+
+    def setUp(self):
+        self.client = server.app.test_client()
+
+    def test_rejects_streams_over_limit(self):
+        held = [self.client.get("/api/stream", buffered=False) for _ in range(server.MAX_STREAMS)]
+        try:
+            self.assertTrue(all(response.status_code == 200 for response in held))
+            response = self.client.get("/api/stream")
+            self.assertEqual(response.status_code, 503)
+            self.assertIn("Retry-After", response.headers)
+        finally:
+            for response in reversed(held):
+                response.close()
+
+        # 연결이 닫히면 자리가 돌아옴
+        response = self.client.get("/api/stream", buffered=False)
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+
+class TestRangeArgs(unittest.TestCase):
+    """구간 예측 쿼리 파싱 테스트"""
+
+    NOW = datetime(2025, 1, 6, 12, 0)
+
+    def test_offset_is_converted_to_local_time(self):
+        start, end, step, route = server.parse_range_args(
+            {"from": "2025-01-06T07:00+09:00", "to": "2025-01-06T08:00+09:00"}, now=self.NOW)
+        expected = datetime(2025, 1, 5, 22, 0, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        self.assertIsNone(start.tzinfo)
+        self.assertEqual(start, expected)
+        self.assertEqual((end - start).total_seconds(), 3600)
+
+    def test_aware_and_naive_bounds_are_comparable(self):
+        # 예전에는 end <= start 비교에서 TypeError가 나서 200 + 오류 본문으로 캐싱됐음
+        local_start = datetime(2025, 1, 5, 22, 0, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        earlier = (local_start - timedelta(hours=1)).isoformat()
+        with self.assertRaises(ValueError):
+            server.parse_range_args({"from": "2025-01-06T07:00+09:00", "to": earlier}, now=self.NOW)
+
+    def test_step_bounds(self):
+        for step in ("0", "1441", "99999999999999"):
+            with self.assertRaises(ValueError):
+                server.parse_range_args({"step": step}, now=self.NOW)
+        self.assertEqual(server.parse_range_args({"step": "1440"}, now=self.NOW)[2], 1440)
+
+    def test_range_endpoint_rejects_huge_step(self):
+        # 예전에는 timedelta에서 OverflowError가 나서 200 + 오류 본문으로 캐싱됐음
+        response = server.app.test_client().get("/api/prediction/range", query_string={"step": "99999999999999"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_range_endpoint_rejects_reversed_aware_bounds(self):
+        response = server.app.test_client().get(
+            "/api/prediction/range", query_string={"from": "2025-01-06T08:00+09:00", "to": "2025-01-06T07:00+09:00"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRangeCache(unittest.TestCase):
+    """구간 예측 응답 캐시 테스트"""
+
+    QUERY = {"from": "2025-01-06T07:00", "to": "2025-01-06T08:00", "step": "30"}
+
+    def setUp(self):
+        self.cache = server.api_prediction_range.cache
+        self.cache.clear()
+        patches = [
+            mock.patch.object(server, "shared_store", None),
+            mock.patch.object(server.refresher, "get_or_fetch", return_value=None),
+            mock.patch.object(server, "predict_range", return_value={"points": []}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.cache.clear)
+
+    def test_stale_refresh_keeps_query(self):
+        client = server.app.test_client()
+        self.assertEqual(client.get("/api/prediction/range", query_string=self.QUERY).status_code, 200)
+        (key, entry), = self.cache._data.items()
+        entry.expires_at = 0  # 만료됐지만 stale 구간
+
+        # stale 응답을 주고 백그라운드에서 요청 컨텍스트 없이 다시 만듦
+        self.assertEqual(client.get("/api/prediction/range", query_string=self.QUERY).status_code, 200)
+        for _ in range(100):
+            if self.cache._data[key].expires_at > 0 and not self.cache._inflight:
+                break
+            time.sleep(0.01)
+        self.assertEqual(server.predict_range.call_count, 2)
+        self.assertEqual(server.predict_range.call_args.args[2], 30)
+        self.assertEqual(self.cache._data[key].value.status, 200)
+
+
+class TestPredictionJob(unittest.TestCase):
+    """예측 갱신 작업 입력 테스트"""
+
+    def test_headway_does_not_fetch_without_snapshot(self):
+        with mock.patch.object(server.refresher, "get", return_value=None), \
+                mock.patch("station_snapshot.get_merged_snapshot") as fetch:
+            self.assertIsNone(server.current_headway())
+        fetch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
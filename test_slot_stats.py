@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""슬롯별 온라인 통계 테스트"""
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import slot_stats
+
+
+def _record(timestamp, congestion1, congestion2="0"):
+    return {
+        "timestamp": timestamp,
+        "buses": [{"route": "421", "congestion1": congestion1, "congestion2": congestion2}],
+    }
+
+
+class TestSlotStats(unittest.TestCase):
+    """Welford 누적 평균/분산 테스트"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name) / "data"
+        self.data_dir.mkdir()
+        self.stats_file = Path(self.tmp.name) / "data.slotstats.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, *records):
+        # 2025-12-29는 월요일, 10:00~10:09 → 평일 슬롯 60
+        with open(self.data_dir / "2025-12-29.jsonl", "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+
+    def _summary(self):
+        stats = slot_stats.load_slot_stats(self.stats_file, self.data_dir, legacy_file=None)
+        return slot_stats.slot_summary("421", datetime(2025, 12, 29, 10, 5), stats)
+
+    def test_matches_batch_mean_and_variance(self):
+        codes = [1, 2, 2, 3, 4, 2, 1]
+        self._append(*[_record(f"2025-12-29 10:0{i}:00", str(c)) for i, c in enumerate(codes)])
+        congestion = self._summary()["congestion1"]
+        self.assertEqual(congestion["count"], len(codes))
+        self.assertAlmostEqual(congestion["mean"], np.mean(codes), places=2)
+        self.assertAlmostEqual(congestion["std"], np.std(codes, ddof=1), places=2)
+
+    def test_incremental_updates(self):
+        self._append(_record("2025-12-29 10:00:00", "2", "3"))
+        self.assertEqual(self._summary()["congestion1"]["count"], 1)
+        self.assertIsNone(self._summary()["congestion1"]["ci95"])
+        self._append(_record("2025-12-29 10:01:00", "4"))
+        summary = self._summary()
+        self.assertEqual(summary["congestion1"]["count"], 2)
+        self.assertEqual(summary["congestion1"]["mean"], 3.0)
+        self.assertEqual(summary["congestion2"]["count"], 1)
+        self.assertEqual(summary["passengers"]["count"], 2)
+
+    def test_confidence_grows_with_consistent_samples(self):
+        self._append(*[_record(f"2025-12-29 10:0{i % 10}:00", "2") for i in range(3)])
+        few = slot_stats.congestion_confidence(self._summary())
+        self._append(*[_record(f"2025-12-29 10:0{i % 10}:00", "2") for i in range(60)])
+        many = slot_stats.congestion_confidence(self._summary())
+        self.assertEqual(few, 0.0)
+        self.assertGreater(many, 0.7)
+
+    def test_unobserved_slot(self):
+        self._append(_record("2025-12-29 10:00:00", "2"))
+        stats = slot_stats.load_slot_stats(self.stats_file, self.data_dir, legacy_file=None)
+        self.assertIsNone(slot_stats.slot_summary("421", datetime(2025, 12, 29, 11, 0), stats))
+        self.assertEqual(slot_stats.congestion_confidence(None), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
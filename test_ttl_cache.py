@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""TTL 캐시 테스트"""
+import threading
+import time
+import unittest
+from ttl_cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    """LRU + TTL 캐시 테스트"""
+
+    def test_set_and_get(self):
+        cache = TTLCache(ttl=60)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_expired_value_is_miss(self):
+        cache = TTLCache(ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # a를 최근 사용으로
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_single_flight(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 8)
+
+    def test_error_is_cached_briefly(self):
+        cache = TTLCache(ttl=60, error_ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            raise ValueError("upstream down")
+
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                cache.get_or_load("k", loader)
+        self.assertEqual(len(calls), 1)
+
+    def test_ttl_function(self):
+        cache = TTLCache(ttl=60)
+        cache.get_or_load("k", lambda: {"error": "x"}, ttl=lambda v: 0 if "error" in v else 60)
+        self.assertEqual(cache.get_or_load("k", lambda: {"ok": 1}), {"ok": 1})
+
+    def test_stale_while_revalidate(self):
+        cache = TTLCache(ttl=0.01, stale_ttl=60)
+        cache.get_or_load("k", lambda: "old")
+        time.sleep(0.02)
+
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return "new"
+
+        self.assertEqual(cache.get_or_load("k", loader, ttl=60), "old")
+        self.assertTrue(refreshed.wait(1))
+        for _ in range(100):
+            if cache.get("k") == "new":
+                break
+            time.sleep(0.01)
+        self.assertEqual(cache.get("k"), "new")
+
+    def test_error_value_is_not_served_stale(self):
+        cache = TTLCache(ttl=60, stale_ttl=60)
+        is_ok = lambda v: "error" not in v
+        cache.get_or_load("k", lambda: {"error": "x"}, ttl=lambda v: 0.01, stale=is_ok)
+        time.sleep(0.02)
+        # 만료된 오류 응답은 stale로 내주지 않고 바로 다시 로드
+        self.assertEqual(cache.get_or_load("k", lambda: {"ok": 1}, stale=is_ok), {"ok": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """서울시 교통 빅데이터 연동 - 버스 GPS 및 운행 패턴"""
-import requests
+import contextvars
+import http_client
 import json
 from datetime import datetime
 from seoul_api import get_api_key
+from concurrent.futures import ThreadPoolExecutor
+from bus_state import as_snapshot
+from registry import get_registry
 
-def get_bus_gps_data(route_id="100100409"):  # 421번
+def get_bus_gps_data(route_id):
     """버스 GPS 위치 정보 조회"""
     api_key = get_api_key()
     if not api_key:
@@ -19,7 +23,7 @@ def get_bus_gps_data(route_id="100100409"):  # 421번
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params)
         data = response.json()
         
         if data.get('msgBody', {}).get('itemList'):
@@ -53,7 +57,7 @@ def get_route_stations(route_id="100100409"):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params)
         data = response.json()
         
         if data.get('msgBody', {}).get('itemList'):
@@ -73,27 +77,31 @@ def get_route_stations(route_id="100100409"):
         return {"error": str(e)}
 
 def analyze_bus_distribution():
-    """421번과 400번 버스 분포 분석"""
-    routes = {
-        "421": "100100409",
-        "400": "100100596"
-    }
+    """레지스트리 노선(노선 ID가 있는 것)의 버스 분포 분석 - GPS 조회는 동시에"""
+    registry = get_registry()
+    routes = [route for route in registry.routes.values() if route.route_id]
+    station_names = {station.name for station in registry.stations if station.name}
+    
+    with ThreadPoolExecutor(max_workers=max(len(routes), 1), thread_name_prefix="gps") as executor:
+        # 호출 한도 우선순위(quota.priority)가 작업 스레드로 이어지도록 컨텍스트째 넘김
+        futures = [executor.submit(contextvars.copy_context().run, get_bus_gps_data, route.route_id)
+                   for route in routes]
+        gps_results = [future.result() for future in futures]
     
     analysis = {}
     
-    for route_name, route_id in routes.items():
+    for route, gps_data in zip(routes, gps_results):
+        route_name = route.name
         print(f"\n=== {route_name}번 버스 분석 ===")
         
-        # GPS 데이터
-        gps_data = get_bus_gps_data(route_id)
         if "buses" in gps_data:
             buses = gps_data["buses"]
             total_buses = len(buses)
             
-            # 보광동주민센터 근처 버스 찾기
+            # 정류장 근처 버스 찾기 (정류장 이름 또는 설정된 근처 정류장 순번)
             bogwang_nearby = []
             for bus in buses:
-                if "보광동" in bus["stationName"] or bus["stationSeq"] in [23, 24, 25]:  # 보광동 근처 정류장 순번
+                if any(name in bus["stationName"] for name in station_names) or bus["stationSeq"] in route.nearby_seqs:
                     bogwang_nearby.append(bus)
             
             analysis[route_name] = {
@@ -104,7 +112,7 @@ def analyze_bus_distribution():
             }
             
             print(f"총 운행 버스: {total_buses}대")
-            print(f"보광동 근처: {len(bogwang_nearby)}대")
+            print(f"정류장 근처: {len(bogwang_nearby)}대")
             
             for bus in bogwang_nearby:
                 print(f"  {bus['plateNo']} - {bus['stationName']} ({bus['stationSeq']}번째)")
@@ -114,37 +122,42 @@ def analyze_bus_distribution():
     
     return analysis
 
-def calculate_headway_pattern():
-    """배차간격 패턴 분석"""
+def calculate_headway_pattern(arrival_data=None, stations=None):
+    """배차간격 패턴 분석
+
+    arrival_data: 이미 조회한 도착정보 (없으면 stations의 합친 스냅샷 사용)
+    노선이 여러 방향/정류장에 있으면 먼저 나온(기본 정류장) 방향 기준
+    """
     # 실시간 도착 정보로 배차간격 추정
-    from seoul_api import get_bus_arrival_info
-    
-    arrival_data = get_bus_arrival_info("03278")
-    if "buses" not in arrival_data:
+    if arrival_data is None:
+        from station_snapshot import STATIONS, get_merged_snapshot
+        arrival_data = get_merged_snapshot(stations or STATIONS)
+    snapshot = as_snapshot(arrival_data)
+    if snapshot is None:
         return {"error": "도착 정보 없음"}
     
     headway_analysis = {}
     
-    for bus in arrival_data["buses"]:
-        route = bus["route"]
+    for bus in snapshot.routes:
+        route = bus.route
+        if route in headway_analysis:
+            continue
         
         # 첫 번째와 두 번째 버스 도착 시간 차이로 배차간격 추정
-        arrival1 = bus["arrival1"]
-        arrival2 = bus["arrival2"]
-        
-        # "N분후" 패턴에서 숫자 추출
-        import re
-        min1_match = re.search(r'(\d+)분후', arrival1)
-        min2_match = re.search(r'(\d+)분후', arrival2)
+        arrival1, arrival2 = (vehicle.arrival for vehicle in bus.vehicles)
         
-        if min1_match and min2_match:
-            min1 = int(min1_match.group(1))
-            min2 = int(min2_match.group(1))
-            headway = min2 - min1
+        if arrival1.seconds is not None and arrival2.seconds is not None:
+            min1 = arrival1.minutes
+            min2 = arrival2.minutes
+            headway = round((arrival2.seconds - arrival1.seconds) / 60)
             
             headway_analysis[route] = {
+                "station": bus.station,
+                "direction": bus.direction,
                 "next_bus": min1,
                 "second_bus": min2,
+                "next_bus_stops": arrival1.stops_away,
+                "second_bus_stops": arrival2.stops_away,
                 "estimated_headway": headway,
                 "frequency_per_hour": 60 // headway if headway > 0 else "N/A"
             }
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""LRU + TTL 캐시 - 단일 조회(single-flight), stale-while-revalidate, 실패 캐싱"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until", "is_error")
+
+    def __init__(self, value, expires_at, stale_until, is_error):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.is_error = is_error
+
+
+class TTLCache:
+    """스레드 안전한 LRU + TTL 캐시
+
+    - ttl: 신선한 값으로 취급하는 시간(초)
+    - stale_ttl: 만료 후에도 갱신하는 동안 옛 값을 내주는 시간(초)
+    - error_ttl: 실패(예외)를 캐싱하는 시간(초), 같은 실패로 업스트림을 두드리지 않도록
+    - maxsize: 최대 키 수, 넘으면 가장 오래 안 쓴 키부터 제거
+
+    get_or_load()는 키마다 로더를 동시에 한 번만 실행한다.
+    ttl 인자에 함수를 주면 로드된 값마다 TTL을 정할 수 있다 (예: 오류 응답은 짧게).
+    stale 인자(값 → bool)가 False인 값은 만료 후 stale로 내주지 않는다 (예: 오류 응답).
+    """
+
+    def __init__(self, ttl=60, maxsize=256, stale_ttl=0, error_ttl=5, name="cache"):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self.error_ttl = error_ttl
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}  # {key: threading.Event}
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """신선한 값만 반환 (만료/실패 항목은 default)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and not entry.is_error and time.monotonic() < entry.expires_at:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        now = time.monotonic()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._store(key, _Entry(value, now + ttl, now + ttl + self.stale_ttl, False))
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key, loader, ttl=None, stale=None):
+        """캐시 값 반환, 없거나 만료됐으면 loader()로 채움
+
+        - 같은 키를 동시에 요청하면 한 스레드만 loader를 실행하고 나머지는 결과를 기다린다.
+        - 만료됐지만 stale 구간이면 옛 값을 바로 주고 백그라운드에서 갱신한다.
+        - loader가 예외를 내면 error_ttl 동안 같은 예외를 다시 올린다.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                entry = self._data.get(key)
+                if entry is not None:
+                    if now < entry.expires_at:
+                        self._data.move_to_end(key)
+                        self.hits += 1
+                        if entry.is_error:
+                            raise entry.value
+                        return entry.value
+                    if not entry.is_error and now < entry.stale_until:
+                        self.stale_hits += 1
+                        if key not in self._inflight:
+                            self._inflight[key] = threading.Event()
+                            threading.Thread(
+                                target=self._load, args=(key, loader, ttl, stale),
+                                name=f"{self.name}-revalidate", daemon=True
+                            ).start()
+                        return entry.value
+
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    self.misses += 1
+                    self._inflight[key] = threading.Event()
+                    break
+
+            # 다른 스레드가 로딩 중이면 끝날 때까지 기다린 뒤 다시 확인
+            waiter.wait()
+
+        value, error = self._load(key, loader, ttl, stale)
+        if error is not None:
+            raise error
+        return value
+
+    def stats(self):
+        """적중/미스/제거 카운터"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+            }
+
+    def _load(self, key, loader, ttl, stale=None):
+        """loader 실행 후 결과(또는 예외) 저장, 대기 중인 스레드 깨우기"""
+        value, error = None, None
+        try:
+            value = loader()
+        except Exception as e:
+            logger.error(f"{self.name} 로드 실패 {key}: {e}")
+            error = e
+
+        now = time.monotonic()
+        with self._lock:
+            if error is None:
+                if callable(ttl):
+                    ttl = ttl(value)
+                ttl = self.ttl if ttl is None else ttl
+                stale_ttl = self.stale_ttl if stale is None or stale(value) else 0
+                self._store(key, _Entry(value, now + ttl, now + ttl + stale_ttl, False))
+            else:
+                previous = self._data.get(key)
+                if previous is None or previous.is_error or now >= previous.stale_until:
+                    self._store(key, _Entry(error, now + self.error_ttl, now + self.error_ttl, True))
+                else:
+                    # 갱신 실패 시 stale 값을 error_ttl 동안 계속 내주고 그 뒤에 재시도
+                    previous.expires_at = min(now + self.error_ttl, previous.stale_until)
+            event = self._inflight.pop(key, None)
+        if event:
+            event.set()
+        return value, error
+
+    def _store(self, key, entry):
+        """락을 잡은 상태에서 호출"""
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
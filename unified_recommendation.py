@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """통합 추천 시스템 - 일관성 있는 추천"""
 import logging
+from bus_state import StationSnapshot
 from occupancy_analysis import analyze_bus_occupancy, get_comfort_statistics
 from quiet_times import get_quiet_time_recommendations
 from ml_model import predict_congestion
@@ -9,18 +10,27 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-def get_unified_recommendation():
-    """모든 데이터를 종합한 통합 추천"""
+def get_unified_recommendation(arrival_data=None, occupancy=None, ml_prediction=None, quiet_times=None):
+    """모든 데이터를 종합한 통합 추천
+
+    arrival_data: 이미 조회한 도착정보 (없으면 정류장 스냅샷 사용)
+    occupancy: 이미 계산한 analyze_bus_occupancy() 결과
+    ml_prediction: 이미 계산한 predict_congestion() 결과
+    quiet_times: 이미 계산한 get_quiet_time_recommendations() 결과
+    """
 
     # 1. 실제 버스 승객 수 (가장 중요)
-    occupancy = analyze_bus_occupancy()
-    comfort_stats = get_comfort_statistics()
+    if occupancy is None:
+        occupancy = analyze_bus_occupancy(arrival_data)
+    comfort_stats = get_comfort_statistics(occupancy)
 
     # 2. 시간대별 패턴
-    quiet_times = get_quiet_time_recommendations()
+    if quiet_times is None:
+        quiet_times = get_quiet_time_recommendations()
 
     # 3. ML 예측
-    ml_prediction = predict_congestion()
+    if ml_prediction is None:
+        ml_prediction = predict_congestion()
 
     # 통합 분석
     current_situation = analyze_current_situation(occupancy, comfort_stats, quiet_times)
@@ -36,7 +46,7 @@ def get_unified_recommendation():
 def analyze_current_situation(occupancy, comfort_stats, quiet_times):
     """현재 상황 종합 분석"""
 
-    if "error" in occupancy or "error" in comfort_stats:
+    if not isinstance(occupancy, StationSnapshot) or "error" in comfort_stats:
         logger.warning("실시간 데이터 오류 - API 응답 없음")
         return {
             "main_recommendation": {
@@ -49,7 +59,7 @@ def analyze_current_situation(occupancy, comfort_stats, quiet_times):
         }
 
     # 가장 한적한 버스 찾기
-    best_bus, min_passengers = find_best_bus(occupancy.get("buses", []))
+    best_bus, min_passengers = find_best_bus(occupancy.routes)
 
     # 전체 상황 판단
     if not best_bus:
@@ -123,21 +133,26 @@ def _get_recommendation_for_level(level, best_bus, min_passengers):
         "color": "#6b7280"
     })
 
-def get_detailed_bus_recommendations():
-    """개별 버스별 상세 추천"""
-    occupancy = analyze_bus_occupancy()
+def get_detailed_bus_recommendations(occupancy=None):
+    """개별 버스별 상세 추천
+
+    occupancy: 이미 계산한 analyze_bus_occupancy() 결과 (없으면 새로 분석)
+    """
+    if occupancy is None:
+        occupancy = analyze_bus_occupancy()
 
-    if "error" in occupancy:
+    if not isinstance(occupancy, StationSnapshot):
         return {"error": occupancy["error"]}
 
     recommendations = []
 
-    for bus in occupancy["buses"]:
-        route = bus["route"]
-        passengers1 = bus["bus1_passengers"]
-        passengers2 = bus["bus2_passengers"]
+    for bus in occupancy.routes:
+        route = bus.route
+        first, second = bus.vehicles
+        passengers1 = first.passengers
+        passengers2 = second.passengers
 
-        if isinstance(passengers1, int) and isinstance(passengers2, int):
+        if passengers1 is not None and passengers2 is not None:
             if passengers1 <= passengers2:
                 recommendation = f"첫 번째 버스 추천 ({passengers1}명 vs {passengers2}명)"
                 best_choice = "first"
@@ -152,8 +167,8 @@ def get_detailed_bus_recommendations():
             "route": route,
             "recommendation": recommendation,
             "best_choice": best_choice,
-            "bus1_info": f"{bus['arrival1']} - {passengers1}명",
-            "bus2_info": f"{bus['arrival2']} - {passengers2}명"
+            "bus1_info": f"{first.message} - {passengers1 or '정보없음'}명",
+            "bus2_info": f"{second.message} - {passengers2 or '정보없음'}명"
         })
 
     return {"buses": recommendations}
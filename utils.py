@@ -1,16 +1,10 @@
 #!/usr/bin/env python3
 """공통 유틸리티 함수"""
 import logging
+from bus_state import as_route
 
 logger = logging.getLogger(__name__)
 
-# 버스 설정 (하드코드 제거)
-BUS_ROUTES = {
-    421: {"name": "421번", "start": "보광동주민센터", "end": "매봉역"},
-    400: {"name": "400번", "start": "보광동주민센터", "end": "매봉역"},
-    405: {"name": "405번", "start": "보광동주민센터", "end": "매봉역"},
-}
-
 # 혼잡도 기준
 COMFORT_LEVELS = {
     "매우한적": {"range": (0, 25), "color": "#22c55e", "emoji": "😊"},
@@ -39,31 +33,21 @@ def get_comfort_config(level):
 
 
 def find_best_bus(buses):
-    """버스 리스트에서 가장 한적한 버스 찾기"""
+    """버스 리스트(RouteState 또는 승객 수 분석 dict)에서 가장 한적한 버스 찾기"""
     best_bus = None
     min_passengers = 999
     
-    for bus in buses:
-        passengers1 = bus.get("bus1_passengers")
-        passengers2 = bus.get("bus2_passengers")
-        
-        if isinstance(passengers1, int) and passengers1 < min_passengers:
-            min_passengers = passengers1
-            best_bus = {
-                "route": bus["route"],
-                "passengers": passengers1,
-                "arrival": bus["arrival1"],
-                "comfort": bus.get("bus1_comfort", "알 수 없음")
-            }
-        
-        if isinstance(passengers2, int) and passengers2 < min_passengers:
-            min_passengers = passengers2
-            best_bus = {
-                "route": bus["route"],
-                "passengers": passengers2,
-                "arrival": bus["arrival2"],
-                "comfort": bus.get("bus2_comfort", "알 수 없음")
-            }
+    for bus in map(as_route, buses):
+        for vehicle in bus.vehicles:
+            passengers = vehicle.passengers
+            if passengers is not None and passengers < min_passengers:
+                min_passengers = passengers
+                best_bus = {
+                    "route": bus.route,
+                    "passengers": passengers,
+                    "arrival": vehicle.message,
+                    "comfort": vehicle.occupancy.get("comfort", "알 수 없음")
+                }
     
     return best_bus, min_passengers
 
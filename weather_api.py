@@ -3,9 +3,14 @@
 
 import os
 import requests
+import http_client
 import json
 from datetime import datetime, timedelta
 import math
+from ttl_cache import TTLCache
+
+# 발표 시각별 예보 캐시 (실패는 1분 동안 재시도하지 않음)
+_forecast_cache = TTLCache(ttl=1800, maxsize=8, error_ttl=60, name="kma_forecast")
 
 
 def convert_to_grid(lat, lon):
@@ -79,28 +84,10 @@ def get_weather_data():
         base_time_str = base_time.strftime("%H%M")
 
     try:
-        url = "http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getVilageFcst"
-        params = {
-            "serviceKey": api_key,
-            "pageNo": "1",
-            "numOfRows": "1000",
-            "dataType": "JSON",
-            "base_date": base_date,
-            "base_time": base_time_str,
-            "nx": str(nx),
-            "ny": str(ny),
-        }
-
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-
-        if data.get("response", {}).get("header", {}).get("resultCode") != "00":
-            return {"error": "기상청 API 응답 오류"}
-
-        items = (
-            data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
+        # 같은 발표 시각의 예보는 바뀌지 않으므로 캐시에서 재사용
+        items = _forecast_cache.get_or_load(
+            (base_date, base_time_str, nx, ny),
+            lambda: fetch_forecast_items(api_key, base_date, base_time_str, nx, ny),
         )
         if not items:
             return {"error": "날씨 데이터가 없습니다"}
@@ -113,6 +100,31 @@ def get_weather_data():
         return {"error": str(e)}
 
 
+def fetch_forecast_items(api_key, base_date, base_time, nx, ny):
+    """기상청 단기예보 항목 조회 (실패 시 예외)"""
+    url = "http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getVilageFcst"
+    params = {
+        "serviceKey": api_key,
+        "pageNo": "1",
+        "numOfRows": "1000",
+        "dataType": "JSON",
+        "base_date": base_date,
+        "base_time": base_time,
+        "nx": str(nx),
+        "ny": str(ny),
+    }
+
+    response = http_client.get(url, params=params)
+    response.raise_for_status()
+
+    data = response.json()
+
+    if data.get("response", {}).get("header", {}).get("resultCode") != "00":
+        raise ValueError("기상청 API 응답 오류")
+
+    return data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
+
+
 def parse_kma_weather_data(items):
     """기상청 날씨 데이터 파싱"""
     # 카테고리별 최신 데이터 추출